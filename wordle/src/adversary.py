@@ -0,0 +1,89 @@
+"""Adversarial ("Absurdle") games: the answer is never fixed until it has to be.
+
+Every guess splits the words still possible into feedback classes (one
+per pattern code) and the game answers with the pattern of the biggest
+class, which becomes the new set of possible answers. The player wins
+once the only class left is "all green".
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from engine import CORRECT, LOST, PLAYING, PRESENT, WordleGame
+from patterns import all_correct, decode_pattern, score_batch, words_to_array
+
+
+@lru_cache(maxsize=None)
+def mark_counts(length):
+    """(greens, yellows) per pattern code, as arrays indexed by code."""
+    marks = np.array([decode_pattern(code, length) for code in range(3 ** length)], dtype=np.uint8)
+    return (marks == CORRECT).sum(axis=1), (marks == PRESENT).sum(axis=1)
+
+
+def partition(codes, length):
+    """Class sizes for every pattern code: one counting pass, no per-word buckets."""
+    return np.bincount(codes, minlength=3 ** length)
+
+
+def pick_class(counts, length):
+    """The adversary's answer: the pattern code of the largest class.
+
+    Ties go to the pattern that gives away the least: fewest greens, then
+    fewest yellows, then the lowest code, so the same guesses always get
+    the same answers.
+    """
+    tied = np.flatnonzero(counts == counts.max())
+    if len(tied) == 1:
+        return int(tied[0])
+    greens, yellows = mark_counts(length)
+    # lexsort sorts by the last key first
+    return int(tied[np.lexsort((tied, yellows[tied], greens[tied]))[0]])
+
+
+class AbsurdleGame(WordleGame):
+    """A WordleGame whose target keeps moving to dodge the player's guesses.
+
+    ``target`` is only a stand-in (the first word still possible) until a
+    guess is marked all green; the GUI draws the adversary's patterns
+    exactly like normal ones.
+    """
+
+    __slots__ = ("_ids", "_letters")
+
+    def reset(self, target=None):
+        super().reset("")
+        self._ids = np.arange(len(self.lexicon), dtype=np.int32)
+        self._letters = words_to_array(self.lexicon.words)
+        self.target = self.lexicon.words[0]
+
+    @property
+    def remaining(self):
+        return len(self._ids)
+
+    def candidate_words(self):
+        words = self.lexicon.words
+        return [words[i] for i in self._ids.tolist()]
+
+    def guess(self, word):
+        if self.status != PLAYING:
+            return None
+        if word not in self.lexicon:
+            self.message = "Not in word list"
+            return None
+        if self.hard_mode and self.guesses:
+            violation = self.constraints.violation(word)
+            if violation:
+                self.message = violation
+                return None
+        length = self.lexicon.length
+        codes = score_batch(words_to_array([word]), self._letters)[0]
+        code = pick_class(partition(codes, length), length)
+        keep = codes == code
+        self._ids = self._ids[keep]
+        self._letters = self._letters[keep]
+        # Solved only when every word left would be all green, i.e. the guess itself
+        self.target = word if code == all_correct(length) else self.lexicon.words[int(self._ids[0])]
+        marks = self._apply(word, decode_pattern(code, length))
+        if self.status == LOST and self.remaining > 1:
+            self.message = f"Game Over! {self.remaining} words left, e.g. {self.target}"
+        return marks
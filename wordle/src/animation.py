@@ -0,0 +1,171 @@
+"""Grid animations (tile flip, letter pop, row shake) on a fixed timestep.
+
+Time advances in whole ticks of STEP_NS counted from perf_counter_ns, not
+per drawn frame: a slow frame skips ticks instead of slowing the animation
+down, and a tick always shows the same frame, however often the loop
+draws. The animator only keeps time. main.py draws every frame from sprite
+strips pre-rendered once per cell size (SpriteAtlas in render_cache.py), so
+nothing is scaled while an animation plays.
+"""
+import math
+import time
+from functools import lru_cache
+
+ANIMATION_HZ = 60
+STEP_NS = 1_000_000_000 // ANIMATION_HZ
+
+FLIP, POP, SHAKE = "flip", "pop", "shake"
+
+# Durations in ticks; a submitted row flips left to right, one column every FLIP_STAGGER
+FLIP_TICKS = 20
+FLIP_STAGGER = 10
+POP_TICKS = 6
+SHAKE_TICKS = 24
+DURATIONS = {FLIP: FLIP_TICKS, POP: POP_TICKS, SHAKE: SHAKE_TICKS}
+
+FLIP_FRAMES = 6     # Frames per half of a flip (the strip is played forwards, then backwards)
+POP_FRAMES = 6
+POP_GROWTH = 0.12   # A popping tile grows by this share of its size at the peak
+SHAKE_CYCLES = 3
+
+
+@lru_cache(maxsize=None)
+def flip_sizes(size, frames=FLIP_FRAMES):
+    """Frame sizes for half a flip: the tile squashed vertically from full height to nothing."""
+    return tuple((size, max(0, round(size * math.cos(math.pi / 2 * i / (frames - 1)))))
+                 for i in range(frames))
+
+
+@lru_cache(maxsize=None)
+def pop_sizes(size, pad, frames=POP_FRAMES):
+    """Frame sizes for a pop: up to (at most) ``size + 2 * pad`` and back."""
+    sizes = []
+    for i in range(frames):
+        grown = min(size + 2 * pad, round(size * (1 + POP_GROWTH * math.sin(math.pi * i / (frames - 1)))))
+        sizes.append((grown, grown))
+    return tuple(sizes)
+
+
+def pop_pad(size, margin):
+    """How far a popping tile reaches past its cell; half the margin at most, so neighbors never overlap."""
+    return min(margin // 2, round(size * POP_GROWTH / 2))
+
+
+def flip_frame(progress, frames=FLIP_FRAMES):
+    """(showing the back face, strip frame index) at ``progress`` (0 to 1) through a flip."""
+    u = progress * 2
+    if u < 1:
+        return False, min(frames - 1, int(u * frames))
+    return True, max(0, frames - 1 - int((u - 1) * frames))
+
+
+def pop_frame(progress, frames=POP_FRAMES):
+    return min(frames - 1, int(progress * frames))
+
+
+def shake_offset(progress, amplitude):
+    """Horizontal offset of a shaking row: a few swings that die down."""
+    return round(amplitude * math.sin(2 * math.pi * SHAKE_CYCLES * progress) * (1 - progress))
+
+
+class Animation:
+    __slots__ = ("kind", "key", "start", "ticks")
+
+    def __init__(self, kind, key, start, ticks):
+        self.kind = kind
+        self.key = key  # (board, row, col) for flips and pops, (board, row) for a shake
+        self.start = start
+        self.ticks = ticks
+
+
+class Animator:
+    """Running animations, at most one per key, and the tick count they are measured in.
+
+    Disabled (--no-animations), nothing is ever started and the game draws
+    exactly as before.
+    """
+
+    __slots__ = ("enabled", "step_ns", "tick", "clock", "animations", "stopped", "changed")
+
+    def __init__(self, enabled=True, step_ns=STEP_NS):
+        self.enabled = enabled
+        self.step_ns = step_ns
+        self.tick = 0
+        self.clock = None  # perf_counter_ns at the start of the current tick
+        self.animations = {}
+        # Animations cut short (cancelled or replaced), handed out by take_finished()
+        self.stopped = []
+        # Set when an animation starts between advance() calls
+        self.changed = False
+
+    @property
+    def active(self):
+        return bool(self.animations)
+
+    def advance(self, now_ns=None):
+        """Moves time on by the whole ticks elapsed.
+
+        Returns True if there is a new frame to show: the tick changed or an
+        animation was started since the last call.
+        """
+        now = time.perf_counter_ns() if now_ns is None else now_ns
+        changed, self.changed = self.changed, False
+        if self.clock is None or not self.animations:
+            # Nothing to animate: keep the clock current instead of counting idle ticks
+            self.clock = now
+            return changed
+        steps = (now - self.clock) // self.step_ns
+        if steps <= 0:
+            return changed
+        self.tick += steps
+        self.clock += steps * self.step_ns
+        return True
+
+    def timeout_ms(self, now_ns=None):
+        """Milliseconds until the next tick (how long the loop may wait for input)."""
+        now = time.perf_counter_ns() if now_ns is None else now_ns
+        return max(1, math.ceil((self.clock + self.step_ns - now) / 1_000_000))
+
+    def start(self, kind, key, delay=0):
+        """Starts (or restarts) the ``kind`` animation on ``key`` after ``delay`` ticks."""
+        if not self.enabled:
+            return
+        self.advance()
+        self.cancel(key)
+        self.animations[key] = Animation(kind, key, self.tick + delay, DURATIONS[kind])
+        self.changed = True
+
+    def flip(self, cell, delay=0):
+        self.start(FLIP, cell, delay)
+
+    def pop(self, cell):
+        self.start(POP, cell)
+
+    def shake(self, board, row):
+        self.start(SHAKE, (board, row))
+
+    def cancel(self, key):
+        animation = self.animations.pop(key, None)
+        if animation is not None:
+            self.stopped.append(animation)
+
+    def cancel_all(self):
+        """Drops every animation without handing any out (the whole grid is being redrawn)."""
+        self.animations.clear()
+        self.stopped.clear()
+
+    def running(self):
+        """[(animation, progress from 0 to just under 1)] for every animation not finished yet.
+
+        One that has not started (a staggered flip) is at progress 0.
+        """
+        return [(a, max(0, self.tick - a.start) / a.ticks) for a in self.animations.values()]
+
+    def take_finished(self):
+        """Removes and returns the animations that have played to the end or were cut short."""
+        done = [a for a in self.animations.values() if self.tick - a.start >= a.ticks]
+        for animation in done:
+            del self.animations[animation.key]
+        done += self.stopped
+        self.stopped = []
+        return done
@@ -0,0 +1,356 @@
+"""Game data files: locations, download check and word list loading (no pygame)."""
+import hashlib
+import json
+import struct
+import sys
+import os
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_file import atomic_write
+from lexicon import Lexicon
+
+# Define file paths and URLs
+try:
+    # This is the 'src' directory
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    # Fallback for interactive interpreters
+    script_dir = os.path.abspath(os.getcwd())
+
+# This is the project root (WORDLE/)
+project_root = os.path.dirname(script_dir)
+DATA_DIR = os.path.join(project_root, 'data')
+
+# Define the files needed from the GitHub repo
+# Using the specific branch from your request
+BASE_URL = "https://raw.githubusercontent.com/whelxi/Wordle/refs/heads/main/wordle/data/"
+
+# Expected SHA-256 of every required file
+MANIFEST = {
+    "word_list_5.txt": "52a04f4fb860953c2a29c2769014bd8b12d090a19e7577a460a2a2586bd6d4ce",
+    "keypress.mp3": "9d2ad727d3e914d6d7380262a0df92c65c8b5322479b4d2e648d7ca1cc96c46f",
+    "keypress2.mp3": "4c7cd1a6cf4045dcefa3ae3d2bcc38f63c535a426c30f3557a728863fa1f0655",
+}
+REQUIRED_FILES = {name: BASE_URL + name for name in MANIFEST}
+
+# Remembers (size, mtime) -> hash so warm starts don't rehash unchanged files
+HASH_CACHE_FILE = ".asset_hashes.json"
+DOWNLOAD_TIMEOUT = 15  # seconds, per network operation
+DOWNLOAD_WORKERS = 4
+CHUNK_SIZE = 64 * 1024
+
+
+class AssetError(Exception):
+    """A required file could not be fetched or failed verification."""
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_hash_cache(data_dir):
+    try:
+        with open(os.path.join(data_dir, HASH_CACHE_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_hash_cache(data_dir, cache):
+    try:
+        with atomic_write(os.path.join(data_dir, HASH_CACHE_FILE), 'w') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: Could not save file hash cache. Error: {e}", file=sys.stderr)
+
+
+def file_hash(path, cache):
+    """SHA-256 of ``path``, reusing the cached value while size and mtime are unchanged."""
+    st = os.stat(path)
+    name = os.path.basename(path)
+    record = cache.get(name)
+    if record and record.get("size") == st.st_size and record.get("mtime_ns") == st.st_mtime_ns:
+        return record["sha256"]
+    digest = sha256_file(path)
+    cache[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def download_file(url, dest, expected_sha256, timeout=DOWNLOAD_TIMEOUT):
+    """Downloads ``url`` to ``dest`` through a '.part' file, resuming a previous attempt.
+
+    The file only appears under its final name after its hash has been
+    verified, so an interrupted download can never be mistaken for a good one.
+    """
+    part_path = dest + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            # 206 means the server honoured the Range header; anything else restarts
+            mode = 'ab' if offset and response.status == 206 else 'wb'
+            with open(part_path, mode) as f:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    f.write(chunk)
+    except urllib.error.HTTPError as e:
+        if e.code == 416 and offset:
+            # Range not satisfiable: the part file is already complete (or garbage)
+            pass
+        else:
+            raise
+    digest = sha256_file(part_path)
+    if digest != expected_sha256:
+        os.remove(part_path)
+        raise AssetError(f"Checksum mismatch for '{os.path.basename(dest)}' (got {digest[:12]}...)")
+    os.replace(part_path, dest)
+
+
+def bootstrap(data_dir=DATA_DIR, base_url=BASE_URL, manifest=MANIFEST,
+              timeout=DOWNLOAD_TIMEOUT, workers=DOWNLOAD_WORKERS):
+    """Verifies every manifest file in ``data_dir`` and fetches the bad ones in parallel.
+
+    A file that is missing or fails its checksum (e.g. one cut short by an
+    older downloader) is fetched again through download_file(), which only
+    replaces it once the new copy verifies. Local word frequency edits
+    belong in frequency_file(), which is not in the manifest. Returns a dict
+    of filename -> status ('ok', 'downloaded' or 'unverified': a bad copy
+    kept because the server could not be reached). Raises AssetError if a
+    file cannot be fetched and there is no local copy, or if a download
+    fails its checksum.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    cache = load_hash_cache(data_dir)
+    status = {}
+    to_fetch = []
+    for filename, expected in manifest.items():
+        local_path = os.path.join(data_dir, filename)
+        if os.path.exists(local_path) and file_hash(local_path, cache) == expected:
+            status[filename] = 'ok'
+        else:
+            to_fetch.append(filename)
+
+    errors = []
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(workers, len(to_fetch))) as pool:
+            futures = {
+                pool.submit(download_file, base_url + filename,
+                            os.path.join(data_dir, filename), manifest[filename], timeout): filename
+                for filename in to_fetch
+            }
+            for future, filename in futures.items():
+                local_path = os.path.join(data_dir, filename)
+                try:
+                    future.result()
+                    file_hash(local_path, cache)
+                    status[filename] = 'downloaded'
+                except AssetError as e:
+                    errors.append(f"'{filename}': {e}")
+                except OSError as e:
+                    if os.path.exists(local_path):
+                        # Offline: play with the copy we have and try again next start
+                        status[filename] = 'unverified'
+                    else:
+                        errors.append(f"'{filename}': {e}")
+
+    save_hash_cache(data_dir, cache)
+    if errors:
+        raise AssetError("Failed to download " + "; ".join(errors))
+    return status
+
+
+def check_and_download_data():
+    """Checks for the data directory and required files, downloads them if missing."""
+    print("--- Checking for required game files... ---")
+    try:
+        status = bootstrap()
+    except AssetError as e:
+        print(f"FATAL: {e}. Check internet connection.", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"FATAL: Could not set up the data directory '{DATA_DIR}'. Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for filename, state in status.items():
+        if state == 'downloaded':
+            print(f"Successfully downloaded '{filename}'.")
+        elif state == 'unverified':
+            print(f"Warning: '{filename}' does not match the expected checksum and could not be "
+                  f"downloaded again; using the local copy for now.", file=sys.stderr)
+
+    if all(state == 'ok' for state in status.values()):
+        print("--- All files are present. ---")
+    else:
+        print("--- File setup complete. ---")
+
+
+# --- Precompiled word lists ---
+# Header: magic, parser version, source size, source mtime_ns, word length, word count;
+# then the words as one block of uppercase ASCII.
+COMPILED_MAGIC = b"WLB2"
+COMPILED_HEADER = struct.Struct("<4sHQqHI")
+# Bump whenever parse_word_line() or the filters in load_words() change, so
+# compiled copies made by the old code are rebuilt instead of trusted
+PARSER_VERSION = 1
+
+
+def compiled_path(filepath):
+    return os.path.splitext(filepath)[0] + ".bin"
+
+
+def read_compiled_words(filepath):
+    """Returns the words from the compiled copy of ``filepath``, or None if it is missing or stale."""
+    try:
+        st = os.stat(filepath)
+        with open(compiled_path(filepath), 'rb') as f:
+            data = f.read()
+        magic, parser, size, mtime_ns, length, count = COMPILED_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    body = data[COMPILED_HEADER.size:]
+    if (magic != COMPILED_MAGIC or parser != PARSER_VERSION or size != st.st_size
+            or mtime_ns != st.st_mtime_ns or len(body) != length * count or not count):
+        return None
+    text = body.decode('ascii')
+    return [text[i:i + length] for i in range(0, len(text), length)]
+
+
+def write_compiled_words(filepath, words):
+    """Saves a compiled copy of the parsed word list next to the source file."""
+    try:
+        st = os.stat(filepath)
+        header = COMPILED_HEADER.pack(COMPILED_MAGIC, PARSER_VERSION, st.st_size, st.st_mtime_ns,
+                                      len(words[0]), len(words))
+        with atomic_write(compiled_path(filepath)) as f:
+            f.write(header + "".join(words).encode('ascii'))
+    except OSError:
+        pass  # The text file is still the source of truth
+
+
+# --- Load word list from file ---
+def parse_word_line(line):
+    """'word' or 'word frequency' -> (WORD, frequency or None); (None, None) for a blank line."""
+    fields = line.split()
+    if not fields:
+        return None, None
+    try:
+        frequency = float(fields[1]) if len(fields) > 1 else None
+    except ValueError:
+        frequency = None
+    return fields[0].upper(), frequency
+
+
+def load_words(filepath, length=5):
+    """Loads and processes the word list from a file (words of ``length`` letters).
+
+    Lines may carry an optional frequency after the word (see load_word_weights()).
+    """
+    # Fast path: the precompiled copy, if it is up to date with the text file
+    words = read_compiled_words(filepath)
+    if words:
+        return words
+    try:
+        with open(filepath, 'r') as f:
+            # Read all lines, take the word column and convert to uppercase
+            # Filter for words of the right length and ensure they are alphabetic
+            words = [
+                word
+                for word, _ in map(parse_word_line, f)
+                if word and len(word) == length and word.isalpha()
+            ]
+        if not words:
+            # If no valid words are found, print an error and exit
+            print(f"Error: No valid {length}-letter words found in {filepath}", file=sys.stderr)
+            sys.exit(1)
+        write_compiled_words(filepath, words)
+        return words
+    except FileNotFoundError:
+        # This will now only trigger if the download failed for some reason
+        print(f"Error: Word list file not found at {filepath}", file=sys.stderr)
+        print(f"Please ensure '{os.path.basename(filepath)}' is in the 'data' directory.", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"An error occurred while loading words: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def load_word_weights(filepath, length=5, overrides=None):
+    """Word frequencies aligned with load_words(); None if there are none.
+
+    They come from the list's optional frequency column, with the 'word
+    frequency' lines of the ``overrides`` file (see frequency_file()) taking
+    precedence. Words without a frequency get the smallest one seen.
+    """
+    try:
+        with open(filepath, 'r') as f:
+            rows = [
+                (word, frequency)
+                for word, frequency in map(parse_word_line, f)
+                if word and len(word) == length and word.isalpha()
+            ]
+    except OSError:
+        return None
+    if overrides is not None:
+        try:
+            with open(overrides, 'r') as f:
+                custom = {word: frequency for word, frequency in map(parse_word_line, f)
+                          if word and frequency is not None}
+        except OSError:
+            custom = {}
+        rows = [(word, custom.get(word, frequency)) for word, frequency in rows]
+    known = [frequency for _, frequency in rows if frequency is not None and frequency > 0]
+    if not known:
+        return None
+    floor = min(known)
+    return [frequency if frequency is not None and frequency > 0 else floor for _, frequency in rows]
+
+
+# --- Path definitions now use the DATA_DIR constant from setup ---
+# One word list shard per word length; only the 5-letter list is required
+WORD_LENGTHS = range(4, 9)
+DEFAULT_WORD_LENGTH = 5
+
+
+def word_list_file(length, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f'word_list_{length}.txt')
+
+
+def frequency_file(length, data_dir=DATA_DIR):
+    """Optional local word frequencies ('crane 1234' lines), kept out of the manifest."""
+    return os.path.join(data_dir, f'word_freq_{length}.txt')
+
+
+WORD_LIST_FILE = word_list_file(DEFAULT_WORD_LENGTH)
+
+# --- Per-length lexicons, each loaded and indexed at most once per process ---
+_lexicons = {}
+_lexicons_lock = threading.Lock()
+
+
+def available_lengths(data_dir=DATA_DIR):
+    """Word lengths whose word list shard is present."""
+    return [n for n in WORD_LENGTHS if os.path.exists(word_list_file(n, data_dir))]
+
+
+def load_lexicon(length=DEFAULT_WORD_LENGTH):
+    """Returns the Lexicon for ``length``-letter words, or None if that shard is missing.
+
+    The first call per length reads (and compiles) the shard and builds the
+    indexes; later calls, from any thread, return the same object.
+    """
+    with _lexicons_lock:
+        lexicon = _lexicons.get(length)
+        if lexicon is None:
+            filepath = word_list_file(length)
+            if not os.path.exists(filepath):
+                return None
+            lexicon = _lexicons[length] = Lexicon(load_words(filepath, length))
+        return lexicon
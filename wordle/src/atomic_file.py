@@ -0,0 +1,35 @@
+"""Crash-safe file writes: a temp file next to the target, renamed over it once complete."""
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """Yields a temp path to write; it replaces ``path`` when the block finishes.
+
+    Readers only ever see the old file or the complete new one. The temp
+    name is per process, so concurrent writers never share one. If the
+    block or the rename fails, the temp file is deleted and the error goes on.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb', fsync=False):
+    """Opens a file that replaces ``path`` only once it is completely written (see atomic_path()).
+
+    With ``fsync`` the data reaches the disk before the rename.
+    """
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,192 @@
+"""Low-latency sound effects: small mixer buffer, cached PCM and a reserved voice pool.
+
+Run from the 'src' directory to estimate keypress latency:  python audio.py
+"""
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+from atomic_file import atomic_write
+
+# Mixer settings. A small buffer is what keeps keypress sounds snappy;
+# override with WORDLE_AUDIO_BUFFER if a machine crackles.
+FREQUENCY = 44100
+SAMPLE_SIZE = -16
+OUTPUT_CHANNELS = 2
+DEFAULT_BUFFER_SIZE = 256
+VOICES = 8
+
+# Decoded PCM cache: magic, frequency, format, channels, source size, source mtime_ns
+PCM_MAGIC = b"PCM1"
+PCM_HEADER = struct.Struct("<4siiiQq")
+
+
+def _env_buffer_size():
+    """WORDLE_AUDIO_BUFFER in frames, or the default (with a warning) if it is not a positive integer."""
+    value = os.environ.get("WORDLE_AUDIO_BUFFER")
+    if value is None:
+        return DEFAULT_BUFFER_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size <= 0:
+        print(f"Warning: WORDLE_AUDIO_BUFFER={value!r} is not a positive number of frames; "
+              f"using {DEFAULT_BUFFER_SIZE}.", file=sys.stderr)
+        return DEFAULT_BUFFER_SIZE
+    return size
+
+
+BUFFER_SIZE = _env_buffer_size()
+
+
+class AudioSystem:
+    """Owns the mixer, the decoded sounds and a pool of reserved channels.
+
+    play() never blocks: it picks an idle reserved channel, or steals the
+    one that started playing longest ago when all of them are busy.
+    """
+
+    def __init__(self, data_dir, frequency=FREQUENCY, buffer_size=BUFFER_SIZE, voices=VOICES):
+        self.data_dir = data_dir
+        self.frequency = frequency
+        self.buffer_size = buffer_size
+        self.voices = voices
+        self.sounds = {}
+        self.channels = []
+        self.started_at = []
+        self.mixer_format = None
+        self.play_ns = 0  # Time spent in the last play() call
+
+    def start(self):
+        """Opens the mixer. Returns False (sound disabled) if it fails."""
+        try:
+            pygame.mixer.pre_init(self.frequency, SAMPLE_SIZE, OUTPUT_CHANNELS, self.buffer_size)
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Warning: Mixer could not be initialized. Sound will be disabled. Error: {e}", file=sys.stderr)
+            return False
+        self.mixer_format = pygame.mixer.get_init()
+        # Reserve the pool so nothing else can take these channels
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.voices))
+        pygame.mixer.set_reserved(self.voices)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.voices)]
+        self.started_at = [0] * self.voices
+        return True
+
+    @property
+    def enabled(self):
+        return bool(self.channels)
+
+    def _pcm_path(self, filename):
+        return os.path.join(self.data_dir, os.path.splitext(filename)[0] + ".pcm")
+
+    def _read_pcm(self, source, pcm_path):
+        try:
+            st = os.stat(source)
+            with open(pcm_path, 'rb') as f:
+                data = f.read()
+            header = PCM_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        expected = (PCM_MAGIC, *self.mixer_format, st.st_size, st.st_mtime_ns)
+        if header != expected:
+            return None
+        return data[PCM_HEADER.size:]
+
+    def _write_pcm(self, source, pcm_path, raw):
+        try:
+            st = os.stat(source)
+            with atomic_write(pcm_path) as f:
+                f.write(PCM_HEADER.pack(PCM_MAGIC, *self.mixer_format, st.st_size, st.st_mtime_ns))
+                f.write(raw)
+        except OSError:
+            pass  # The sound is decoded from the source again next launch
+
+    def load(self, name, filename, fallbacks=()):
+        """Loads a sound from data_dir (trying fallback files), decoding it only once ever.
+
+        The decoded samples are cached as raw PCM in the mixer's format next
+        to the original, so later starts skip the MP3 decoder entirely.
+        """
+        if not self.enabled:
+            return None
+        source = os.path.join(self.data_dir, filename)
+        for fallback in fallbacks:
+            if os.path.exists(source):
+                break
+            source = os.path.join(self.data_dir, fallback) # Fallback
+        try:
+            pcm_path = self._pcm_path(os.path.basename(source))
+            raw = self._read_pcm(source, pcm_path)
+            if raw is not None:
+                sound = pygame.mixer.Sound(buffer=raw)
+            else:
+                sound = pygame.mixer.Sound(source)
+                self._write_pcm(source, pcm_path, sound.get_raw())
+        except pygame.error as e:
+            print(f"Warning: Could not load sound file '{filename}'. Sound will be disabled. Error: {e}", file=sys.stderr)
+            return None
+        except FileNotFoundError:
+            print(f"Warning: Sound file '{filename}' not found. Sound will be disabled.", file=sys.stderr)
+            return None
+        self.sounds[name] = sound
+        return sound
+
+    def play(self, name):
+        """Plays a loaded sound on a pooled channel. Unknown names are ignored."""
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+        start = time.perf_counter_ns()
+        index = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                index = i
+                break
+        if index is None:
+            # Voice stealing: cut the oldest sound short
+            index = min(range(len(self.channels)), key=self.started_at.__getitem__)
+        self.channels[index].play(sound)
+        self.started_at[index] = start
+        self.play_ns = time.perf_counter_ns() - start
+
+    def buffer_latency_ms(self):
+        """Time one mixer buffer takes to play out: the floor on output latency."""
+        if not self.mixer_format:
+            return None
+        return self.buffer_size / self.mixer_format[0] * 1000
+
+    def estimated_latency(self, name, presses=50):
+        """Keypress-to-sound latency estimate in ms: timed play() calls plus the mixer buffering.
+
+        Only play() is timed; the buffering is worked out from the buffer size.
+        Returns (mean_call_ms, max_call_ms, total_ms) or None if the sound is not loaded.
+        """
+        if name not in self.sounds:
+            return None
+        samples = []
+        for _ in range(presses):
+            self.play(name)
+            samples.append(self.play_ns / 1e6)
+            time.sleep(0.005)
+        pygame.mixer.stop()
+        mean_call = sum(samples) / len(samples)
+        # SDL keeps about two buffers in flight between mixing and the device
+        return mean_call, max(samples), mean_call + 2 * self.buffer_latency_ms()
+
+
+if __name__ == "__main__":
+    from assets import DATA_DIR
+
+    audio = AudioSystem(DATA_DIR)
+    if not audio.start() or not audio.load('keypress', 'keypress.mp3', ['keypress.ogg']):
+        sys.exit(1)
+    mean_call, max_call, total = audio.estimated_latency('keypress')
+    print(f"Mixer: {audio.mixer_format}, buffer {audio.buffer_size} frames "
+          f"({audio.buffer_latency_ms():.2f} ms)")
+    print(f"play() call: mean {mean_call:.3f} ms, max {max_call:.3f} ms")
+    print(f"Estimated keypress-to-sound latency: {total:.2f} ms")
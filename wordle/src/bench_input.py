@@ -0,0 +1,258 @@
+"""End-to-end input latency benchmark: scripted input through the real main loop.
+
+Runs main.main() under SDL's dummy video/audio drivers, posts KEYDOWN and
+MOUSEBUTTONDOWN events with pygame.event.post from a second thread and
+times each one until the end of the frame that handled it (main() calls
+back after every frame). Games are played with real words, typed or
+clicked on the on-screen keyboard, with a few misses and deletions.
+
+Every board count in --boards (1 and 16 by default, the lightest and the
+heaviest grid) is a separate run in its own process, since main() owns
+pygame and the game's module state.
+
+Run from the 'src' directory:
+    python bench_input.py                      # 2000 events at 30/s, on 1 and on 16 boards
+    python bench_input.py --boards 4           # one board count only
+    python bench_input.py --rate 0 --burst 16  # throughput: batches as fast as handled
+    python bench_input.py --max-p99 20         # exit 1 if p99 latency is above 20 ms
+    python bench_input.py -- --length 6        # anything after -- goes to main.py
+"""
+import os
+
+# Must be set before pygame initializes video/audio
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import pygame
+
+import main as game_main
+from keyboard_layout import KEYBOARD_ROWS
+
+LETTER_KEYS = [key for row in KEYBOARD_ROWS for key in row if len(key) == 1]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class InputScript:
+    """Generates the next input from the game's current state, like a (fast) player."""
+
+    def __init__(self, rng, click_share=0.25, typo_share=0.1):
+        self.rng = rng
+        self.click_share = click_share
+        self.typo_share = typo_share
+        self.pending = []
+
+    def _press(self, label):
+        """An event for a key label, as a keypress or a click on the on-screen key."""
+        layout = game_main.keyboard_layout
+        if self.rng.random() < self.click_share and label in layout.rects:
+            x, y, w, h = layout.rects[label]
+            return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x + w // 2, y + h // 2), button=1)
+        if label == "ENTER":
+            return pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, unicode="\r", mod=0)
+        if label == "DEL":
+            return pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode="\b", mod=0)
+        return pygame.event.Event(pygame.KEYDOWN, key=ord(label.lower()), unicode=label.lower(), mod=0)
+
+    def next_event(self):
+        game = game_main.game
+        if game_main.show_end_game_buttons:
+            self.pending = []
+            x, y, w, h = game_main.continue_button_rect
+            return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x + w // 2, y + h // 2), button=1)
+        if not self.pending:
+            # The next row: a real word (sometimes with a typo fixed on the way) or gibberish
+            words = game.lexicon.words
+            word = self.rng.choice(words)
+            if self.rng.random() < self.typo_share:
+                labels = [*word[:2], self.rng.choice(LETTER_KEYS), "DEL", *word[2:]]
+            elif self.rng.random() < self.typo_share:
+                labels = [self.rng.choice(LETTER_KEYS) for _ in word]
+            else:
+                labels = list(word)
+            self.pending = ["DEL"] * len(game.current) + labels + ["ENTER"]
+        return self._press(self.pending.pop(0))
+
+
+class InputBenchmark:
+    """Posts the scripted events and collects the post-to-frame latency of each."""
+
+    def __init__(self, events, rate, burst, warmup, seed):
+        self.total = events + warmup
+        self.warmup = warmup
+        self.rate = rate
+        self.burst = burst
+        self.script = InputScript(random.Random(seed))
+        self.posted = {}
+        self.latencies = []
+        self.handled = 0
+        self.frames = 0
+        self.drawn = 0
+        self.started = None
+        self.finished = None
+        self.batch_end = 0
+        self.ready = threading.Event()
+        self.caught_up = threading.Event()
+        self.stopped = False
+
+    def on_frame(self, events, rendered):
+        """main() callback: every tagged event in ``events`` is now on screen."""
+        now = time.perf_counter_ns()
+        if game_main.game is not None:
+            self.ready.set()
+        self.frames += 1
+        self.drawn += rendered
+        for event in events:
+            bench_id = getattr(event, "bench_id", None)
+            if bench_id is None:
+                continue
+            if bench_id >= self.warmup:
+                if self.started is None:
+                    self.started = self.posted[bench_id]
+                self.latencies.append(now - self.posted.pop(bench_id))
+            else:
+                self.posted.pop(bench_id)
+            self.handled += 1
+        if self.handled >= self.batch_end:
+            self.caught_up.set()
+        if self.handled >= self.total and self.finished is None:
+            self.finished = now
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    def post_loop(self):
+        self.ready.wait()
+        interval = 1.0 / self.rate if self.rate else 0.0
+        next_at = time.perf_counter()
+        bench_id = 0
+        while bench_id < self.total and not self.stopped:
+            if self.rate:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at += interval
+                count = 1
+            else:
+                # Throughput mode: the next batch goes in once the last one is on screen
+                self.caught_up.wait()
+                self.caught_up.clear()
+                count = min(self.burst, self.total - bench_id)
+            self.batch_end = bench_id + count
+            for _ in range(count):
+                event = self.script.next_event()
+                event.bench_id = bench_id
+                self.posted[bench_id] = time.perf_counter_ns()
+                pygame.event.post(event)
+                bench_id += 1
+
+    def run(self, main_args):
+        poster = threading.Thread(target=self.post_loop, name="bench-input", daemon=True)
+        poster.start()
+        try:
+            game_main.main(main_args, on_frame=self.on_frame)
+        except SystemExit:
+            pass
+        self.stopped = True
+        self.ready.set()
+        self.caught_up.set()
+
+    def summary(self):
+        latencies = sorted(ns / 1e6 for ns in self.latencies)
+        wall = ((self.finished or 0) - (self.started or 0)) / 1e9
+        return {
+            "events": len(latencies),
+            "wall_seconds": wall,
+            "events_per_s": len(latencies) / wall if wall > 0 else 0.0,
+            "frames": self.frames,
+            "frames_drawn": self.drawn,
+            "p50_ms": percentile(latencies, 0.50),
+            "p99_ms": percentile(latencies, 0.99),
+            "p999_ms": percentile(latencies, 0.999),
+            "max_ms": latencies[-1] if latencies else 0.0,
+        }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Input-to-frame latency through the real game loop")
+    parser.add_argument("--events", type=int, default=2000, help="timed events")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed events first")
+    parser.add_argument("--rate", type=float, default=30.0,
+                        help="events per second (0 = throughput mode, see --burst)")
+    parser.add_argument("--burst", type=int, default=8, help="events per batch in throughput mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--boards", type=int, nargs="+", default=[1, 16],
+                        help="board counts to benchmark, each in its own process")
+    parser.add_argument("--max-p99", type=float, help="fail (exit 1) above this p99 latency in ms")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("main_args", nargs="*", help="arguments for main.py (after --)")
+    return parser.parse_args(argv)
+
+
+def print_report(report, boards):
+    print(f"{boards} board{'s' if boards > 1 else ''}: {report['events']} events in "
+          f"{report['wall_seconds']:.1f} s ({report['events_per_s']:.0f}/s), {report['frames']} frames "
+          f"({report['frames_drawn']} drawn)")
+    print(f"input to frame: p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, "
+          f"p99.9 {report['p999_ms']:.2f} ms, max {report['max_ms']:.2f} ms")
+
+
+def run_cases(argv, args):
+    """Runs this script once per board count and prints the reports together."""
+    split = argv.index("--") if "--" in argv else len(argv)
+    reports = {}
+    failed = False
+    for boards in args.boards:
+        case = [*argv[:split], "--boards", str(boards), "--json", *argv[split:]]
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), *case],
+                                stdout=subprocess.PIPE, text=True)
+        failed |= result.returncode != 0
+        try:
+            # The report is the JSON object at the end, after main.py's own start-up lines
+            reports[boards] = json.loads(result.stdout[result.stdout.rindex("\n{") + 1:])
+        except ValueError:
+            print(f"Error: The {boards}-board run printed no report", file=sys.stderr)
+            failed = True
+    if args.json:
+        print(json.dumps(reports, indent=1))
+    else:
+        for boards, report in reports.items():
+            print_report(report, boards)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parse_args(argv)
+    if len(args.boards) > 1:
+        return run_cases(argv, args)
+    boards = args.boards[0]
+    bench = InputBenchmark(args.events, args.rate, args.burst, args.warmup, args.seed)
+    # Never touch the player's stats or saved game
+    bench.run(["--no-save", "--boards", str(boards), *args.main_args])
+    report = bench.summary()
+    if args.json:
+        print(json.dumps(report, indent=1))
+    else:
+        print_report(report, boards)
+    if report["events"] < args.events:
+        print(f"Error: Only {report['events']} of {args.events} events were handled", file=sys.stderr)
+        return 1
+    if args.max_p99 is not None and report["p99_ms"] > args.max_p99:
+        print(f"Error: p99 latency {report['p99_ms']:.2f} ms is above {args.max_p99} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Micro-benchmark: list scan vs. Lexicon lookups for guess validation.
+
+Run from the 'src' directory:  python bench_lexicon.py
+"""
+import os
+import random
+import timeit
+
+from lexicon import Lexicon
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+WORD_LIST_FILE = os.path.join(os.path.dirname(script_dir), 'data', 'word_list_5.txt')
+
+
+def read_words(filepath):
+    with open(filepath, 'r') as f:
+        return [
+            line.strip().upper()
+            for line in f
+            if len(line.strip()) == 5 and line.strip().isalpha()
+        ]
+
+
+def report(label, seconds, count):
+    print(f"{label:<32} {seconds / count * 1e9:10.1f} ns/op")
+
+
+def main():
+    words = read_words(WORD_LIST_FILE)
+    lexicon = Lexicon(words)
+
+    rng = random.Random(1234)
+    # Half real words (uniformly spread over the list), half misses
+    probes = rng.sample(words, 500) + ["".join(rng.choices("QXZJV", k=5)) for _ in range(500)]
+    rng.shuffle(probes)
+    count = len(probes)
+
+    list_time = min(timeit.repeat(lambda: [p in words for p in probes], number=5, repeat=3)) / 5
+    lex_time = min(timeit.repeat(lambda: [p in lexicon for p in probes], number=200, repeat=3)) / 200
+
+    print(f"Words: {len(words)}, probes: {count}")
+    report("list membership (old)", list_time, count)
+    report("Lexicon membership", lex_time, count)
+    print(f"{'speedup':<32} {list_time / lex_time:10.1f}x")
+
+    # Pattern queries: rescan vs. bitmask index
+    patterns = ["A?E??", "??A?E", "S????", "CR???", "?????"]
+    for pattern in patterns:
+        regex_scan = lambda: [
+            w for w in words
+            if all(p == '?' or p == c for p, c in zip(pattern, w))
+        ]
+        scan_time = min(timeit.repeat(regex_scan, number=20, repeat=3)) / 20
+        index_time = min(timeit.repeat(lambda: lexicon.match(pattern), number=20, repeat=3)) / 20
+        assert regex_scan() == lexicon.match(pattern)
+        print(f"pattern {pattern!r:<10} matches={lexicon.count(pattern):5d}  "
+              f"scan {scan_time * 1e6:9.1f} us  index {index_time * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
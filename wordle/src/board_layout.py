@@ -0,0 +1,108 @@
+"""Letter grid geometry, derived from the board dimensions and the space available."""
+import math
+
+CELL_SIZE = 60      # Largest cell size; boards shrink below this to fit
+CELL_MARGIN = 10    # Margin at the largest cell size (scales with the cell)
+MIN_CELL_SIZE = 4
+READABLE_CELL_SIZE = 16  # Smallest cell whose letter is still easy to read (see window_size())
+SIDE_PADDING = 10
+BOARD_GAP = 0.5     # Space between boards (multi-board mode), in cells
+SCREEN_FIT = (1920, 1080)  # Screen size window_size() plans for when the real one is unknown
+
+
+def board_units(columns, rows):
+    """(width, height) of one board in cells, margins included."""
+    ratio = CELL_MARGIN / CELL_SIZE
+    return columns + (columns - 1) * ratio, rows + (rows - 1) * ratio
+
+
+def grid_extent(cell_size, columns, rows, across, down):
+    """(width, height) in pixels of ``across`` x ``down`` boards, with the margins and gaps rounded as drawn."""
+    margin = round(cell_size * CELL_MARGIN / CELL_SIZE)
+    gap = round(cell_size * BOARD_GAP)
+    board_width = (cell_size + margin) * columns - margin
+    board_height = (cell_size + margin) * rows - margin
+    return (board_width + gap) * across - gap, (board_height + gap) * down - gap
+
+
+def window_size(columns, rows, boards, top, reserved, minimum, screen=SCREEN_FIT,
+                cell_size=READABLE_CELL_SIZE):
+    """The smallest window, at least ``minimum`` (width, height), whose cells are ``cell_size`` or more.
+
+    ``top`` is where the grid starts and ``reserved`` the height kept under
+    it (keyboard and toggles). Of the board tilings, the one taking the
+    smallest share of ``screen`` wins, so 16 boards go side by side.
+    """
+    best = None
+    for across in range(1, boards + 1):
+        down = math.ceil(boards / across)
+        grid_width, grid_height = grid_extent(cell_size, columns, rows, across, down)
+        width = max(minimum[0], grid_width + 2 * SIDE_PADDING)
+        height = max(minimum[1], top + grid_height + reserved)
+        share = max(width / screen[0], height / screen[1])
+        if best is None or share < best[0]:
+            best = (share, (width, height))
+    return best[1]
+
+
+class BoardLayout:
+    """Cell size and position for ``boards`` grids of ``columns`` x ``rows``, computed once.
+
+    The boards are tiled (picking the arrangement that gives the biggest
+    cells), centered horizontally and placed between ``top`` and
+    ``bottom``; cells keep their full size whenever everything fits.
+    """
+
+    __slots__ = ("size", "columns", "rows", "boards", "across", "cell_size", "margin", "gap",
+                 "left", "top")
+
+    def __init__(self, width, height, columns, rows, top, bottom, boards=1):
+        self.size = (width, height)
+        self.columns = columns
+        self.rows = rows
+        self.boards = boards
+        # Cell + margin pitch is CELL_SIZE + CELL_MARGIN at full size
+        ratio = CELL_MARGIN / CELL_SIZE
+        units = board_units(columns, rows)
+        best = None
+        for across in range(1, boards + 1):
+            down = math.ceil(boards / across)
+            fit_width = (width - 2 * SIDE_PADDING) / (across * units[0] + (across - 1) * BOARD_GAP)
+            fit_height = (bottom - top) / (down * units[1] + (down - 1) * BOARD_GAP)
+            size = min(CELL_SIZE, int(fit_width), int(fit_height))
+            # Rounded margins and gaps can come out a little wider than the estimate
+            while size > MIN_CELL_SIZE and any(
+                    extent > room for extent, room in zip(grid_extent(size, columns, rows, across, down),
+                                                          (width - 2 * SIDE_PADDING, bottom - top))):
+                size -= 1
+            if best is None or size > best[0]:
+                best = (size, across)
+        self.cell_size = max(MIN_CELL_SIZE, best[0])
+        self.across = best[1]
+        self.margin = round(self.cell_size * ratio)
+        self.gap = round(self.cell_size * BOARD_GAP)
+        self.left = (width - self.width) // 2
+        self.top = top
+
+    @property
+    def board_width(self):
+        return (self.cell_size + self.margin) * self.columns - self.margin
+
+    @property
+    def board_height(self):
+        return (self.cell_size + self.margin) * self.rows - self.margin
+
+    @property
+    def width(self):
+        return (self.board_width + self.gap) * self.across - self.gap
+
+    @property
+    def bottom(self):
+        down = math.ceil(self.boards / self.across)
+        return self.top + (self.board_height + self.gap) * down - self.gap
+
+    def cell_origin(self, row, col, board=0):
+        pitch = self.cell_size + self.margin
+        board_row, board_col = divmod(board, self.across)
+        return (self.left + board_col * (self.board_width + self.gap) + col * pitch,
+                self.top + board_row * (self.board_height + self.gap) + row * pitch)
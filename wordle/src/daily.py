@@ -0,0 +1,147 @@
+"""Daily puzzle: one answer per calendar date, identical on every machine.
+
+The answers are a curated subset of the word list (the ANSWER_COUNT most
+common words, leaving out plain plurals) in a fixed, seeded order. The
+order only depends on the words and DAILY_SEED, so clients agree on
+today's word without talking to anything. It is computed once and kept
+as data/daily_<length>.bin: a header, then one u16 word id per day, so a
+lookup is a single index by the number of days since EPOCH.
+
+Run from the 'src' directory to list upcoming answers:
+    python daily.py [YYYY-MM-DD] [--days N]
+"""
+import argparse
+import datetime
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+from assets import DATA_DIR, DEFAULT_WORD_LENGTH, load_lexicon
+from atomic_file import atomic_write
+
+EPOCH = datetime.date(2021, 6, 19)  # Puzzle #0
+DAILY_SEED = 20210619
+ANSWER_COUNT = 2315  # The calendar repeats after this many days
+
+# Header: magic, seed, word list digest, day count; then u16 word ids (little-endian)
+CALENDAR_MAGIC = b"DAY1"
+CALENDAR_HEADER = struct.Struct("<4sI8sI")
+
+
+def calendar_file(length, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"daily_{length}.bin")
+
+
+def words_digest(words):
+    """Identifies a word list, so a calendar built from a different one is rebuilt."""
+    return hashlib.sha256("\n".join(words).encode('ascii')).digest()[:8]
+
+
+def is_plural(word):
+    # Good enough for common words: CARDS and HOMES go, GLASS, BONUS and BASIS stay
+    return word.endswith("S") and word[-2] not in "SUI"
+
+
+def answer_pool(words, count=ANSWER_COUNT):
+    """The curated answers: the first ``count`` non-plural words of the frequency-ordered list."""
+    pool = []
+    for word in words:
+        if not is_plural(word):
+            pool.append(word)
+            if len(pool) == count:
+                break
+    return pool
+
+
+def shuffle_answers(pool, seed=DAILY_SEED):
+    """A seeded permutation that does not depend on the Python version or platform."""
+    return sorted(pool, key=lambda word: hashlib.sha256(f"{seed}:{word}".encode('ascii')).digest())
+
+
+class DailyCalendar:
+    """The answer for every day, as word ids into ``lexicon``."""
+
+    __slots__ = ("lexicon", "ids")
+
+    def __init__(self, lexicon, ids):
+        self.lexicon = lexicon
+        self.ids = ids
+
+    @classmethod
+    def build(cls, lexicon, seed=DAILY_SEED):
+        ids = array('H', (lexicon.ids[word] for word in shuffle_answers(answer_pool(lexicon.words), seed)))
+        return cls(lexicon, ids)
+
+    @classmethod
+    def load(cls, lexicon, data_dir=DATA_DIR, seed=DAILY_SEED):
+        """Reads the stored calendar, building and saving it first if it is missing or stale."""
+        path = calendar_file(lexicon.length, data_dir)
+        digest = words_digest(lexicon.words)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, file_seed, file_digest, count = CALENDAR_HEADER.unpack_from(data)
+            ids = array('H')
+            ids.frombytes(data[CALENDAR_HEADER.size:])
+            if sys.byteorder == "big":
+                ids.byteswap()
+            if (magic == CALENDAR_MAGIC and file_seed == seed and file_digest == digest
+                    and count == len(ids) and count):
+                return cls(lexicon, ids)
+        except (OSError, struct.error, ValueError):
+            pass
+        calendar = cls.build(lexicon, seed)
+        calendar.save(path, seed)
+        return calendar
+
+    def save(self, path, seed=DAILY_SEED):
+        ids = array('H', self.ids)
+        if sys.byteorder == "big":
+            ids.byteswap()
+        try:
+            with atomic_write(path) as f:
+                f.write(CALENDAR_HEADER.pack(CALENDAR_MAGIC, seed, words_digest(self.lexicon.words),
+                                             len(ids)))
+                f.write(ids.tobytes())
+        except OSError:
+            pass  # Rebuilt from the word list next time
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def puzzle_number(day):
+        return (day - EPOCH).days
+
+    def word_for(self, day):
+        """The answer on ``day`` (a datetime.date)."""
+        return self.lexicon.words[self.ids[self.puzzle_number(day) % len(self.ids)]]
+
+
+# --- Command line ---
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Daily puzzle answers")
+    parser.add_argument("date", nargs="?", type=datetime.date.fromisoformat,
+                        default=datetime.date.today(), help="YYYY-MM-DD (default: today)")
+    parser.add_argument("--days", type=int, default=1, help="how many days to list")
+    parser.add_argument("--length", type=int, default=DEFAULT_WORD_LENGTH, help="letters per word")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    lexicon = load_lexicon(args.length)
+    if lexicon is None:
+        print(f"Error: No {args.length}-letter word list in the data directory", file=sys.stderr)
+        return 1
+    calendar = DailyCalendar.load(lexicon)
+    for offset in range(args.days):
+        day = args.date + datetime.timedelta(days=offset)
+        print(f"{day.isoformat()}  #{DailyCalendar.puzzle_number(day)}  {calendar.word_for(day)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""Offline strategy search: a precomputed next guess for every reachable game state.
+
+Run from the 'src' directory:
+    python decision_tree.py                    # build data/tree-L5-....bin on all cores
+    python decision_tree.py --width 4 --answers daily
+    python decision_tree.py --show CRANE       # play CRANE from the stored tree
+
+The builder minimizes the total (so the average) number of guesses over
+the answers. Every node tries its ``width`` most informative guesses and
+recurses into each feedback class, pruning with the bound that a class of
+m answers needs at least 2m - 1 guesses. Subproblems are memoized by a
+fingerprint of their candidate set, and the classes below the opening
+guesses are solved in parallel, one process per core. Workers open the
+memory-mapped pattern cache themselves, as in simulate.py.
+
+The result is a flat array file: per node the guess id and a slice of
+sorted (pattern, child) edges, so a lookup is one binary search per row
+already played.
+"""
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from assets import DATA_DIR, DEFAULT_WORD_LENGTH, load_lexicon, word_list_file
+from atomic_file import atomic_write
+from daily import answer_pool, words_digest
+from patterns import all_correct, decode_pattern, load_pattern_table
+from solver import CELL_BUDGET, MIN_POOL, entropies, opening_scores
+
+DEFAULT_WIDTH = 3
+ANSWER_SETS = ("all", "daily")
+
+# Header: magic, word length, answer set, node count, edge count, word list digest;
+# then guess u16[nodes], first edge u32[nodes + 1], edge pattern u16[edges], edge child u32[edges]
+TREE_MAGIC = b"WDT1"
+TREE_HEADER = struct.Struct("<4sBBII8s")
+
+
+def tree_file(length, answers="all", data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"tree-L{length}-{answers}.bin")
+
+
+def fingerprint(ids):
+    """Identifies a (sorted) candidate set independently of how it was reached."""
+    return hashlib.blake2b(ids.tobytes(), digest_size=16).digest()
+
+
+def split(row, ids):
+    """Groups ``ids`` by their pattern in ``row``: [(pattern, ids)] in pattern order."""
+    patterns = row[ids]
+    order = np.argsort(patterns, kind='stable')
+    patterns = patterns[order]
+    ids = ids[order]
+    starts = np.flatnonzero(np.r_[True, patterns[1:] != patterns[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    return [(int(patterns[s]), np.sort(ids[s:e])) for s, e in zip(starts, ends)]
+
+
+class TreeSearch:
+    """Memoized search for the guess that minimizes the total guesses over a candidate set."""
+
+    def __init__(self, table, width=DEFAULT_WIDTH):
+        self.table = table
+        self.width = width
+        self.n_patterns = 3 ** table.lexicon.length
+        self.solved = all_correct(table.lexicon.length)
+        self.opening = opening_scores(table)
+        self.memo = {}
+
+    def guesses_for(self, ids):
+        """The ``width`` most informative guesses for ``ids``, preferring possible answers on ties."""
+        n = len(ids)
+        words = len(self.table.lexicon)
+        pool_size = max(MIN_POOL, CELL_BUDGET // n)
+        if pool_size >= words:
+            pool = np.arange(words, dtype=np.int32)
+        else:
+            top = np.argpartition(-self.opening, pool_size)[:pool_size].astype(np.int32)
+            pool = np.union1d(top, ids)
+        scores = entropies(self.table.matrix, pool, ids, self.n_patterns)
+        scores = scores + np.isin(pool, ids) * (1.0 / n)
+        order = np.lexsort((pool, -scores))
+        # A guess that cannot split the set (no information, not a candidate) never helps
+        return [int(pool[i]) for i in order[:self.width] if scores[i] > 0]
+
+    def solve(self, ids):
+        """(total guesses to solve every answer in ``ids``, first guess id)."""
+        n = len(ids)
+        if n <= 2:
+            # Guess one of them: 1 guess, or 1 + 2 for a pair
+            return 2 * n - 1, int(ids[0])
+        key = fingerprint(ids)
+        hit = self.memo.get(key)
+        if hit is not None:
+            return hit
+        best = (float('inf'), None)
+        matrix = self.table.matrix
+        for guess in self.guesses_for(ids):
+            classes = [(p, c) for p, c in split(matrix[guess], ids) if p != self.solved]
+            # Every answer pays for this guess; each class then needs at least 2m - 1 more
+            cost = n
+            bound = cost + sum(2 * len(c) - 1 for _, c in classes)
+            for _, members in classes:
+                if bound >= best[0]:
+                    break
+                sub_cost, _ = self.solve(members)
+                cost += sub_cost
+                bound += sub_cost - (2 * len(members) - 1)
+            else:
+                if cost < best[0]:
+                    best = (cost, guess)
+                    if cost == 2 * n - 1:
+                        break  # Cannot be beaten
+        self.memo[key] = best
+        return best
+
+    def choice(self, ids):
+        """The first guess chosen for ``ids`` (after solve())."""
+        if len(ids) <= 2:
+            return int(ids[0])
+        return self.memo[fingerprint(ids)][1]
+
+    def entries(self, ids):
+        """The memo entries of the chosen subtree below ``ids`` (to ship between processes)."""
+        out = []
+        stack = [ids]
+        while stack:
+            ids = stack.pop()
+            if len(ids) <= 2:
+                continue
+            key = fingerprint(ids)
+            cost, guess = self.memo[key]
+            out.append((key, cost, guess))
+            stack.extend(c for p, c in split(self.table.matrix[guess], ids) if p != self.solved)
+        return out
+
+
+# --- Parallel build ---
+# Per-process search, set up once by _init_worker()
+_search = None
+
+
+def _init_worker(length, width):
+    global _search
+    lexicon = load_lexicon(length)
+    _search = TreeSearch(load_pattern_table(lexicon, word_list_file(length), DATA_DIR), width)
+
+
+def _solve_class(ids):
+    cost, _ = _search.solve(ids)
+    return cost, _search.entries(ids)
+
+
+def build(table, answer_ids, width=DEFAULT_WIDTH, workers=None, opener=None, progress=None):
+    """Searches the strategy for ``answer_ids``. Returns (TreeSearch with the chosen tree, total cost)."""
+    search = TreeSearch(table, width)
+    root = np.sort(np.asarray(answer_ids, dtype=np.int32))
+    openers = [opener] if opener is not None else search.guesses_for(root)
+    jobs = []
+    for guess in openers:
+        for pattern, members in split(table.matrix[guess], root):
+            if pattern != search.solved:
+                jobs.append((guess, members))
+    # Biggest classes first, so no worker is left with a long one at the end
+    jobs.sort(key=lambda job: -len(job[1]))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = []
+        for i, (_, members) in enumerate(jobs):
+            cost, _ = search.solve(members)
+            results.append((cost, search.entries(members)))
+            if progress:
+                progress(i + 1, len(jobs))
+    else:
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(table.lexicon.length, width)) as pool:
+            for i, result in enumerate(pool.map(_solve_class, [m for _, m in jobs], chunksize=1)):
+                results.append(result)
+                if progress:
+                    progress(i + 1, len(jobs))
+    totals = {guess: len(root) for guess in openers}
+    for (guess, _), (cost, entries) in zip(jobs, results):
+        totals[guess] += cost
+        for key, sub_cost, sub_guess in entries:
+            search.memo[key] = (sub_cost, sub_guess)
+    best = min(openers, key=lambda g: (totals[g], g))
+    search.memo[fingerprint(root)] = (totals[best], best)
+    return search, root, totals[best]
+
+
+# --- Flat-array tree file ---
+class StrategyTree:
+    """A stored strategy: node 0 is the opening; edges are sorted by pattern per node."""
+
+    __slots__ = ("lexicon", "guesses", "first_edge", "edge_patterns", "edge_children")
+
+    def __init__(self, lexicon, guesses, first_edge, edge_patterns, edge_children):
+        self.lexicon = lexicon
+        self.guesses = guesses
+        self.first_edge = first_edge
+        self.edge_patterns = edge_patterns
+        self.edge_children = edge_children
+
+    @classmethod
+    def from_search(cls, search, root):
+        """Lays the chosen subtree out breadth-first."""
+        guesses, first_edge = array('H'), array('I', [0])
+        edge_patterns, edge_children = array('H'), array('I')
+        queue = [root]
+        for ids in queue:  # The queue grows while we walk it
+            guess = search.choice(ids)
+            guesses.append(guess)
+            for pattern, members in split(search.table.matrix[guess], ids):
+                if pattern != search.solved:
+                    edge_patterns.append(pattern)
+                    edge_children.append(len(queue))
+                    queue.append(members)
+            first_edge.append(len(edge_patterns))
+        return cls(search.table.lexicon, guesses, first_edge, edge_patterns, edge_children)
+
+    def __len__(self):
+        return len(self.guesses)
+
+    def node_for(self, history):
+        """The node reached by ``history`` [(guess, pattern)...], or None if it left the tree."""
+        words = self.lexicon.words
+        node = 0
+        for guess, pattern in history:
+            if words[self.guesses[node]] != guess:
+                return None
+            start, end = self.first_edge[node], self.first_edge[node + 1]
+            i = bisect_left(self.edge_patterns, pattern, start, end)
+            if i == end or self.edge_patterns[i] != pattern:
+                return None
+            node = self.edge_children[i]
+        return node
+
+    def best_guess(self, history=()):
+        """The stored next guess after ``history``, or None if it is not in the tree."""
+        node = self.node_for(history)
+        return None if node is None else self.lexicon.words[self.guesses[node]]
+
+    def save(self, path, answers="all"):
+        arrays = [self.guesses, self.first_edge, self.edge_patterns, self.edge_children]
+        if sys.byteorder == "big":
+            arrays = [array(a.typecode, a) for a in arrays]
+            for a in arrays:
+                a.byteswap()
+        header = TREE_HEADER.pack(TREE_MAGIC, self.lexicon.length, ANSWER_SETS.index(answers),
+                                  len(self.guesses), len(self.edge_patterns),
+                                  words_digest(self.lexicon.words))
+        with atomic_write(path) as f:
+            f.write(header)
+            for a in arrays:
+                f.write(a.tobytes())
+
+    @classmethod
+    def load(cls, lexicon, path):
+        """Reads a tree file; None if it is missing, damaged or for a different word list."""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, length, _, nodes, edges, digest = TREE_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != TREE_MAGIC or length != lexicon.length or digest != words_digest(lexicon.words):
+            return None
+        arrays = []
+        offset = TREE_HEADER.size
+        for typecode, count in (('H', nodes), ('I', nodes + 1), ('H', edges), ('I', edges)):
+            a = array(typecode)
+            size = a.itemsize * count
+            a.frombytes(data[offset:offset + size])
+            if len(a) != count:
+                return None
+            if sys.byteorder == "big":
+                a.byteswap()
+            arrays.append(a)
+            offset += size
+        return cls(lexicon, *arrays)
+
+
+def load_tree(lexicon, answers="all", data_dir=DATA_DIR):
+    return StrategyTree.load(lexicon, tree_file(lexicon.length, answers, data_dir))
+
+
+def play(tree, table, target):
+    """Plays ``target`` from the tree. Returns the guesses made (empty if it leaves the tree)."""
+    solved = all_correct(tree.lexicon.length)
+    history, guesses = [], []
+    while True:
+        guess = tree.best_guess(history)
+        if guess is None:
+            return []
+        guesses.append(guess)
+        pattern = table.pattern(guess, target)
+        if pattern == solved:
+            return guesses
+        history.append((guess, pattern))
+
+
+# --- Command line ---
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build or inspect the precomputed strategy tree")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="guesses tried per state")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--answers", choices=ANSWER_SETS, default="all",
+                        help="answers to plan for: every word, or the daily puzzle pool")
+    parser.add_argument("--opener", help="fix the first guess instead of searching for it")
+    parser.add_argument("--length", type=int, default=DEFAULT_WORD_LENGTH, help="letters per word")
+    parser.add_argument("--show", metavar="WORD", help="play WORD from the stored tree instead of building")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    lexicon = load_lexicon(args.length)
+    if lexicon is None:
+        print(f"Error: No {args.length}-letter word list in the data directory", file=sys.stderr)
+        return 1
+    table = load_pattern_table(lexicon, word_list_file(args.length), DATA_DIR)
+    path = tree_file(args.length, args.answers)
+
+    if args.show:
+        tree = StrategyTree.load(lexicon, path)
+        target = args.show.upper()
+        if tree is None:
+            print(f"Error: No strategy tree at {path}; build it first", file=sys.stderr)
+            return 1
+        guesses = play(tree, table, target)
+        if not guesses:
+            print(f"'{target}' is not covered by the {args.answers} tree", file=sys.stderr)
+            return 1
+        for row, guess in enumerate(guesses, 1):
+            marks = decode_pattern(table.pattern(guess, target), lexicon.length)
+            print(f"{row}. {guess} {''.join('.yg'[m] for m in marks)}")
+        return 0
+
+    if args.opener and args.opener.upper() not in lexicon:
+        print(f"Error: '{args.opener}' is not in the word list", file=sys.stderr)
+        return 1
+    if args.answers == "daily":
+        answer_ids = [lexicon.ids[w] for w in answer_pool(lexicon.words)]
+    else:
+        answer_ids = range(len(lexicon))
+    opener = lexicon.ids[args.opener.upper()] if args.opener else None
+    workers = args.workers or os.cpu_count() or 1
+
+    def progress(done, total):
+        print(f"\r{done}/{total} subproblems", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    search, root, total = build(table, answer_ids, args.width, workers, opener, progress)
+    print(file=sys.stderr)
+    tree = StrategyTree.from_search(search, root)
+    tree.save(path, args.answers)
+    depth = max(len(play(tree, table, lexicon.words[i])) for i in root.tolist())
+    print(f"{len(root)} answers: {total / len(root):.4f} guesses on average, at most {depth}; "
+          f"opener {lexicon.words[tree.guesses[0]]}")
+    print(f"{len(tree)} nodes, {os.path.getsize(path)} bytes -> {path} "
+          f"({time.perf_counter() - start:.1f}s, {workers} workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
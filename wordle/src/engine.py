@@ -0,0 +1,338 @@
+"""Headless Wordle game engine. Pure Python, no pygame dependency."""
+import random
+
+# Tile marks for a submitted letter
+ABSENT, PRESENT, CORRECT = 0, 1, 2
+
+# Keyboard letter states (SPLIT is the green/yellow split key)
+KEY_UNUSED, KEY_ABSENT, KEY_PRESENT, KEY_CORRECT, KEY_SPLIT = range(5)
+
+# Game status
+PLAYING, WON, LOST = range(3)
+
+GRID_ROWS = 6
+
+_A = ord('A')
+
+ORDINALS = ("1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th")
+
+
+class Constraints:
+    """Everything the revealed tiles say about the target, kept as lexicon bitmasks.
+
+    ``update()`` folds in one scored row with O(word length) mask ANDs, so
+    nothing ever rescans earlier rows. Two masks are maintained:
+
+    - ``hard_mask``: words allowed in Hard Mode (greens kept in place,
+      yellows reused), the same rule the NYT game applies.
+    - ``candidate_mask``: words that could still be the target (adds the
+      forbidden positions and the max letter counts learned from grays).
+    """
+
+    __slots__ = ("lexicon", "fixed", "min_counts", "max_counts", "forbidden",
+                 "hard_mask", "candidate_mask")
+
+    def __init__(self, lexicon):
+        self.lexicon = lexicon
+        self.reset()
+
+    def reset(self):
+        length = self.lexicon.length
+        self.fixed = [None] * length                # Green letter per position
+        self.min_counts = bytearray(26)             # Letter appears at least n times
+        self.max_counts = bytearray([length] * 26)  # ...and at most n times
+        self.forbidden = [0] * length               # 26-bit letter set per position
+        self.hard_mask = self.lexicon.all_mask
+        self.candidate_mask = self.lexicon.all_mask
+
+    def update(self, guess, marks):
+        """Adds the constraints revealed by one scored row."""
+        lexicon = self.lexicon
+        position_masks = lexicon.position_masks
+        hard = self.hard_mask
+        candidates = self.candidate_mask
+        found = {}
+        capped = set()
+        for pos, (letter, mark) in enumerate(zip(guess, marks)):
+            if mark == CORRECT:
+                found[letter] = found.get(letter, 0) + 1
+                if self.fixed[pos] is None:
+                    self.fixed[pos] = letter
+                    hard &= position_masks[pos][letter]
+                    candidates &= position_masks[pos][letter]
+                continue
+            bit = 1 << (ord(letter) - _A)
+            if not self.forbidden[pos] & bit:
+                self.forbidden[pos] |= bit
+                candidates &= ~position_masks[pos][letter]
+            if mark == PRESENT:
+                found[letter] = found.get(letter, 0) + 1
+            elif mark == ABSENT:
+                capped.add(letter)
+        for letter, n in found.items():
+            k = ord(letter) - _A
+            if n > self.min_counts[k]:
+                self.min_counts[k] = n
+                required = lexicon.with_at_least(letter, n)
+                hard &= required
+                candidates &= required
+        for letter in capped:
+            # A gray copy means the target has exactly as many as were marked
+            k = ord(letter) - _A
+            n = found.get(letter, 0)
+            if n < self.max_counts[k]:
+                self.max_counts[k] = n
+                candidates &= ~lexicon.with_at_least(letter, n + 1)
+        self.hard_mask = hard
+        self.candidate_mask = candidates
+
+    def allows(self, word):
+        """True if ``word`` is a legal Hard Mode guess (one bit test)."""
+        word_id = self.lexicon.id_of(word)
+        return word_id is not None and (self.hard_mask >> word_id) & 1 == 1
+
+    def violation(self, word):
+        """Returns the Hard Mode message for ``word``, or None if it is allowed."""
+        if self.allows(word):
+            return None
+        for pos, letter in enumerate(self.fixed):
+            if letter is not None and word[pos] != letter:
+                return f"{ORDINALS[pos]} letter must be {letter}"
+        for k, n in enumerate(self.min_counts):
+            letter = chr(_A + k)
+            if n and word.count(letter) < n:
+                return f"Guess must contain {letter}" if n == 1 else f"Guess must contain {n} {letter}s"
+        return "Not in word list"
+
+    @property
+    def candidate_count(self):
+        return self.candidate_mask.bit_count()
+
+    def candidates(self):
+        return self.lexicon.words_in(self.candidate_mask)
+
+
+def score_guess(guess, target):
+    """Returns the list of tile marks for ``guess`` against ``target``.
+
+    Two passes, exactly like the original check_guess(): greens first, then
+    yellows consume the remaining target letters from left to right.
+    """
+    if guess == target:
+        return [CORRECT] * len(guess)
+    if len(set(guess)) == len(guess):
+        # No repeated guess letters (two words in three): a letter that is not
+        # green can only be matched by a target copy no green used up
+        return [CORRECT if letter == target_letter else PRESENT if letter in target else ABSENT
+                for letter, target_letter in zip(guess, target)]
+    marks = [ABSENT] * len(guess)
+    remaining = ""  # Target letters not matched by a green
+    for i, target_letter in enumerate(target):
+        if guess[i] == target_letter:
+            marks[i] = CORRECT
+        else:
+            remaining += target_letter
+    for i, letter in enumerate(guess):
+        if marks[i] == ABSENT and letter in remaining:
+            marks[i] = PRESENT
+            remaining = remaining.replace(letter, "", 1)
+    return marks
+
+
+class WordleGame:
+    """State and rules for a single Wordle board.
+
+    The GUI reads ``guesses``/``marks``/``current`` to draw the grid and
+    ``key_state()`` for the keyboard; headless callers can use ``guess()``.
+    Every cell a move touches is remembered until ``take_changed_cells()``,
+    so the GUI can redraw those instead of comparing the whole grid.
+    """
+
+    __slots__ = (
+        "lexicon", "rng", "rows", "target", "guesses", "marks",
+        "current", "status", "message", "hard_mode", "_keys", "_keys_rows",
+        "_constraints", "_constraint_rows", "_changed",
+    )
+
+    def __init__(self, lexicon, rows=GRID_ROWS, rng=None, target=None, hard_mode=False):
+        self.lexicon = lexicon
+        self.rng = rng if rng is not None else random.Random()
+        self.rows = rows
+        self.hard_mode = hard_mode
+        self._constraints = None
+        self.reset(target)
+
+    def reset(self, target=None):
+        """Starts a new round, with a random target unless one is given."""
+        self.target = target if target is not None else self.rng.choice(self.lexicon.words)
+        self.guesses = []
+        self.marks = []
+        self.current = []
+        self._keys = bytearray(26)
+        self._keys_rows = 0
+        self._constraint_rows = 0
+        self.status = PLAYING
+        self.message = ""
+        self._changed = None  # Every cell
+
+    @property
+    def word_length(self):
+        return self.lexicon.length
+
+    @property
+    def row(self):
+        return len(self.guesses)
+
+    @property
+    def col(self):
+        return len(self.current)
+
+    @property
+    def game_over(self):
+        return self.status != PLAYING
+
+    @property
+    def boards(self):
+        """The panels to draw; a single game is its own only board (see multiboard.py)."""
+        return (self,)
+
+    @property
+    def keys(self):
+        """Per-letter keyboard states (A-Z), brought up to date on demand."""
+        # Headless play never looks at the keyboard, so rows are folded in lazily
+        while self._keys_rows < len(self.guesses):
+            row = self._keys_rows
+            self._update_keys(self.guesses[row], self.marks[row])
+            self._keys_rows = row + 1
+        return self._keys
+
+    @property
+    def constraints(self):
+        """What the revealed tiles imply (see Constraints), brought up to date on demand."""
+        if self._constraints is None:
+            self._constraints = Constraints(self.lexicon)
+        elif self._constraint_rows == 0:
+            self._constraints.reset()
+        constraints = self._constraints
+        # Folded in lazily, one row at a time, like the keyboard states
+        while self._constraint_rows < len(self.guesses):
+            row = self._constraint_rows
+            constraints.update(self.guesses[row], self.marks[row])
+            self._constraint_rows = row + 1
+        return constraints
+
+    def key_state(self, letter):
+        return self.keys[ord(letter) - _A]
+
+    def cell(self, row, col):
+        """Returns (letter, mark) for a grid cell; mark is None until submitted."""
+        if row < len(self.guesses):
+            return self.guesses[row][col], self.marks[row][col]
+        if row == len(self.guesses) and col < len(self.current):
+            return self.current[col], None
+        return "", None
+
+    def take_changed_cells(self):
+        """The (board, row, col) cells changed since the last call, or None if any cell may have.
+
+        A single game is board 0. None follows a reset (or restore).
+        """
+        changed, self._changed = self._changed, set()
+        return None if changed is None else {(0, row, col) for row, col in changed}
+
+    def _touch(self, row, cols):
+        if self._changed is not None:
+            self._changed.update((row, col) for col in cols)
+
+    # --- Input ---
+    def type_letter(self, letter):
+        """Adds a letter to the current row. Returns True if it was accepted."""
+        if self.status != PLAYING or len(self.current) >= self.lexicon.length:
+            return False
+        self.current.append(letter)
+        self._touch(len(self.guesses), (len(self.current) - 1,))
+        self.message = ""
+        return True
+
+    def delete_letter(self):
+        """Removes the last letter of the current row. Returns True if one was removed."""
+        if self.status != PLAYING or not self.current:
+            return False
+        self.current.pop()
+        self._touch(len(self.guesses), (len(self.current),))
+        self.message = ""
+        return True
+
+    def submit(self):
+        """Scores the current row. Returns the marks, or None if it was rejected."""
+        if self.status != PLAYING:
+            return None
+        if len(self.current) != self.lexicon.length:
+            self.message = "Word too short"
+            return None
+        return self.guess("".join(self.current))
+
+    def guess(self, word):
+        """Submits a whole word at once (headless play)."""
+        if self.status != PLAYING:
+            return None
+        if word not in self.lexicon:
+            self.message = "Not in word list"
+            return None
+        if self.hard_mode and self.guesses:
+            violation = self.constraints.violation(word)
+            if violation:
+                self.message = violation
+                return None
+        return self._apply(word, score_guess(word, self.target))
+
+    def restore(self, target, guesses, marks=None, current=""):
+        """Rebuilds a game from its history (used by save/resume and replays).
+
+        ``marks`` may be passed to skip rescoring when they are already known.
+        """
+        self.reset(target)
+        for row, guess in enumerate(guesses):
+            self._apply(guess, marks[row] if marks is not None else score_guess(guess, target))
+        if self.status == PLAYING:
+            self.current = list(current)
+
+    def _apply(self, guess, marks):
+        if self._changed is not None:
+            self._touch(len(self.guesses), range(len(guess)))
+        self.guesses.append(guess)
+        self.marks.append(marks)
+        self.current = []
+
+        if guess == self.target:
+            self.status = WON
+            self.message = "You Win!"
+        elif len(self.guesses) == self.rows:
+            self.status = LOST
+            self.message = f"Game Over! Word: {self.target}"
+        else:
+            self.message = ""
+        return marks
+
+    def _update_keys(self, guess, marks):
+        keys = self._keys
+        codes = guess.encode('ascii')
+        # Greens first: upgrade yellow keys to split, otherwise set green
+        if CORRECT in marks:
+            for code, mark in zip(codes, marks):
+                if mark == CORRECT:
+                    k = code - _A
+                    keys[k] = KEY_SPLIT if keys[k] == KEY_PRESENT else KEY_CORRECT
+        # Then yellows and grays in order
+        for code, mark in zip(codes, marks):
+            if mark == PRESENT:
+                k = code - _A
+                state = keys[k]
+                if state == KEY_CORRECT:
+                    keys[k] = KEY_SPLIT
+                elif state == KEY_UNUSED or state == KEY_ABSENT:
+                    keys[k] = KEY_PRESENT
+            elif mark == ABSENT:
+                k = code - _A
+                if keys[k] == KEY_UNUSED:
+                    keys[k] = KEY_ABSENT
@@ -0,0 +1,68 @@
+"""On-screen keyboard geometry, shared by drawing and mouse hit-testing."""
+from bisect import bisect_right
+
+# Keyboard layout (as a list of lists for easier processing)
+KEYBOARD_ROWS = (
+    ('Q', 'W', 'E', 'R', 'T', 'Y', 'U', 'I', 'O', 'P'),
+    ('A', 'S', 'D', 'F', 'G', 'H', 'J', 'K', 'L'),
+    ('ENTER', 'Z', 'X', 'C', 'V', 'B', 'N', 'M', 'DEL'),
+)
+
+KEY_HEIGHT = 50
+KEY_MARGIN = 6
+KEY_WIDTH = 40          # Width for regular keys
+SPECIAL_KEY_WIDTH = 65  # Width for ENTER and DEL
+SPECIAL_KEYS = ('ENTER', 'DEL')
+BOTTOM_PADDING = 60     # Space left under the keyboard for the toggles
+
+
+class KeyboardLayout:
+    """Key rectangles for one window size, computed once.
+
+    ``rects`` maps each key label to an (x, y, width, height) tuple.
+    key_at() finds the row from the y band and the key by binary search on
+    the row's key start positions, without building any Rect objects.
+    """
+
+    __slots__ = ("size", "rows", "top", "rects", "row_starts", "row_keys")
+
+    def __init__(self, width, height, rows=KEYBOARD_ROWS):
+        self.size = (width, height)
+        self.rows = rows
+        # Position the keyboard near the bottom of the window
+        self.top = height - (KEY_HEIGHT + KEY_MARGIN) * len(rows) - BOTTOM_PADDING
+        self.rects = {}
+        self.row_starts = []
+        self.row_keys = []
+
+        for row_idx, row in enumerate(rows):
+            widths = [SPECIAL_KEY_WIDTH if key in SPECIAL_KEYS else KEY_WIDTH for key in row]
+            row_width = sum(widths) + KEY_MARGIN * (len(row) - 1)
+            # Center the row horizontally
+            x = (width - row_width) // 2
+            y = self.top + row_idx * (KEY_HEIGHT + KEY_MARGIN)
+            starts = []
+            for key, key_width in zip(row, widths):
+                self.rects[key] = (x, y, key_width, KEY_HEIGHT)
+                starts.append(x)
+                x += key_width + KEY_MARGIN
+            self.row_starts.append(starts)
+            self.row_keys.append(row)
+
+    def key_at(self, pos):
+        """Returns the key label under ``pos``, or None for a miss."""
+        px, py = pos
+        offset = py - self.top
+        if offset < 0:
+            return None
+        row_idx, within = divmod(offset, KEY_HEIGHT + KEY_MARGIN)
+        if row_idx >= len(self.rows) or within >= KEY_HEIGHT:
+            return None
+        starts = self.row_starts[row_idx]
+        i = bisect_right(starts, px) - 1
+        if i < 0:
+            return None
+        key = self.row_keys[row_idx][i]
+        if px >= starts[i] + self.rects[key][2]:
+            return None  # In the margin after the key
+        return key
@@ -0,0 +1,110 @@
+"""Hash-indexed word lexicon used for guess validation and pattern queries."""
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+WILDCARDS = "?._*"
+
+
+class Lexicon:
+    """Immutable word list with O(1) membership and bitmask indexes.
+
+    Every word gets a stable integer id (its position in the source list).
+    For each (position, letter) pair we keep a Python int whose bit ``i`` is
+    set when word ``i`` has that letter at that position, so pattern and
+    prefix queries are a handful of big-int ANDs instead of a list rescan.
+    ``count_masks[letter][k]`` likewise holds the words containing ``letter``
+    at least ``k`` times (index 0 is every word).
+    """
+
+    __slots__ = ("words", "word_set", "ids", "length", "position_masks", "count_masks", "all_mask")
+
+    def __init__(self, words):
+        words = tuple(words)
+        if not words:
+            raise ValueError("Lexicon needs at least one word")
+        length = len(words[0])
+        if any(len(word) != length for word in words):
+            raise ValueError("All lexicon words must have the same length")
+
+        self.words = words
+        self.word_set = frozenset(words)
+        self.ids = {}
+        for word_id, word in enumerate(words):
+            # Keep the first id if the source list contains duplicates
+            self.ids.setdefault(word, word_id)
+        self.length = length
+        self.all_mask = (1 << len(words)) - 1
+
+        # Build per-position/per-letter and per-letter-count bitmasks in one pass
+        position_masks = [dict.fromkeys(ALPHABET, 0) for _ in range(length)]
+        count_masks = {letter: [self.all_mask] + [0] * length for letter in ALPHABET}
+        for word_id, word in enumerate(words):
+            bit = 1 << word_id
+            seen = {}
+            for pos, letter in enumerate(word):
+                position_masks[pos][letter] = position_masks[pos].get(letter, 0) | bit
+                n = seen[letter] = seen.get(letter, 0) + 1
+                counts = count_masks.setdefault(letter, [self.all_mask] + [0] * length)
+                counts[n] |= bit
+        self.position_masks = tuple(position_masks)
+        self.count_masks = count_masks
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.word_set
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def id_of(self, word):
+        """Returns the stable id of ``word``, or None if it is not in the lexicon."""
+        return self.ids.get(word)
+
+    def word_of(self, word_id):
+        return self.words[word_id]
+
+    def mask_for(self, pattern):
+        """Returns the bitmask of words matching a pattern such as "A?E??"."""
+        pattern = pattern.upper()
+        if len(pattern) > self.length:
+            return 0
+        mask = self.all_mask
+        for pos, letter in enumerate(pattern):
+            if letter in WILDCARDS:
+                continue
+            mask &= self.position_masks[pos].get(letter, 0)
+            if not mask:
+                break
+        return mask
+
+    def words_in(self, mask):
+        """Expands a word bitmask back into the matching words, in id order."""
+        words = self.words
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(words[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def match(self, pattern):
+        """Returns all words matching a positional pattern ('?' is a wildcard)."""
+        return self.words_in(self.mask_for(pattern))
+
+    def with_prefix(self, prefix):
+        """Returns all words starting with ``prefix``."""
+        return self.match(prefix)
+
+    def with_at_least(self, letter, n):
+        """Returns the bitmask of words containing ``letter`` at least ``n`` times."""
+        if n <= 0:
+            return self.all_mask
+        if n > self.length:
+            return 0
+        counts = self.count_masks.get(letter)
+        return counts[n] if counts else 0
+
+    def count(self, pattern):
+        """Returns the number of words matching a positional pattern."""
+        return self.mask_for(pattern).bit_count()
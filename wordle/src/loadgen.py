@@ -0,0 +1,168 @@
+"""Load generator for server.py: N bots in M rooms, reporting guess round-trip latency.
+
+Run from the 'src' directory (start the server first):
+    python loadgen.py --bots 2000 --rooms 500 --duration 20
+    python loadgen.py --spawn-server --bots 500     # runs a server in this process too
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from assets import DEFAULT_WORD_LENGTH, load_lexicon
+from netclient import parse_address
+from server import DEFAULT_PORT, RaceServer, decode_message, encode_message
+
+# Stagger connections so the server's accept queue is not flooded at once
+CONNECT_BATCH = 200
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class Bot:
+    """Plays random dictionary words in a room and records each guess round trip.
+
+    One task reads (broadcasts are only sniffed, not parsed); another sends
+    a guess, waits for its answer, then "thinks" before the next one.
+    """
+
+    def __init__(self, host, port, room, name, words, think, rng):
+        self.host = host
+        self.port = port
+        self.room = room
+        self.name = name
+        self.words = words
+        self.think = think
+        self.rng = rng
+        self.latencies = []
+        self.errors = 0
+        self.updates = 0
+        self.answer = None
+        self.new_round = asyncio.Event()
+
+    async def run(self, stop_at):
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=1 << 20)
+        writer.write(encode_message({"op": "join", "room": self.room, "name": self.name}))
+        player = asyncio.create_task(self._play(writer, stop_at))
+        try:
+            async for line in reader:
+                if line.startswith(b'{"op":"updates"'):
+                    self.updates += 1
+                    if b'"type":"round"' in line:
+                        self.new_round.set()
+                    continue
+                message = decode_message(line)
+                if message.get("op") in ("result", "error") and self.answer and not self.answer.done():
+                    self.answer.set_result(message)
+        except ConnectionError:
+            pass
+        finally:
+            player.cancel()
+            writer.close()
+
+    async def _play(self, writer, stop_at):
+        loop = asyncio.get_running_loop()
+        seq = 0
+        try:
+            while loop.time() < stop_at:
+                await asyncio.sleep(self.rng.uniform(0, 2 * self.think))
+                seq += 1
+                self.answer = loop.create_future()
+                sent_at = time.perf_counter()
+                writer.write(encode_message({"op": "guess", "seq": seq, "word": self.rng.choice(self.words)}))
+                message = await asyncio.wait_for(self.answer, max(0.001, stop_at - loop.time()))
+                self.latencies.append(time.perf_counter() - sent_at)
+                if message["op"] == "error" or message["status"] != 0:
+                    # Round over (or our board is done): sit out until the next round starts
+                    self.errors += message["op"] == "error"
+                    self.new_round.clear()
+                    await asyncio.wait_for(self.new_round.wait(), max(0.001, stop_at - loop.time()))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            writer.close()
+
+
+async def run_bots(host, port, bots, rooms, duration, think, seed, words):
+    rng = random.Random(seed)
+    stop_at = asyncio.get_running_loop().time() + duration
+    fleet = [Bot(host, port, f"room{i % rooms}", f"bot{i}", words, think, random.Random(rng.random()))
+             for i in range(bots)]
+    tasks = []
+    for start in range(0, bots, CONNECT_BATCH):
+        for bot in fleet[start:start + CONNECT_BATCH]:
+            tasks.append(asyncio.create_task(bot.run(stop_at)))
+        await asyncio.sleep(0.05)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    return fleet, failures
+
+
+def summarize(fleet, failures, duration):
+    latencies = sorted(lat for bot in fleet for lat in bot.latencies)
+    return {
+        "bots": len(fleet),
+        "failed_bots": len(failures),
+        "guesses": len(latencies),
+        "guesses_per_s": len(latencies) / duration,
+        "rejected": sum(bot.errors for bot in fleet),
+        "broadcasts": sum(bot.updates for bot in fleet),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0) * 1000,
+    }
+
+
+async def main_async(args):
+    lexicon = load_lexicon(DEFAULT_WORD_LENGTH)
+    if lexicon is None:
+        print("Error: No word list in the data directory", file=sys.stderr)
+        return 1
+    host, port = parse_address(args.server)
+    server = None
+    if args.spawn_server:
+        race = RaceServer(lexicon)
+        server = await asyncio.start_server(race.handle_client, host, port, backlog=4096)
+    try:
+        fleet, failures = await run_bots(host, port, args.bots, args.rooms, args.duration,
+                                         args.think, args.seed, lexicon.words)
+    finally:
+        if server:
+            server.close()
+    if failures:
+        print(f"Warning: {len(failures)} bots failed, e.g. {failures[0]!r}", file=sys.stderr)
+    report = summarize(fleet, failures, args.duration)
+    if args.json:
+        print(json.dumps(report, indent=1))
+    else:
+        print(f"{report['bots']} bots in {args.rooms} rooms for {args.duration:.0f} s: "
+              f"{report['guesses']} guesses ({report['guesses_per_s']:.0f}/s), "
+              f"{report['broadcasts']} broadcasts received")
+        print(f"guess round trip: p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, "
+              f"max {report['max_ms']:.2f} ms")
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Wordle race server load generator")
+    parser.add_argument("--server", default=f"localhost:{DEFAULT_PORT}", help="host[:port]")
+    parser.add_argument("--bots", type=int, default=1000)
+    parser.add_argument("--rooms", type=int, default=250)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds")
+    parser.add_argument("--think", type=float, default=0.5, help="mean seconds between a bot's guesses")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="run the server in this process (measures both sides on one core)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_async(parse_args(sys.argv[1:]))))
@@ -1,90 +1,50 @@
+import argparse
+import datetime
+import threading
+import time
+
+# Startup instrumentation counts from here (the earliest point we control)
+_launch_ns = time.perf_counter_ns()
+
 import pygame
-import random
 import sys
 import os
-import urllib.request 
-
-# Define file paths and URLs
-try:
-    # This is the 'src' directory
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-except NameError:
-    # Fallback for interactive interpreters
-    script_dir = os.path.abspath(os.getcwd())
-
-# This is the project root (WORDLE/)
-project_root = os.path.dirname(script_dir)
-DATA_DIR = os.path.join(project_root, 'data')
-
-# Define the files needed from the GitHub repo
-# Using the specific branch from your request
-BASE_URL = "https://raw.githubusercontent.com/whelxi/Wordle/refs/heads/main/wordle/data/"
-REQUIRED_FILES = {
-    "word_list_5.txt": BASE_URL + "word_list_5.txt",
-    "keypress.mp3": BASE_URL + "keypress.mp3",
-    "keypress2.mp3": BASE_URL + "keypress2.mp3"
-}
-
-def check_and_download_data():
-    """Checks for the data directory and required files, downloads them if missing."""
-    print("--- Checking for required game files... ---")
-    
-    # 1. Check for data directory
-    if not os.path.exists(DATA_DIR):
-        print(f"Data directory not found. Creating '{DATA_DIR}'...")
-        try:
-            os.makedirs(DATA_DIR)
-        except Exception as e:
-            print(f"FATAL: Could not create data directory. Error: {e}", file=sys.stderr)
-            print("Please create the 'data' directory manually in the project root.")
-            sys.exit(1)
-    
-    # 2. Check for each required file
-    all_files_ok = True
-    for filename, url in REQUIRED_FILES.items():
-        local_path = os.path.join(DATA_DIR, filename)
-        if not os.path.exists(local_path):
-            all_files_ok = False
-            print(f"File '{filename}' not found. Downloading from GitHub...")
-            try:
-                # Download the file
-                urllib.request.urlretrieve(url, local_path)
-                print(f"Successfully downloaded '{filename}'.")
-            except urllib.error.URLError as e:
-                print(f"FATAL: Failed to download '{filename}'. Check internet connection. Error: {e}", file=sys.stderr)
-                sys.exit(1)
-            except Exception as e:
-                print(f"FATAL: An unknown error occurred while downloading '{filename}'. Error: {e}", file=sys.stderr)
-                sys.exit(1)
-        else:
-            print(f"File '{filename}' found.")
-    
-    if all_files_ok:
-        print("--- All files are present. ---")
-    else:
-        print("--- File setup complete. ---")
-
-# Run the check before anything else
-check_and_download_data()
-
-# Initialize pygame
-pygame.init()
 
-# --- Initialize Mixer ---
-try:
-    pygame.mixer.init()
-    mixer_initialized = True
-except pygame.error as e:
-    print(f"Warning: Mixer could not be initialized. Sound will be disabled. Error: {e}", file=sys.stderr)
-    mixer_initialized = False
+from adversary import AbsurdleGame
+from animation import (
+    FLIP, FLIP_STAGGER, POP, SHAKE, Animator, flip_frame, flip_sizes, pop_frame, pop_pad, pop_sizes,
+    shake_offset,
+)
+from assets import (
+    DATA_DIR, DEFAULT_WORD_LENGTH, WORD_LENGTHS,
+    available_lengths, check_and_download_data, load_lexicon, word_list_file,
+)
+from audio import AudioSystem
+from board_layout import BoardLayout, window_size
+from daily import DailyCalendar
+from decision_tree import load_tree
+from engine import (
+    WordleGame, GRID_ROWS,
+    ABSENT, PRESENT, CORRECT,
+    KEY_UNUSED, KEY_ABSENT, KEY_PRESENT, KEY_CORRECT, KEY_SPLIT, WON, PLAYING,
+)
+from keyboard_layout import KeyboardLayout
+from lexicon import ALPHABET
+from multiboard import BOARD_COUNTS, MultiBoardGame, rows_for
+from netclient import Connection, NetworkError, RemoteGame, parse_address
+from patterns import load_pattern_table
+from render_cache import FONT_SPECS, RenderCache, SpriteAtlas
+from sampler import TargetSampler
+from snapshot import REPLAY_FILE, SAVE_FILE, load_game, save_game
+from solver import Solver, opening_scores
+from stats import StatsStore
+from timing import FrameProfiler, PhaseTimer
 
 # Constants
 SCREEN_WIDTH, SCREEN_HEIGHT = 500, 750  # Increased height
-GRID_SIZE = 5
-GRID_ROWS = 6
-CELL_SIZE = 60
-CELL_MARGIN = 10
 GRID_OFFSET_Y = 110 # Pushed grid down
+# Board sizes that can be picked with F3 (word length), F4 (rows) and F5 (boards)
+ROW_COUNTS = range(4, 11)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -95,238 +55,564 @@ GREEN = (106, 170, 100)
 YELLOW = (201, 180, 88)
 DARK_GRAY = (58, 58, 60)
 
-# --- Load word list from file ---
-def load_words(filepath):
-    """Loads and processes the word list from a file."""
-    try:
-        with open(filepath, 'r') as f:
-            # Read all lines, strip whitespace, and convert to uppercase
-            # Filter for 5-letter words and ensure they are alphabetic
-            words = [
-                line.strip().upper() 
-                for line in f 
-                if len(line.strip()) == 5 and line.strip().isalpha()
-            ]
-        if not words:
-            # If no valid words are found, print an error and exit
-            print(f"Error: No valid 5-letter words found in {filepath}", file=sys.stderr)
-            sys.exit(1)
-        return words
-    except FileNotFoundError:
-        # This will now only trigger if the download failed for some reason
-        print(f"Error: Word list file not found at {filepath}", file=sys.stderr)
-        print("Please ensure 'word_list_5.txt' is in the 'data' directory.", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"An error occurred while loading words: {e}", file=sys.stderr)
-        sys.exit(1)
-
-
-# --- Path definitions now use the DATA_DIR constant from setup ---
-WORD_LIST_FILE = os.path.join(DATA_DIR, 'word_list_5.txt')
-
-# Load the words
-WORDS = load_words(WORD_LIST_FILE)
-
-# --- Load Keypress Sound ---
-keypress_sound = None
-if mixer_initialized:
-    try:
-        # Paths now use DATA_DIR
-        KEYPRESS_SOUND_FILE = os.path.join(DATA_DIR, 'keypress.mp3')
-        if not os.path.exists(KEYPRESS_SOUND_FILE):
-            KEYPRESS_SOUND_FILE = os.path.join(DATA_DIR, 'keypress.ogg') # Fallback
-        
-        keypress_sound = pygame.mixer.Sound(KEYPRESS_SOUND_FILE)
-    except pygame.error as e:
-        print(f"Warning: Could not load sound file. Sound will be disabled. Error: {e}", file=sys.stderr)
-    except FileNotFoundError:
-            print(f"Warning: Sound file not found. Sound will be disabled.", file=sys.stderr)
-
-
-# ---  Load Enter Sound (as requested) ---
-enter_sound = None
-if mixer_initialized:
-    try:
-        # Paths now use DATA_DIR
-        ENTER_SOUND_FILE = os.path.join(DATA_DIR, 'keypress2.mp3')
-        if not os.path.exists(ENTER_SOUND_FILE):
-            ENTER_SOUND_FILE = os.path.join(DATA_DIR, 'keypress2.wav') # Fallback
-        if not os.path.exists(ENTER_SOUND_FILE):
-            ENTER_SOUND_FILE = os.path.join(DATA_DIR, 'keypress2.ogg') # Fallback
-        
-        enter_sound = pygame.mixer.Sound(ENTER_SOUND_FILE)
-    except pygame.error as e:
-        print(f"Warning: Could not load sound file 'keypress2'. Sound will be disabled. Error: {e}", file=sys.stderr)
-    except FileNotFoundError:
-            print(f"Warning: Sound file 'keypress2' not found. Sound will be disabled.", file=sys.stderr)
-
-
-# Set up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Wordle")
-font = pygame.font.SysFont('Arial', 36)
-small_font = pygame.font.SysFont('Arial', 24)
-button_font = pygame.font.SysFont('Arial', 28, bold=True)
-toggle_font = pygame.font.SysFont('Arial', 18)
-
+# Engine marks/key states -> display colors
+MARK_COLORS = {ABSENT: DARK_GRAY, PRESENT: YELLOW, CORRECT: GREEN}
+KEY_COLORS = {
+    KEY_UNUSED: LIGHT_GRAY,
+    KEY_ABSENT: DARK_GRAY,
+    KEY_PRESENT: YELLOW,
+    KEY_CORRECT: GREEN,
+    KEY_SPLIT: (GREEN, YELLOW),
+}
+# Multi-board keys show one patch per board, so a split state shows its green
+BOARD_KEY_COLORS = {**KEY_COLORS, KEY_SPLIT: GREEN}
 
-# --- NEW ---
 # Custom event for endless mode reset
 RESET_GAME_EVENT = pygame.USEREVENT + 1
+# Posted by the background loader: dictionary ready (or failed), then sounds ready
+LEXICON_READY_EVENT = pygame.USEREVENT + 2
+SOUNDS_READY_EVENT = pygame.USEREVENT + 3
+# Posted by the network thread for every message from the race server (None = disconnected)
+NETWORK_EVENT = pygame.USEREVENT + 4
+# Posted by the hint warm-up thread once a word length's pattern table is ready (see warm_up_hints())
+HINTS_READY_EVENT = pygame.USEREVENT + 5
+
+LOADING_MESSAGE = "Loading words..."
+
+# Frame profiling overlay (F9): percentiles are re-rendered at most this often
+PROFILE_REFRESH_NS = 250_000_000
+PROFILE_FONT_SIZE = 14
+PROFILE_COLUMNS = (0, 70, 120, 170)  # x of the phase, p50, p99 and max columns
 
-# Game state
-target_word = random.choice(WORDS)
-current_row = 0
-current_col = 0
-grid = [["" for _ in range(GRID_SIZE)] for _ in range(GRID_ROWS)]
-colors = [[LIGHT_GRAY for _ in range(GRID_SIZE)] for _ in range(GRID_ROWS)]
-keyboard_colors = {letter: LIGHT_GRAY for letter in "QWERTYUIOPASDFGHJKLZXCVBNM"}
-game_over = False
-message = ""
+# --- Runtime state (set up by main(), so importing this module has no side effects) ---
+screen = None
+# Keyboard geometry for the current window size (see keyboard_layout.py)
+keyboard_layout = None
+# Grid geometry for the current window size and board (see board_layout.py)
+board_layout = None
+# Board dimensions for the next game (the current game's once one exists)
+word_length = DEFAULT_WORD_LENGTH
+grid_rows = GRID_ROWS
+board_count = 1
+# Fonts, rendered text and cell/key tiles (see render_cache.py)
+render_cache = None
+# Sound effects (see audio.py); stays silent if the mixer is unavailable
+audio = None
+# None until the background loader has indexed the word list
+game = None
 fullscreen = False
+startup_timer = None
+# Per-phase frame timing (see timing.py); every call is a no-op until it is switched on
+profiler = None
+# (overlay surface, perf_counter_ns when it was rendered)
+profile_overlay = None
+# Dirty-region rendering: what was on screen after the last render()
+last_view = None
+needs_full_redraw = True
+# Every grid cell as drawn, {(board, row, col): (letter, mark)}, and the game it came from
+shown_cells = {}
+shown_game = None
+# Tile flips, pops and row shakes (see animation.py); off with --no-animations
+animator = None
+# Every flip and pop frame at the current cell size (see update_sprite_atlas())
+sprite_atlas = None
+# Hint engine, created on the first hint request and pruned after every guess
+solver = None
+# (pattern table, strategy tree) per word length, loaded by a background thread (None if it failed)
+hint_engines = {}
+# Word lengths whose hint engine is still loading, and whether F1 is waiting for one
+hints_warming = set()
+hint_requested = False
+# Finished-game log and running totals (see stats.py); None until the lexicon is ready
+stats = None
+# Off with --no-save: no stats, replays or save/resume files are read or written
+save_enabled = True
+# Target word samplers per word length (see sampler.py), created on first use
+target_samplers = {}
+# --seed: a reproducible (and unsaved) sequence of targets
+target_seed = None
+# Answer calendar for the daily puzzle (see daily.py), loaded on first use
+daily_calendar = None
+# Race server connection (see netclient.py); None when playing locally
+connection = None
 
-# --- NEW ---
-# State for new UI elements
+# State for UI elements around the game
 endless_mode = False
+# Hard Mode: revealed greens stay in place and yellows must be reused
+hard_mode = False
+# Absurdle: the target keeps changing to the largest class of words still possible
+absurdle_mode = False
 show_end_game_buttons = False
 # We will define these rects in the draw functions so they are dynamic
 continue_button_rect = pygame.Rect(0, 0, 0, 0)
 exit_button_rect = pygame.Rect(0, 0, 0, 0)
 endless_toggle_rect = pygame.Rect(0, 0, 0, 0)
 endless_toggle_text_rect = pygame.Rect(0, 0, 0, 0)
+hard_toggle_rect = pygame.Rect(0, 0, 0, 0)
+hard_toggle_text_rect = pygame.Rect(0, 0, 0, 0)
 
-# Keyboard layout (as a list of lists for easier processing)
-keyboard_rows = [
-    ['Q', 'W', 'E', 'R', 'T', 'Y', 'U', 'I', 'O', 'P'],
-    ['A', 'S', 'D', 'F', 'G', 'H', 'J', 'K', 'L'],
-    ['ENTER', 'Z', 'X', 'C', 'V', 'B', 'N', 'M', 'DEL']
-]
 
-# --- NEW FUNCTION ---
-def reset_game():
-    """Resets the game state for a new round."""
-    global target_word, current_row, current_col, grid, colors, keyboard_colors
-    global game_over, message, show_end_game_buttons
+def load_in_background(remote=None):
+    """Loader thread: data files, word list and lexicon, then the sounds.
+
+    ``remote`` is (address, room, name) to join a race server instead of
+    playing locally; the server decides the word length.
+    """
+    link = joined = None
+    try:
+        check_and_download_data()
+        startup_timer.mark("data files checked")
+        length = word_length
+        if remote:
+            address, room, name = remote
+            try:
+                link = Connection(address)
+                joined = link.join(room, name)
+            except (NetworkError, OSError, ValueError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+            length = joined["length"]
+            startup_timer.mark("joined race server")
+        # Only the shard for the starting word length; others load on first use
+        lexicon = load_lexicon(length)
+        if lexicon is None and remote:
+            print(f"Error: The server plays {length}-letter words, "
+                  f"but data/word_list_{length}.txt is missing.", file=sys.stderr)
+            sys.exit(1)
+        if lexicon is None:
+            print(f"Warning: No {word_length}-letter word list found; "
+                  f"using {DEFAULT_WORD_LENGTH} letters.", file=sys.stderr)
+            lexicon = load_lexicon(DEFAULT_WORD_LENGTH)
+        startup_timer.mark("lexicon loaded")
+    except SystemExit:
+        # The loaders already printed the reason; tell the main loop to quit
+        if link:
+            link.close()
+        pygame.event.post(pygame.event.Event(LEXICON_READY_EVENT, lexicon=None, stats=None))
+        return
+    # Reads the stats checkpoint plus only the log tail written after it
+    store = None
+    if save_enabled:
+        store = StatsStore(DATA_DIR, load_lexicon, replay_path=os.path.join(DATA_DIR, REPLAY_FILE))
+    startup_timer.mark("stats loaded")
+    pygame.event.post(pygame.event.Event(LEXICON_READY_EVENT, lexicon=lexicon, stats=store,
+                                         connection=link, joined=joined))
+    
+    # --- Load sounds (keypress2 is the Enter sound) ---
+    if audio.start():
+        audio.load('keypress', 'keypress.mp3', ['keypress.ogg'])
+        audio.load('enter', 'keypress2.mp3', ['keypress2.wav', 'keypress2.ogg'])
+    startup_timer.mark("sounds decoded")
+    pygame.event.post(pygame.event.Event(SOUNDS_READY_EVENT))
+
+
+def load_hint_engine(lexicon):
+    """Hint warm-up thread: maps the pattern table (building it on the very first run,
+    which takes seconds), the opener scores and the strategy tree, if one was built."""
+    table = tree = None
+    try:
+        table = load_pattern_table(lexicon, word_list_file(lexicon.length), DATA_DIR)
+        opening_scores(table)
+        # Page the memory-mapped matrix in now rather than during the first hint
+        table.matrix.sum(dtype='uint64')
+        tree = load_tree(lexicon)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not load the hint engine. Error: {e}", file=sys.stderr)
+    except Exception as e:
+        # Unexpected: trust nothing that loaded, but still post the event,
+        # or hints would stay "warming up" forever
+        print(f"Warning: Could not load the hint engine. Error: {e!r}", file=sys.stderr)
+        table = tree = None
+    pygame.event.post(pygame.event.Event(HINTS_READY_EVENT, lexicon=lexicon, table=table, tree=tree))
+
+
+def warm_up_hints(lexicon):
+    """Starts loading the hint engine for ``lexicon``'s word length, unless it is loaded or loading."""
+    if lexicon.length in hint_engines or lexicon.length in hints_warming:
+        return
+    hints_warming.add(lexicon.length)
+    threading.Thread(target=load_hint_engine, args=(lexicon,), name="hints", daemon=True).start()
+
+
+def hints_ready(event):
+    global hint_requested
+    hints_warming.discard(event.lexicon.length)
+    if event.table is None:
+        hint_engines[event.lexicon.length] = None  # Not retried this session
+        if hint_requested and game is not None:
+            game.message = "No hint available"
+        hint_requested = False
+        return
+    hint_engines[event.lexicon.length] = (event.table, event.tree)
+    # Answer an F1 pressed while it was loading, if that game is still on
+    if hint_requested and game is not None and game.lexicon is event.lexicon:
+        hint_requested = False
+        show_hint()
+
+
+def reset_game(target=None):
+    """Resets the game state for a new round (with ``target``, or the sampler's next word)."""
+    global show_end_game_buttons
     
     # Stop any pending reset timers
     pygame.time.set_timer(RESET_GAME_EVENT, 0)
     
-    target_word = random.choice(WORDS)
-    current_row = 0
-    current_col = 0
-    grid = [["" for _ in range(GRID_SIZE)] for _ in range(GRID_ROWS)]
-    colors = [[LIGHT_GRAY for _ in range(GRID_SIZE)] for _ in range(GRID_ROWS)]
-    # Reset keyboard colors for a fresh start
-    keyboard_colors = {letter: LIGHT_GRAY for letter in "QWERTYUIOPASDFGHJKLZXCVBNM"}
-    game_over = False
-    message = ""
+    start_round(target)
     show_end_game_buttons = False
+    if solver:
+        solver.reset()
+
+
+def next_targets(count=1):
+    """The next target words: common words more often, no repeats until all have come up."""
+    length = game.lexicon.length
+    sampler = target_samplers.get(length)
+    if sampler is None:
+        sampler = target_samplers[length] = TargetSampler.for_lexicon(
+            game.lexicon, DATA_DIR, seed=target_seed, persist=save_enabled)
+    return sampler.take(count)
+
+
+def start_round(target=None):
+    """Starts the current game's next round with targets from the sampler."""
+    if is_remote() or is_absurdle():
+        game.reset()  # The server (or the adversary) decides
+    elif is_multi_board():
+        game.reset(next_targets(len(game.boards)))
+    else:
+        game.reset(target if target is not None else next_targets()[0])
+
+
+def new_game(lexicon):
+    """A game for the current board settings: one WordleGame, or a multi-board game."""
+    if board_count > 1:
+        return MultiBoardGame(lexicon, board_count)
+    if absurdle_mode:
+        return AbsurdleGame(lexicon, rows=grid_rows, hard_mode=hard_mode)
+    return WordleGame(lexicon, rows=grid_rows, hard_mode=hard_mode)
 
 
-def draw_grid(current_screen_width):
-    # Calculate the dynamic horizontal offset to center the grid
-    grid_total_width = (CELL_SIZE + CELL_MARGIN) * GRID_SIZE - CELL_MARGIN
-    grid_offset_x = (current_screen_width - grid_total_width) // 2
+def is_multi_board():
+    return game is not None and len(game.boards) > 1
+
+
+def is_remote():
+    return connection is not None
+
+
+def is_absurdle():
+    return isinstance(game, AbsurdleGame)
+
+
+def toggle_absurdle():
+    """Switches between normal and adversarial games, starting a new round."""
+    global absurdle_mode
+    if game is None or is_remote():
+        return
+    if is_multi_board():
+        game.message = "Absurdle is for single boards"
+        return
+    absurdle_mode = not absurdle_mode
+    set_board()
+    game.message = "Absurdle: the word dodges your guesses" if absurdle_mode else "Absurdle off"
+
+
+def start_race(link, joined, lexicon):
+    """Switches to a server-scored game and starts listening for the room's messages."""
+    global connection, game, word_length, grid_rows, board_count
+    connection = link
+    word_length, grid_rows, board_count = lexicon.length, joined["rows"], 1
+    game = RemoteGame(lexicon, link, joined["name"], joined["rows"])
+    others = len(joined["players"]) - 1
+    game.message = f"Room {joined['room']}: " + (f"{others} others here" if others else "waiting for players")
+    link.start(lambda message: pygame.event.post(pygame.event.Event(NETWORK_EVENT, message=message)))
+
+
+def handle_network_message(message):
+    """Applies one race server message (or a disconnect) to the remote game."""
+    if message is None:
+        game.end_round("Disconnected from server")
+        return
+    op = message.get("op")
+    if op in ("result", "error"):
+        game.apply_result(message)
+        return
+    if op != "updates":
+        return
+    for event in message["events"]:
+        kind = event.get("type")
+        if kind == "round":
+            game.reset()
+            game.message = f"Round {event['round']}"
+        elif kind == "round_over":
+            winner, word = event["winner"], event["word"]
+            if winner == game.player:
+                game.end_round("You Win!")
+            elif winner:
+                game.end_round(f"{winner} won! Word: {word}")
+            else:
+                game.end_round(f"Round over! Word: {word}")
+        elif kind in ("join", "leave") and event["player"] != game.player and not game.message:
+            game.message = f"{event['player']} {'joined' if kind == 'join' else 'left'}"
+
+
+def show_hint():
+    """Shows the solver's best next guess in the message area."""
+    global solver, hint_requested
+    if game is None or game.game_over:
+        return
+    if is_multi_board():
+        game.message = "Hints are for single boards"
+        return
+    if is_remote():
+        game.message = "No hints in a race"
+        return
+    if solver is None:
+        # The pattern table is never loaded here: the first build takes seconds
+        if game.word_length not in hint_engines:
+            warm_up_hints(game.lexicon)
+            hint_requested = True
+            game.message = "Hints warming up..."
+            return
+        engine = hint_engines[game.word_length]
+        if engine is None:
+            game.message = "No hint available"
+            return
+        # A strategy tree from decision_tree.py, if one was built, answers without searching
+        table, tree = engine
+        solver = Solver(table, tree=tree)
+        for guess, marks in zip(game.guesses, game.marks):
+            solver.update_marks(guess, marks)
+    # In Hard Mode only suggest guesses the game would accept
+    hint = solver.best_guess(game.constraints.hard_mask if game.hard_mode else None)
+    game.message = f"Hint: {hint} ({solver.remaining} left)" if hint else "No hint available"
+
+
+def start_daily():
+    """Starts today's daily puzzle: the same word on every machine."""
+    global daily_calendar
+    if game is None:
+        return
+    if is_multi_board() or is_remote() or is_absurdle():
+        game.message = "The daily puzzle is a single local board"
+        return
+    if daily_calendar is None or daily_calendar.lexicon is not game.lexicon:
+        daily_calendar = DailyCalendar.load(game.lexicon, DATA_DIR)
+    today = datetime.date.today()
+    reset_game(daily_calendar.word_for(today))
+    game.message = f"Daily puzzle #{DailyCalendar.puzzle_number(today)}"
+
+
+def show_stats():
+    """Shows the running totals in the message area."""
+    if game is None or stats is None:
+        return
+    game.message = stats.summary()
+
+
+def grid_cells():
+    """Every grid cell as ((board, row, col), (letter, mark)), in drawing order."""
+    boards = game.boards if game else (None,) * board_layout.boards
+    return [
+        ((b, row, col), board.cell(row, col) if board else ("", None))
+        for b, board in enumerate(boards)
+        for row in range(board_layout.rows)
+        for col in range(board_layout.columns)
+    ]
+
+def take_cell_changes(full=False):
+    """[(position, old cell, new cell)] for every grid cell that changed since the last call.
+
+    The game reports the cells its moves touched (take_changed_cells()), so
+    only those are looked at; a new game, a reset or ``full`` (a different
+    board layout) compares every cell. Keeps ``shown_cells`` up to date.
+    """
+    global shown_cells, shown_game
+    positions = game.take_changed_cells() if game is not None else None
+    if full or game is not shown_game:
+        positions = None
+    shown_game = game
+    if positions is None:
+        cells = dict(grid_cells())
+        changes = [(position, shown_cells.get(position, ("", None)), cell)
+                   for position, cell in cells.items() if shown_cells.get(position) != cell]
+        shown_cells = cells
+        return changes
+    changes = []
+    boards = game.boards
+    for position in positions:
+        b, row, col = position
+        cell = boards[b].cell(row, col)
+        old_cell = shown_cells[position]
+        if cell != old_cell:
+            changes.append((position, old_cell, cell))
+            shown_cells[position] = cell
+    return changes
+
+def draw_grid(current_screen_width, only=None):
+    """Draws the grid cells (or just the (board, row, col) cells in ``only``). Returns their rects."""
+    # Cell size and the centered position of every board come from the board layout
+    cell_size = board_layout.cell_size
+    drawn = []
+    # A partial redraw reads the cells take_cell_changes() just brought up to date
+    cells = grid_cells() if only is None else [(position, shown_cells[position]) for position in only]
     
-    for row in range(GRID_ROWS):
-        for col in range(GRID_SIZE):
-            # Use the dynamically calculated offset
-            x = grid_offset_x + col * (CELL_SIZE + CELL_MARGIN)
-            y = GRID_OFFSET_Y + row * (CELL_SIZE + CELL_MARGIN)
-            
-            # Draw cell background
-            pygame.draw.rect(screen, colors[row][col], (x, y, CELL_SIZE, CELL_SIZE))
-            
-            # Draw cell border
-            pygame.draw.rect(screen, GRAY, (x, y, CELL_SIZE, CELL_SIZE), 2)
-            
-            # Draw letter if present
-            if grid[row][col]:
-                text = font.render(grid[row][col], True, BLACK)
-                text_rect = text.get_rect(center=(x + CELL_SIZE // 2, y + CELL_SIZE // 2))
-                screen.blit(text, text_rect)
-
-# --- MODIFIED FUNCTION ---
-def draw_keyboard(current_screen_width, current_screen_height):
+    for (b, row, col), (letter, mark) in cells:
+        x, y = board_layout.cell_origin(row, col, b)
+        
+        # Cell background, border and letter come pre-composited from the cache
+        color = LIGHT_GRAY if mark is None else MARK_COLORS[mark]
+        screen.blit(render_cache.cell_tile(letter, color, GRAY, BLACK, cell_size), (x, y))
+        drawn.append(pygame.Rect(x, y, cell_size, cell_size))
+    return drawn
+
+def start_animations(changes):
+    """Flips every cell of a board's latest guess that just got its mark and pops every new letter.
+
+    ``changes`` comes from take_cell_changes(). Any other change (a deleted
+    letter, a new game) stops the cell's animation.
+    """
+    for position, old_cell, cell in changes:
+        letter, mark = cell
+        b, row, col = position
+        # (A row typed and submitted within one frame goes straight from empty to marked)
+        if mark is not None and old_cell[1] is None and row == game.boards[b].row - 1:
+            animator.flip(position, delay=col * FLIP_STAGGER)
+        elif mark is None and letter and not old_cell[0]:
+            animator.pop(position)
+        else:
+            animator.cancel(position)
+
+def animation_rect(animation):
+    """Everything an animation may draw on: its cell (plus the pop overhang) or its row's band."""
+    cell_size = board_layout.cell_size
+    pad = pop_pad(cell_size, board_layout.margin)
+    if animation.kind == SHAKE:
+        b, row = animation.key
+        x, y = board_layout.cell_origin(row, 0, b)
+        reach = board_layout.margin + pad
+        return pygame.Rect(x - reach, y - pad, board_layout.board_width + 2 * reach, cell_size + 2 * pad)
+    b, row, col = animation.key
+    x, y = board_layout.cell_origin(row, col, b)
+    return pygame.Rect(x - pad, y - pad, cell_size + 2 * pad, cell_size + 2 * pad)
+
+def draw_animations(cells):
+    """Draws the current frame of every animation over the grid. Returns the rects drawn.
+
+    ``cells`` maps (board, row, col) to (letter, mark). Flips and pops are
+    single blits from the sprite atlas; a shaking row is its static tiles
+    shifted sideways (with any pop in it shifted along).
+    """
+    cell_size = board_layout.cell_size
+    pad = pop_pad(cell_size, board_layout.margin)
+    running = animator.running()
+    drawn = []
+    offsets = {}
+    for animation, progress in running:
+        if animation.kind != SHAKE:
+            continue
+        b, row = animation.key
+        dx = offsets[animation.key] = shake_offset(progress, board_layout.margin)
+        band = animation_rect(animation)
+        screen.fill(WHITE, band)
+        for col in range(board_layout.columns):
+            letter, mark = cells[(b, row, col)]
+            color = LIGHT_GRAY if mark is None else MARK_COLORS[mark]
+            x, y = board_layout.cell_origin(row, col, b)
+            screen.blit(render_cache.cell_tile(letter, color, GRAY, BLACK, cell_size), (x + dx, y))
+        drawn.append(band)
+    for animation, progress in running:
+        if animation.kind == SHAKE:
+            continue
+        b, row, col = animation.key
+        letter, mark = cells[animation.key]
+        x, y = board_layout.cell_origin(row, col, b)
+        x += offsets.get((b, row), 0)
+        if animation.kind == FLIP:
+            back, frame = flip_frame(progress)
+            color = MARK_COLORS[mark] if back and mark is not None else LIGHT_GRAY
+            strip = sprite_atlas.strip(FLIP, letter, color)
+            drawn.append(screen.blit(strip, (x, y), (frame * cell_size, 0, cell_size, cell_size)))
+        else:
+            box = cell_size + 2 * pad
+            strip = sprite_atlas.strip(POP, letter, LIGHT_GRAY)
+            drawn.append(screen.blit(strip, (x - pad, y - pad), (pop_frame(progress) * box, 0, box, box)))
+    return drawn
+
+def draw_finished_animations(finished, cells):
+    """Puts the static tiles back where animations just ended. Returns the rects drawn.
+
+    ``cells`` maps (board, row, col) to (letter, mark), so no grid scan is
+    needed (a row flipping on 16 boards ends 80 flips at once).
+    """
+    cell_size = board_layout.cell_size
+    drawn = []
+    for animation in finished:
+        area = animation_rect(animation)
+        screen.fill(WHITE, area)
+        drawn.append(area)
+        if animation.kind == SHAKE:
+            b, row = animation.key
+            positions = [(b, row, col) for col in range(board_layout.columns)]
+        else:
+            positions = [animation.key]
+        for b, row, col in positions:
+            letter, mark = cells[(b, row, col)]
+            color = LIGHT_GRAY if mark is None else MARK_COLORS[mark]
+            screen.blit(render_cache.cell_tile(letter, color, GRAY, BLACK, cell_size),
+                        board_layout.cell_origin(row, col, b))
+    return drawn
+
+def key_color(letter):
+    """Display color of a letter key: one color (or a split pair), or one per board."""
+    if game is None:
+        return LIGHT_GRAY
+    boards = game.boards
+    if len(boards) == 1:
+        return KEY_COLORS[game.key_state(letter)]
+    # Solved boards no longer need hints, so their patch goes back to neutral
+    return tuple(
+        BOARD_KEY_COLORS[KEY_UNUSED if board.status == WON else board.key_state(letter)]
+        for board in boards
+    )
+
+def draw_keyboard(current_screen_width, current_screen_height, only=None):
+    """Draws the keyboard (or just the keys in ``only``). Returns the rects drawn."""
+    drawn = []
     # Do not draw the keyboard if the end-game buttons are showing
     if show_end_game_buttons:
-        return
-        
-    # Define sizes specifically for the keyboard
-    key_height = 50
-    key_margin = 6
-    key_size_x = 40      # Width for regular keys
-    special_key_width = 65 # Width for ENTER and DEL
-
-    # Calculate dynamic Y offset to position keyboard near the bottom
-    keyboard_offset_y = current_screen_height - (key_height + key_margin) * 3 - 60 # Adjusted padding
-
-    for row_idx, row in enumerate(keyboard_rows):
-        # Calculate the total width of the current row
-        row_width = 0
-        for key_idx, key in enumerate(row):
-            if key in ["ENTER", "DEL"]:
-                row_width += special_key_width
-            else:
-                row_width += key_size_x
-            if key_idx < len(row) - 1:
-                row_width += key_margin
+        return drawn
+    
+    for key, key_rect in keyboard_layout.rects.items():
+        if only is not None and key not in only:
+            continue
         
-        # Calculate starting x to center the row (using current width)
-        x = (current_screen_width - row_width) // 2
-        y = keyboard_offset_y + row_idx * (key_height + key_margin)
+        # Determine key color
+        color = key_color(key) if len(key) == 1 else LIGHT_GRAY
         
-        for key in row:
-            # Determine key width
-            key_width = special_key_width if key in ["ENTER", "DEL"] else key_size_x
-            
-            # ---  Define key_rect here ---
-            key_rect = pygame.Rect(x, y, key_width, key_height)
-            
-            # Determine key color
-            color = LIGHT_GRAY
-            if key in keyboard_colors:
-                color = keyboard_colors[key]
-
-            # ---  Creative drawing logic for split colors ---
-            if isinstance(color, tuple) and color == (GREEN, YELLOW):
-                # Split key design
-                left_width = key_rect.width // 2
-                right_width = key_rect.width - left_width # Handle odd widths
-                
-                left_half_rect = pygame.Rect(key_rect.left, key_rect.top, left_width, key_rect.height)
-                right_half_rect = pygame.Rect(key_rect.left + left_width, key_rect.top, right_width, key_rect.height)
-                
-                # Draw left half (GREEN)
-                pygame.draw.rect(screen, GREEN, left_half_rect, 
-                                 border_top_left_radius=5, border_bottom_left_radius=5)
-                # Draw right half (YELLOW)
-                pygame.draw.rect(screen, YELLOW, right_half_rect, 
-                                 border_top_right_radius=5, border_bottom_right_radius=5)
-            else:
-                # Draw key background (with rounded corners) - normal single color
-                pygame.draw.rect(screen, color, key_rect, border_radius=5)
-            # --- END NEW LOGIC ---
-            
-            # Draw letter
-            text = small_font.render(key, True, BLACK)
-            text_rect = text.get_rect(center=key_rect.center) # Use key_rect.center
-            screen.blit(text, text_rect)
-            
-            # Move x for the next key in the row
-            x += key_width + key_margin
+        # Cached key tile (includes the green/yellow split or per-board design and white corners)
+        x, y, key_width, key_height = key_rect
+        screen.blit(render_cache.key_tile(key, color, BLACK, key_width, key_height), (x, y))
+        drawn.append(pygame.Rect(key_rect))
+    return drawn
+
+def message_rect(current_screen_width):
+    """The band between the title and the grid where messages are shown."""
+    return pygame.Rect(0, 62, current_screen_width, GRID_OFFSET_Y - 64)
+
+def current_message():
+    return game.message if game else LOADING_MESSAGE
 
 def draw_message(current_screen_width):
+    message = current_message()
     if message:
-        text = small_font.render(message, True, BLACK)
+        text = render_cache.text(message, 'small', BLACK)
         # Center message horizontally, place it at a fixed position below the title
         text_rect = text.get_rect(center=(current_screen_width // 2, 80)) # Changed Y position
         screen.blit(text, text_rect)
 
 def draw_title(current_screen_width):
-    title_font = pygame.font.SysFont('Arial', 40, bold=True)
-    title = title_font.render("WORDLE", True, BLACK)
+    title = render_cache.text("WORDLE", 'title', BLACK)
     # Center title horizontally, place it at the top
     title_rect = title.get_rect(center=(current_screen_width // 2, 40))
     screen.blit(title, title_rect)
@@ -346,7 +632,7 @@ def draw_end_game_buttons(current_screen_width, current_screen_height):
     
     # Calculate Y position (e.g., below the grid)
     # Use the grid's bottom edge as a reference
-    grid_bottom_y = GRID_OFFSET_Y + (CELL_SIZE + CELL_MARGIN) * GRID_ROWS
+    grid_bottom_y = board_layout.bottom + board_layout.margin
     button_y = grid_bottom_y + 40 # 40px padding below grid
     
     # Calculate X positions to center them
@@ -357,7 +643,7 @@ def draw_end_game_buttons(current_screen_width, current_screen_height):
     continue_x = start_x
     continue_button_rect = pygame.Rect(continue_x, button_y, button_width, button_height)
     pygame.draw.rect(screen, GREEN, continue_button_rect, border_radius=8)
-    text = button_font.render("Continue", True, WHITE)
+    text = render_cache.text("Continue", 'button', WHITE)
     text_rect = text.get_rect(center=continue_button_rect.center)
     screen.blit(text, text_rect)
 
@@ -365,306 +651,648 @@ def draw_end_game_buttons(current_screen_width, current_screen_height):
     exit_x = start_x + button_width + button_margin
     exit_button_rect = pygame.Rect(exit_x, button_y, button_width, button_height)
     pygame.draw.rect(screen, DARK_GRAY, exit_button_rect, border_radius=8)
-    text = button_font.render("Exit", True, WHITE)
+    text = render_cache.text("Exit", 'button', WHITE)
     text_rect = text.get_rect(center=exit_button_rect.center)
     screen.blit(text, text_rect)
 
-# --- NEW FUNCTION ---
-def draw_endless_mode_toggle(current_screen_width, current_screen_height):
-    """Draws the 'Endless Mode' checkbox at the bottom."""
-    global endless_toggle_rect, endless_toggle_text_rect
-    
-    box_size = 20
-    text_padding = 10
-    
-    # Position at the bottom-center
-    y = current_screen_height - 30 # 30px from bottom
-    
-    # Render text to get its width
-    text = toggle_font.render("Endless Mode", True, BLACK)
-    text_width = text.get_width()
-    
-    total_width = box_size + text_padding + text_width
-    start_x = (current_screen_width - total_width) // 2
+TOGGLE_BOX_SIZE = 20
+TOGGLE_TEXT_PADDING = 10
+TOGGLE_GAP = 30
+
+def draw_checkbox(label, checked, left, y):
+    """Draws a labelled checkbox starting at ``left``, centered on ``y``. Returns (box, text) rects."""
+    text = render_cache.text(label, 'toggle', BLACK)
     
     # Checkbox Rect
-    box_x = start_x
-    endless_toggle_rect = pygame.Rect(box_x, y - box_size // 2, box_size, box_size)
+    box_rect = pygame.Rect(left, y - TOGGLE_BOX_SIZE // 2, TOGGLE_BOX_SIZE, TOGGLE_BOX_SIZE)
     
     # Text Rect
-    text_x = box_x + box_size + text_padding
-    endless_toggle_text_rect = text.get_rect(centery=y)
-    endless_toggle_text_rect.left = text_x
+    text_rect = text.get_rect(centery=y)
+    text_rect.left = left + TOGGLE_BOX_SIZE + TOGGLE_TEXT_PADDING
     
     # Draw the text
-    screen.blit(text, endless_toggle_text_rect)
+    screen.blit(text, text_rect)
     
     # Draw the box
-    pygame.draw.rect(screen, BLACK, endless_toggle_rect, 2) # Border
-    if endless_mode:
+    pygame.draw.rect(screen, BLACK, box_rect, 2) # Border
+    if checked:
         # Draw a tick (simple lines)
-        p1 = (endless_toggle_rect.left + 3, endless_toggle_rect.centery)
-        p2 = (endless_toggle_rect.centerx - 2, endless_toggle_rect.bottom - 4)
-        p3 = (endless_toggle_rect.right - 4, endless_toggle_rect.top + 4)
+        p1 = (box_rect.left + 3, box_rect.centery)
+        p2 = (box_rect.centerx - 2, box_rect.bottom - 4)
+        p3 = (box_rect.right - 4, box_rect.top + 4)
         pygame.draw.line(screen, GREEN, p1, p2, 3)
         pygame.draw.line(screen, GREEN, p2, p3, 3)
+    return box_rect, text_rect
+
+def toggle_row_lefts(current_screen_width):
+    """Left edges of the Endless Mode and Hard Mode checkboxes, centered as one row."""
+    widths = [
+        TOGGLE_BOX_SIZE + TOGGLE_TEXT_PADDING + render_cache.text(label, 'toggle', BLACK).get_width()
+        for label in ("Endless Mode", "Hard Mode")
+    ]
+    start_x = (current_screen_width - sum(widths) - TOGGLE_GAP) // 2
+    return start_x, start_x + widths[0] + TOGGLE_GAP
+
+def draw_endless_mode_toggle(current_screen_width, current_screen_height):
+    """Draws the 'Endless Mode' checkbox at the bottom."""
+    global endless_toggle_rect, endless_toggle_text_rect
+    left, _ = toggle_row_lefts(current_screen_width)
+    # 30px from bottom
+    endless_toggle_rect, endless_toggle_text_rect = draw_checkbox(
+        "Endless Mode", endless_mode, left, current_screen_height - 30)
+
+def draw_hard_mode_toggle(current_screen_width, current_screen_height):
+    """Draws the 'Hard Mode' checkbox next to the Endless Mode one."""
+    global hard_toggle_rect, hard_toggle_text_rect
+    _, left = toggle_row_lefts(current_screen_width)
+    hard_toggle_rect, hard_toggle_text_rect = draw_checkbox(
+        "Hard Mode", hard_mode, left, current_screen_height - 30)
+
+def candidate_rect(current_screen_width):
+    """Top-right corner of the title bar, where Hard Mode shows the words still possible."""
+    return pygame.Rect(current_screen_width - 120, 25, 120, 30)
+
+def current_candidate_count():
+    return game.constraints.candidate_count if game and game.hard_mode else None
+
+def draw_candidate_count(current_screen_width):
+    count = current_candidate_count()
+    if count is None:
+        return
+    text = render_cache.text(f"{count} left", 'toggle', DARK_GRAY)
+    band = candidate_rect(current_screen_width)
+    screen.blit(text, text.get_rect(midright=(band.right - 10, band.centery)))
+
+def toggle_hard_mode():
+    """Turns Hard Mode on or off; only allowed before the first guess of a round."""
+    global hard_mode
+    if is_multi_board():
+        game.message = "Hard Mode is for single boards"
+        return
+    if is_remote():
+        game.message = "Races are played in normal mode"
+        return
+    if game is not None and game.guesses and not game.game_over:
+        game.message = "Hard Mode can only change before a round"
+        return
+    hard_mode = not hard_mode
+    if game is not None:
+        game.hard_mode = hard_mode
 
 
-# --- MODIFIED FUNCTION ---
 def check_guess():
-    global current_row, current_col, game_over, message, show_end_game_buttons
+    global show_end_game_buttons
     
-    # Check if the current row is complete
-    if current_col != GRID_SIZE:
-        message = "Word too short"
+    # The engine validates the row, scores it and updates the keyboard state
+    # (multi-board games score the row on every open board in one batch;
+    # race games only send it, and the server's answer arrives as a NETWORK_EVENT)
+    marks = game.submit()
+    if marks is None:
+        # Rejected rows shake (a race guess on its way to the server is not rejected)
+        if not game.game_over and getattr(game, "pending", None) is None:
+            for b, board in enumerate(game.boards):
+                if board.status == PLAYING:
+                    animator.shake(b, game.row)
         return
-    
-    guess = "".join(grid[current_row])
-    
-    # Check if the guess is a valid word
-    if guess not in WORDS:
-        message = "Not in word list"
+    if solver:
+        solver.update_marks(game.guesses[-1], marks)
+    if not game.game_over:
         return
     
-    # --- Check logic (Grid coloring) ---
-    target_letters = list(target_word)
-    guess_letters = list(guess)
+    if save_enabled and not is_multi_board() and not is_absurdle():
+        # Totals update now; the stats and replay log writes happen on the stats writer thread
+        stats.record(game, endless=endless_mode)
     
-    # First pass: mark correct letters (green)
-    for i in range(GRID_SIZE):
-        if guess_letters[i] == target_letters[i]:
-            colors[current_row][i] = GREEN
-            
-            # --- NEW KEYBOARD LOGIC (GREEN) ---
-            letter = guess_letters[i]
-            # Upgrade to split-color if it was yellow
-            if keyboard_colors[letter] == YELLOW:
-                keyboard_colors[letter] = (GREEN, YELLOW) 
-            # Otherwise, set to green (overwrites gray or green)
-            else:
-                keyboard_colors[letter] = GREEN
-            # --- END NEW LOGIC ---
-            
-            target_letters[i] = None  # Mark as used
-    
-    # Second pass: mark present but wrong position letters (yellow)
-    for i in range(GRID_SIZE):
-        if colors[current_row][i] != GREEN:  # If not already green
-            letter = guess_letters[i]
-            if letter in target_letters:
-                colors[current_row][i] = YELLOW
-                
-                # --- NEW KEYBOARD LOGIC (YELLOW) ---
-                # Upgrade to split-color if it was green
-                if keyboard_colors[letter] == GREEN:
-                    keyboard_colors[letter] = (GREEN, YELLOW)
-                # Only set to yellow if it's currently gray
-                elif keyboard_colors[letter] == LIGHT_GRAY or keyboard_colors[letter] == DARK_GRAY:
-                    keyboard_colors[letter] = YELLOW
-                # --- END NEW LOGIC ---
-                
-                # Remove the first occurrence of this letter from target
-                target_letters[target_letters.index(letter)] = None
-            else:
-                colors[current_row][i] = DARK_GRAY
-                
-                # --- NEW KEYBOARD LOGIC (GRAY) ---
-                # Only set to dark gray if it's light gray
-                if keyboard_colors[letter] == LIGHT_GRAY:
-                    keyboard_colors[letter] = DARK_GRAY
-                # --- END NEW LOGIC ---
-    # --- End of check logic ---
-
-    
-    # --- MODIFIED End-game logic ---
-    is_win = (guess == target_word)
-    is_loss = (current_row == GRID_ROWS - 1)
-
-    if is_win or is_loss:
-        game_over = True
-        if is_win:
-            message = "You Win!"
-        else: # is_loss
-            message = f"Game Over! Word: {target_word}"
-        
-        if endless_mode:
-            # If in endless mode, set a timer to auto-reset
-            pygame.time.set_timer(RESET_GAME_EVENT, 2000) # 2-second delay
-        else:
-            # Otherwise, show the continue/exit buttons
-            show_end_game_buttons = True
+    if endless_mode:
+        # If in endless mode, set a timer to auto-reset
+        pygame.time.set_timer(RESET_GAME_EVENT, 2000) # 2-second delay
     else:
-        # Not game over, move to next row
-        current_row += 1
-        current_col = 0
-        message = ""
+        # Otherwise, show the continue/exit buttons
+        show_end_game_buttons = True
 
 def handle_key_press(key):
-    global current_row, current_col, message
-    
-    # Don't allow key presses if game is over (buttons or timer active)
-    if game_over:
+    # Don't allow key presses while loading or if game is over (buttons or timer active)
+    if game is None or game.game_over:
         return
     
     # Check for alphabet keys
-    if key in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" and len(key) == 1 and current_col < GRID_SIZE:
-        grid[current_row][current_col] = key
-        current_col += 1
-        message = ""
+    if key in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" and len(key) == 1:
         # ---  Play sound on successful letter press ---
-        if keypress_sound:
-            keypress_sound.play()
+        if game.type_letter(key):
+            audio.play('keypress')
     # Check for Backspace (physical) or DEL (on-screen)
-    elif (key == "BACKSPACE" or key == "DEL") and current_col > 0:
-        current_col -= 1
-        grid[current_row][current_col] = ""
-        message = ""
+    elif key == "BACKSPACE" or key == "DEL":
         # ---  Play sound on successful delete ---
-        if keypress_sound:
-            keypress_sound.play()
+        if game.delete_letter():
+            audio.play('keypress')
     # Check for Return (physical) or ENTER (on-screen)
     elif key == "RETURN" or key == "ENTER":
         # ---  Play Enter sound as requested ---
-        if enter_sound:
-            enter_sound.play()
+        audio.play('enter')
         check_guess()
 
 def get_keyboard_key(pos, current_screen_width, current_screen_height):
     # Don't check keyboard if buttons are showing
     if show_end_game_buttons:
         return None
-        
-    # Use the same dimensions as in draw_keyboard
-    key_height = 50
-    key_margin = 6
-    key_size_x = 40
-    special_key_width = 65
-
-    # Use the *exact same* dynamic Y offset calculation as draw_keyboard
-    keyboard_offset_y = current_screen_height - (key_height + key_margin) * 3 - 60
-
-    for row_idx, row in enumerate(keyboard_rows):
-        # Calculate row width (same as draw_keyboard)
-        row_width = 0
-        for key_idx, key in enumerate(row):
-            if key in ["ENTER", "DEL"]:
-                row_width += special_key_width
-            else:
-                row_width += key_size_x
-            if key_idx < len(row) - 1:
-                row_width += key_margin
-        
-        # Calculate starting x and y (same as draw_keyboard)
-        x = (current_screen_width - row_width) // 2
-        y = keyboard_offset_y + row_idx * (key_height + key_margin)
-        
-        for key in row:
-            key_width = special_key_width if key in ["ENTER", "DEL"] else key_size_x
-            
-            # Check if the click position (pos) is within this key's bounds
-            key_rect = pygame.Rect(x, y, key_width, key_height)
-            if key_rect.collidepoint(pos):
-                if key == "DEL":
-                    return "DEL" # Return "DEL" for the on-screen button
-                if key == "ENTER":
-                    return "ENTER" # Return "ENTER" for the on-screen button
-                return key # Return the letter
-            
-            # Move x for the next key
-            x += key_width + key_margin
-            
-    return None # Click was not on any key
+    return keyboard_layout.key_at(pos)
+
+def update_layout():
+    """Recomputes window-size dependent geometry (call after any display mode or board change)."""
+    global keyboard_layout, board_layout
+    size = screen.get_size()
+    if keyboard_layout is None or keyboard_layout.size != size:
+        keyboard_layout = KeyboardLayout(*size)
+    rows = rows_for(board_count) if board_count > 1 else grid_rows
+    board = (word_length, rows, board_count)
+    if board_layout is None or board_layout.size != size or \
+            (board_layout.columns, board_layout.rows, board_layout.boards) != board:
+        board_layout = BoardLayout(*size, word_length, rows, GRID_OFFSET_Y, keyboard_layout.top,
+                                   boards=board_count)
+    # Nothing animates before there is a game, so the first frame does not wait for this
+    if game is not None:
+        update_sprite_atlas()
+
+def windowed_size():
+    """The window size for the current board: the default, made bigger if its cells would be unreadable."""
+    rows = rows_for(board_count) if board_count > 1 else grid_rows
+    reserved = SCREEN_HEIGHT - KeyboardLayout(SCREEN_WIDTH, SCREEN_HEIGHT).top
+    desktop = pygame.display.get_desktop_sizes()
+    return window_size(word_length, rows, board_count, GRID_OFFSET_Y, reserved,
+                       (SCREEN_WIDTH, SCREEN_HEIGHT), *desktop[:1])
+
+def fit_window():
+    """Resizes the window for a new board (16 boards need a much wider one); not in fullscreen."""
+    global screen, needs_full_redraw
+    if fullscreen or screen is None:
+        return
+    size = windowed_size()
+    if size != screen.get_size():
+        screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+        render_cache.clear()
+        needs_full_redraw = True
+
+def update_sprite_atlas():
+    """Pre-renders every flip and pop frame for the current cell size, if it changed."""
+    global sprite_atlas
+    size = board_layout.cell_size
+    if not animator.enabled or (sprite_atlas is not None and sprite_atlas.size == size):
+        return
+    pad = pop_pad(size, board_layout.margin)
+    atlas = SpriteAtlas(size)
+    for fill in (LIGHT_GRAY, *MARK_COLORS.values()):
+        atlas.add(FLIP, ALPHABET, fill, GRAY, BLACK, flip_sizes(size), size, render_cache)
+    atlas.add(POP, ALPHABET, LIGHT_GRAY, GRAY, BLACK, pop_sizes(size, pad), size + 2 * pad, render_cache)
+    sprite_atlas = atlas
+
+def set_board(length=None, rows=None, boards=None):
+    """Starts a new game with a different word length, row count and/or number of boards.
+
+    Each word length's lexicon is loaded and indexed the first time it is
+    used and then kept, so switching back is instant.
+    """
+    global game, word_length, grid_rows, board_count, solver
+    if is_remote():
+        game.message = "The server picks the board in a race"
+        return
+    length = length or word_length
+    rows = rows or grid_rows
+    boards = boards or board_count
+    lexicon = load_lexicon(length)
+    if lexicon is None:
+        game.message = f"No {length}-letter word list"
+        return
+    word_length, grid_rows, board_count = length, rows, boards
+    game = new_game(lexicon)
+    # The hint engine is per word list
+    solver = None
+    reset_game()
+    if boards > 1:
+        game.message = f"{boards} boards, {length} letters, {game.rows} rows"
+    else:
+        game.message = f"{length} letters, {rows} rows"
+    fit_window()
+    update_layout()
+
+def cycle_word_length():
+    lengths = available_lengths()
+    if game is None or word_length not in lengths:
+        return
+    set_board(length=lengths[(lengths.index(word_length) + 1) % len(lengths)])
+
+def cycle_rows():
+    if game is None:
+        return
+    rows = list(ROW_COUNTS)
+    set_board(rows=rows[(rows.index(grid_rows) + 1) % len(rows)] if grid_rows in rows else GRID_ROWS)
+
+def cycle_boards():
+    if game is None:
+        return
+    counts = list(BOARD_COUNTS)
+    set_board(boards=counts[(counts.index(board_count) + 1) % len(counts)] if board_count in counts else 1)
 
 def toggle_fullscreen():
-    global fullscreen, screen
+    global fullscreen, screen, needs_full_redraw
+    needs_full_redraw = True
+    render_cache.clear()
     fullscreen = not fullscreen
     if fullscreen:
         screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
     else:
-        # Return to the default windowed size
-        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
-
-# Main game loop
-clock = pygame.time.Clock()
-running = True
-
-while running:
-    # Get current screen dimensions at the start of each frame
-    current_screen_width = screen.get_width()
-    current_screen_height = screen.get_height()
+        # Return to the default windowed size (or the board's, if that is bigger)
+        screen = pygame.display.set_mode(windowed_size(), pygame.RESIZABLE)
+    update_layout()
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-            
-        # --- NEW ---
-        # Handle auto-reset timer for endless mode
-        elif event.type == RESET_GAME_EVENT:
-            reset_game()
-            
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-            elif event.key == pygame.K_F11:
-                toggle_fullscreen()
-            # Pass key presses to the handler (it will check for game_over)
-            elif event.key == pygame.K_BACKSPACE:
-                handle_key_press("BACKSPACE")
-            elif event.key == pygame.K_RETURN:
-                handle_key_press("RETURN")
-            elif event.unicode.isalpha():
-                handle_key_press(event.unicode.upper())
-                
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            # --- MODIFIED ---
-            # 1. Check for Endless Mode toggle first (always active)
-            # We check both the box and the text for easier clicking
-            if endless_toggle_rect.collidepoint(event.pos) or \
-               endless_toggle_text_rect.collidepoint(event.pos):
-                endless_mode = not endless_mode
-                # If we toggle this while buttons are showing, hide them
-                if show_end_game_buttons:
-                    show_end_game_buttons = False
-                    game_over = False # Allow playing
-                    reset_game() # Or just reset
-                
-            # 2. Check for end-game buttons (only if showing)
-            elif show_end_game_buttons:
-                if continue_button_rect.collidepoint(event.pos):
-                    reset_game()
-                elif exit_button_rect.collidepoint(event.pos):
-                    running = False
-                    
-            # 3. Check for keyboard (only if game is not over)
-            elif not game_over:
-                # Pass current dimensions to the click handler
-                key = get_keyboard_key(event.pos, current_screen_width, current_screen_height)
-                if key:
-                    handle_key_press(key)
-                    
-        # Handle window resize event
-        elif event.type == pygame.VIDEORESIZE:
-            if not fullscreen:
-                # Update the screen surface to the new size
-                screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
+def capture_view():
+    """Everything the screen depends on, in a form that is cheap to compare."""
+    return {
+        "size": screen.get_size(),
+        "board": (board_layout.columns, board_layout.rows, board_layout.boards),
+        "keys": tuple(key_color(letter) for letter in ALPHABET),
+        "message": current_message(),
+        "endless": endless_mode,
+        "hard": hard_mode,
+        "candidates": current_candidate_count(),
+        "buttons": show_end_game_buttons,
+    }
 
-    
-    # Draw everything
+def draw_everything(current_screen_width, current_screen_height):
     screen.fill(WHITE)
     
     # Pass current dimensions to all drawing functions
     draw_title(current_screen_width)
     draw_grid(current_screen_width)
+    profiler.lap("grid")
     
     # --- MODIFIED DRAW ORDER ---
     draw_keyboard(current_screen_width, current_screen_height)
+    profiler.lap("keyboard")
     draw_end_game_buttons(current_screen_width, current_screen_height) # Draw this *after* grid
     draw_endless_mode_toggle(current_screen_width, current_screen_height) # Draw this last
+    draw_hard_mode_toggle(current_screen_width, current_screen_height)
+    draw_candidate_count(current_screen_width)
+    profiler.lap("widgets")
     
     draw_message(current_screen_width) # Draw message on top of all
+    profiler.lap("message")
+
+def draw_profile_overlay():
+    """Draws the frame phase percentiles in the top left corner; returns the area covered."""
+    global profile_overlay
+    now = time.perf_counter_ns()
+    if profile_overlay is None or now - profile_overlay[1] > PROFILE_REFRESH_NS:
+        font = render_cache.font('toggle', PROFILE_FONT_SIZE)
+        rows = [("ms", "p50", "p99", "max")]
+        rows += [(phase, f"{p50:.2f}", f"{p99:.2f}", f"{worst:.2f}")
+                 for phase, (p50, p99), worst in profiler.summary()]
+        line_height = font.get_linesize()
+        surface = pygame.Surface((PROFILE_COLUMNS[-1] + 60, line_height * len(rows) + 8))
+        surface.fill(BLACK)
+        for i, row in enumerate(rows):
+            for x, cell in zip(PROFILE_COLUMNS, row):
+                surface.blit(font.render(cell, True, WHITE), (x + 4, i * line_height + 4))
+        profile_overlay = (surface, now)
+    return screen.blit(profile_overlay[0], (0, 0))
+
+def toggle_profiler():
+    global needs_full_redraw, profile_overlay
+    profiler.toggle()
+    # Repaint without the overlay (or with a fresh one)
+    profile_overlay = None
+    needs_full_redraw = True
+
+def render():
+    """Redraws only the widgets whose state changed since the last call.
+
+    Returns True if anything was pushed to the display.
+    """
+    global last_view, needs_full_redraw
+    current_screen_width, current_screen_height = screen.get_size()
+    view = capture_view()
+    old = last_view
+    last_view = view
+    profiler.lap("capture")
+    
+    # Cell changes start (or stop) animations; a different board stops them all
+    same_board = old is not None and view["board"] == old["board"]
+    changes = take_cell_changes(full=not same_board)
+    if same_board:
+        start_animations(changes)
+    else:
+        animator.cancel_all()
+    ticked = animator.advance()
+    finished = animator.take_finished()
+    
+    # Layout-level changes (resize, buttons replacing the keyboard, toggle) repaint everything
+    if needs_full_redraw or old is None or any(
+            view[k] != old[k] for k in ("size", "board", "endless", "hard", "buttons")):
+        needs_full_redraw = False
+        draw_everything(current_screen_width, current_screen_height)
+        if animator.active:
+            draw_animations(shown_cells)
+            profiler.lap("animation")
+        if profiler.enabled:
+            draw_profile_overlay()
+            profiler.lap("overlay")
+        pygame.display.flip()
+        profiler.lap("flip")
+        return True
+    
+    dirty = []
+    if changes:
+        dirty += draw_grid(current_screen_width, only=[position for position, _, _ in changes])
+    profiler.lap("grid")
+    
+    if view["keys"] != old["keys"]:
+        changed_keys = {
+            letter
+            for letter, new_color, old_color in zip(ALPHABET, view["keys"], old["keys"])
+            if new_color != old_color
+        }
+        dirty += draw_keyboard(current_screen_width, current_screen_height, only=changed_keys)
+    profiler.lap("keyboard")
+    
+    if view["candidates"] != old["candidates"]:
+        band = candidate_rect(current_screen_width)
+        screen.fill(WHITE, band)
+        draw_candidate_count(current_screen_width)
+        dirty.append(band)
+    profiler.lap("widgets")
+    
+    if view["message"] != old["message"]:
+        band = message_rect(current_screen_width)
+        screen.fill(WHITE, band)
+        draw_message(current_screen_width)
+        dirty.append(band)
+    profiler.lap("message")
     
-    pygame.display.flip()
-    clock.tick(60)
+    # Animations draw over the rest (the pop overhang reaches into the message band),
+    # so they are redrawn whenever anything under them was
+    if finished:
+        dirty += draw_finished_animations(finished, shown_cells)
+    if animator.active and (ticked or dirty):
+        dirty += draw_animations(shown_cells)
+    profiler.lap("animation")
+    
+    if profiler.enabled:
+        # Drawn over whatever was just repainted, every frame while it is on
+        dirty.append(draw_profile_overlay())
+        profiler.lap("overlay")
+    
+    if dirty:
+        pygame.display.update(dirty)
+        profiler.lap("flip")
+    return bool(dirty)
+
+
+def save_session():
+    """Saves an unfinished game so the next launch resumes it (single-board local games only)."""
+    if not save_enabled or game is None or is_multi_board() or is_remote() or is_absurdle():
+        return
+    save_path = os.path.join(DATA_DIR, SAVE_FILE)
+    try:
+        if game.game_over or not game.guesses and not game.current:
+            if os.path.exists(save_path):
+                os.remove(save_path)
+        else:
+            save_game(game, save_path)
+    except OSError as e:
+        print(f"Warning: Could not save the current game. Error: {e}", file=sys.stderr)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Wordle")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="print how long each startup phase took")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="quit as soon as startup finishes (for CI timing runs)")
+    parser.add_argument("--length", type=int, choices=WORD_LENGTHS, default=DEFAULT_WORD_LENGTH,
+                        help="letters per word (needs data/word_list_N.txt)")
+    parser.add_argument("--rows", type=int, choices=ROW_COUNTS, default=GRID_ROWS,
+                        help="guesses per game")
+    parser.add_argument("--boards", type=int, choices=BOARD_COUNTS, default=1,
+                        help="boards played at once (4 = Quordle)")
+    parser.add_argument("--no-save", action="store_true",
+                        help="leave stats, replays and the saved game untouched (benchmarks)")
+    parser.add_argument("--no-animations", action="store_true",
+                        help="no tile flips, pops or row shakes")
+    parser.add_argument("--profile", action="store_true",
+                        help="show per-phase frame timings (F9 toggles; or set WORDLE_PROFILE=1)")
+    parser.add_argument("--profile-dump", metavar="FILE",
+                        help="also run cProfile while profiling and write its stats to FILE")
+    parser.add_argument("--absurdle", action="store_true",
+                        help="adversarial games: the word changes to dodge every guess")
+    parser.add_argument("--seed", type=int,
+                        help="replayable sequence of target words (not saved between runs)")
+    parser.add_argument("--daily", action="store_true", help="start with today's daily puzzle")
+    parser.add_argument("--connect", metavar="HOST[:PORT]",
+                        help="race other players on a server started with server.py")
+    parser.add_argument("--room", default="lobby", help="room to join on the race server")
+    parser.add_argument("--name", default=os.environ.get("USER") or "player",
+                        help="your name in the room")
+    return parser.parse_args(argv)
+
+
+def main(argv=None, on_frame=None):
+    """Runs the game. ``on_frame(events, rendered)`` is called after every frame
+    with the events that frame handled (see bench_input.py)."""
+    global screen, render_cache, startup_timer, audio, profiler, animator
+    global game, stats, endless_mode, absurdle_mode, needs_full_redraw
+    global word_length, grid_rows, board_count, save_enabled, target_seed, hard_mode
+    
+    args = parse_args(argv)
+    save_enabled = not args.no_save
+    target_seed = args.seed
+    startup_timer = PhaseTimer(enabled=args.startup_trace or None, start_ns=_launch_ns)
+    profiler = FrameProfiler(enabled=args.profile or None, dump_path=args.profile_dump)
+    animator = Animator(enabled=not args.no_animations)
+    word_length, grid_rows, board_count = args.length, args.rows, args.boards
+    absurdle_mode = args.absurdle
+    startup_timer.mark("python imports")
+    
+    # Only the subsystems needed for the first frame; the mixer starts in the loader
+    pygame.display.init()
+    pygame.font.init()
+    
+    # Set up the display
+    screen = pygame.display.set_mode(windowed_size(), pygame.RESIZABLE)
+    pygame.display.set_caption("Wordle")
+    update_layout()
+    startup_timer.mark("window opened")
+    render_cache = RenderCache()
+    # Load every font once up front instead of on first use
+    for role in FONT_SPECS:
+        render_cache.font(role)
+    startup_timer.mark("fonts loaded")
+    
+    # Draw the (empty) board straight away, then load everything else behind it
+    render()
+    startup_timer.mark("first frame")
+    audio = AudioSystem(DATA_DIR)
+    remote = None
+    if args.connect:
+        try:
+            remote = (parse_address(args.connect), args.room, args.name)
+        except ValueError:
+            print(f"Error: Bad server address '{args.connect}'", file=sys.stderr)
+            sys.exit(1)
+    threading.Thread(target=load_in_background, args=(remote,), name="loader", daemon=True).start()
+    
+    # Main game loop
+    clock = pygame.time.Clock()
+    running = True
+    events = []
+    
+    while running:
+        # Push whatever changed, then block until the next event while idle
+        rendered = render()
+        profiler.end()
+        if on_frame:
+            on_frame(events, rendered)
+        if animator.active:
+            # Animation frames are paced by waiting for input until the next animation tick,
+            # which (unlike clock.tick) returns as soon as a key is pressed
+            events = pygame.event.get() or [pygame.event.wait(animator.timeout_ms())]
+        else:
+            if rendered:
+                clock.tick(60) # Cap the redraw rate during bursts of input
+            events = pygame.event.get()
+            if not events:
+                events = [pygame.event.wait()]
+        # A frame is timed from here (events in hand) until its render() is done
+        profiler.begin()
+    
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+                
+            # Handle auto-reset timer for endless mode
+            elif event.type == RESET_GAME_EVENT:
+                reset_game()
+            
+            # Background loader finished: input is enabled from here on
+            elif event.type == LEXICON_READY_EVENT:
+                if event.lexicon is None:
+                    running = False
+                elif event.connection is not None:
+                    stats = event.stats
+                    start_race(event.connection, event.joined, event.lexicon)
+                    update_layout()
+                    startup_timer.mark("input ready")
+                else:
+                    game = new_game(event.lexicon)
+                    word_length = event.lexicon.length
+                    update_layout()
+                    stats = event.stats
+                    # Pick up an unfinished game from the last session
+                    if save_enabled and not is_multi_board() and not is_absurdle() \
+                            and load_game(game, os.path.join(DATA_DIR, SAVE_FILE)) and not game.game_over:
+                        # The save brings its own row count and Hard Mode
+                        grid_rows, hard_mode = game.rows, game.hard_mode
+                        update_layout()
+                        game.message = "Game resumed"
+                    elif args.daily:
+                        start_daily()
+                    else:
+                        start_round()
+                    # Hints are ready (or their first-run build is underway) before F1 is pressed
+                    warm_up_hints(game.lexicon)
+                    startup_timer.mark("input ready")
+            
+            elif event.type == NETWORK_EVENT:
+                handle_network_message(event.message)
+            
+            elif event.type == HINTS_READY_EVENT:
+                hints_ready(event)
+            
+            elif event.type == SOUNDS_READY_EVENT:
+                startup_timer.mark("startup complete")
+                startup_timer.report()
+                if args.exit_after_startup:
+                    running = False
+                
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_F11:
+                    toggle_fullscreen()
+                elif event.key == pygame.K_F1:
+                    show_hint()
+                elif event.key == pygame.K_F2:
+                    show_stats()
+                elif event.key == pygame.K_F3:
+                    cycle_word_length()
+                elif event.key == pygame.K_F4:
+                    cycle_rows()
+                elif event.key == pygame.K_F5:
+                    cycle_boards()
+                elif event.key == pygame.K_F6:
+                    start_daily()
+                elif event.key == pygame.K_F7:
+                    toggle_absurdle()
+                elif event.key == pygame.K_F9:
+                    toggle_profiler()
+                # Pass key presses to the handler (it will check for game_over)
+                elif event.key == pygame.K_BACKSPACE:
+                    handle_key_press("BACKSPACE")
+                elif event.key == pygame.K_RETURN:
+                    handle_key_press("RETURN")
+                elif event.unicode.isalpha():
+                    handle_key_press(event.unicode.upper())
+                    
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # 1. Check the Endless Mode and Hard Mode toggles first (always active)
+                # We check both the box and the text for easier clicking
+                if endless_toggle_rect.collidepoint(event.pos) or \
+                   endless_toggle_text_rect.collidepoint(event.pos):
+                    endless_mode = not endless_mode
+                    # If we toggle this while buttons are showing, hide them
+                    if show_end_game_buttons:
+                        reset_game() # Allow playing again
+                    
+                elif hard_toggle_rect.collidepoint(event.pos) or \
+                   hard_toggle_text_rect.collidepoint(event.pos):
+                    toggle_hard_mode()
+                    
+                # 2. Check for end-game buttons (only if showing)
+                elif show_end_game_buttons:
+                    if continue_button_rect.collidepoint(event.pos):
+                        reset_game()
+                    elif exit_button_rect.collidepoint(event.pos):
+                        running = False
+                        
+                # 3. Check for keyboard (only if game is not over)
+                elif game is not None and not game.game_over:
+                    # Pass current dimensions to the click handler
+                    key = get_keyboard_key(event.pos, screen.get_width(), screen.get_height())
+                    if key:
+                        handle_key_press(key)
+                        
+            # Handle window resize event
+            elif event.type == pygame.VIDEORESIZE:
+                if not fullscreen:
+                    # Update the screen surface to the new size
+                    screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
+                    update_layout()
+                    render_cache.clear()
+                    needs_full_redraw = True
+            
+            # Window uncovered or restored: the OS may have discarded our pixels
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                needs_full_redraw = True
+        profiler.lap("events")
+    
+    save_session()
+    if stats:
+        stats.close()
+    if connection:
+        connection.close()
+    profiler.stop()
+    profiler.report()
+    pygame.quit()
+    sys.exit()
+
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Multi-board (Quordle-style) games: one guess is scored against several targets at once."""
+import random
+
+from engine import LOST, PLAYING, WON, WordleGame
+from patterns import decode_pattern, score_batch, words_to_array
+
+# Board counts offered by the GUI; each board gets (boards + 5) rows, as in Quordle/Octordle
+BOARD_COUNTS = (1, 4, 8, 16)
+EXTRA_ROWS = 5
+
+
+def rows_for(boards):
+    return boards + EXTRA_ROWS
+
+
+class MultiBoardGame:
+    """Several WordleGame boards sharing one guess row and keyboard input.
+
+    Every board keeps its own guesses/marks/keyboard state, so the GUI can
+    draw each panel exactly like a single game. A board stops taking
+    guesses once it is solved. Each guess is scored against all of the
+    still-open targets in one NumPy call (patterns.score_batch).
+    """
+
+    __slots__ = ("lexicon", "rng", "rows", "boards", "guesses", "current",
+                 "status", "message", "hard_mode", "_targets", "_decoded", "_changed")
+
+    def __init__(self, lexicon, boards=4, rows=None, rng=None, targets=None):
+        self.lexicon = lexicon
+        self.rng = rng if rng is not None else random.Random()
+        self.rows = rows if rows is not None else rows_for(boards)
+        self.hard_mode = False  # Hard Mode only applies to single boards
+        self.boards = tuple(WordleGame(lexicon, rows=self.rows, rng=self.rng) for _ in range(boards))
+        self._decoded = {}
+        self.reset(targets)
+
+    def reset(self, targets=None):
+        """Starts a new round with distinct random targets unless they are given."""
+        if targets is None:
+            targets = self.rng.sample(self.lexicon.words, len(self.boards))
+        self.guesses = []
+        self.current = []
+        for board, target in zip(self.boards, targets):
+            board.reset(target)
+            board.current = self.current  # Typed letters show on every open board
+        self._targets = words_to_array(targets)
+        self.status = PLAYING
+        self.message = ""
+        self._changed = None
+
+    @property
+    def targets(self):
+        return [board.target for board in self.boards]
+
+    @property
+    def word_length(self):
+        return self.lexicon.length
+
+    @property
+    def row(self):
+        return len(self.guesses)
+
+    @property
+    def col(self):
+        return len(self.current)
+
+    @property
+    def game_over(self):
+        return self.status != PLAYING
+
+    @property
+    def solved(self):
+        return sum(board.status == WON for board in self.boards)
+
+    def take_changed_cells(self):
+        """The (board, row, col) cells changed since the last call, or None if any cell may have."""
+        changed, self._changed = self._changed, set()
+        for b, board in enumerate(self.boards):
+            cells = board.take_changed_cells()
+            if cells is None:
+                changed = None
+            elif changed is not None:
+                changed.update((b, row, col) for _, row, col in cells)
+        return changed
+
+    def _touch(self, col):
+        # Typed letters are shared, so they change the current row of every open board
+        if self._changed is not None:
+            row = len(self.guesses)
+            self._changed.update((b, row, col) for b, board in enumerate(self.boards)
+                                 if board.status == PLAYING)
+
+    # --- Input ---
+    def type_letter(self, letter):
+        if self.status != PLAYING or len(self.current) >= self.lexicon.length:
+            return False
+        self.current.append(letter)
+        self._touch(len(self.current) - 1)
+        self.message = ""
+        return True
+
+    def delete_letter(self):
+        if self.status != PLAYING or not self.current:
+            return False
+        self.current.pop()
+        self._touch(len(self.current))
+        self.message = ""
+        return True
+
+    def submit(self):
+        """Scores the current row on every open board. Returns {board index: marks} or None."""
+        if self.status != PLAYING:
+            return None
+        if len(self.current) != self.lexicon.length:
+            self.message = "Word too short"
+            return None
+        return self.guess("".join(self.current))
+
+    def guess(self, word):
+        """Submits a whole word at once (headless play)."""
+        if self.status != PLAYING:
+            return None
+        if word not in self.lexicon:
+            self.message = "Not in word list"
+            return None
+        open_boards = [i for i, board in enumerate(self.boards) if board.status == PLAYING]
+        # One vectorized call scores the guess against every open target
+        codes = score_batch(words_to_array([word]), self._targets[open_boards])[0]
+        results = {}
+        self.guesses.append(word)
+        self.current = []
+        for i, code in zip(open_boards, codes.tolist()):
+            board = self.boards[i]
+            results[i] = board._apply(word, self._marks(code))
+            board.current = self.current if board.status == PLAYING else []
+        self._update_status()
+        return results
+
+    def _marks(self, code):
+        marks = self._decoded.get(code)
+        if marks is None:
+            marks = self._decoded[code] = decode_pattern(code, self.lexicon.length)
+        return list(marks)
+
+    def _update_status(self):
+        solved = self.solved
+        if solved == len(self.boards):
+            self.status = WON
+            self.message = "You Win!"
+        elif len(self.guesses) >= self.rows:
+            self.status = LOST
+            self.message = f"Game Over! {solved} of {len(self.boards)} boards solved"
+        else:
+            self.message = ""
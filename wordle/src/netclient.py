@@ -0,0 +1,147 @@
+"""Client side of the race server (server.py): a socket connection and a remote-scored game."""
+import socket
+import threading
+
+from engine import LOST, PLAYING, WordleGame
+from server import DEFAULT_PORT, decode_message, encode_message
+
+CONNECT_TIMEOUT = 5.0
+
+
+class NetworkError(Exception):
+    """The race server could not be reached or refused us."""
+
+
+def parse_address(text):
+    """'host', 'host:port' -> (host, port)."""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host or "localhost", int(port) if port else DEFAULT_PORT
+
+
+class Connection:
+    """A line-based JSON connection. Incoming messages go to ``on_message`` from a reader thread.
+
+    ``on_message(None)`` is called once when the connection closes.
+    """
+
+    def __init__(self, address, timeout=CONNECT_TIMEOUT):
+        try:
+            self.sock = socket.create_connection(address, timeout=timeout)
+        except OSError as e:
+            raise NetworkError(f"Could not connect to {address[0]}:{address[1]}: {e}") from None
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile('rb')
+        self.send_lock = threading.Lock()
+        self.on_message = None
+
+    def send(self, message):
+        with self.send_lock:
+            self.sock.sendall(encode_message(message))
+
+    def receive(self):
+        """Blocking read of one message (used for the handshake, before start())."""
+        line = self.file.readline()
+        if not line:
+            raise NetworkError("Server closed the connection")
+        return decode_message(line)
+
+    def join(self, room, name):
+        """Joins ``room``; returns the server's 'joined' message."""
+        self.send({"op": "join", "room": room, "name": name})
+        while True:
+            message = self.receive()
+            if message.get("op") == "joined":
+                return message
+            if message.get("op") == "error":
+                raise NetworkError(message.get("message", "Join refused"))
+
+    def start(self, on_message):
+        """Hands every further message to ``on_message`` from a daemon thread."""
+        self.on_message = on_message
+        self.sock.settimeout(None)
+        threading.Thread(target=self._read_loop, name="network", daemon=True).start()
+
+    def _read_loop(self):
+        try:
+            for line in self.file:
+                try:
+                    message = decode_message(line)
+                except ValueError:
+                    continue
+                self.on_message(message)
+        except OSError:
+            pass
+        self.on_message(None)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RemoteGame(WordleGame):
+    """A WordleGame whose guesses are scored by the server.
+
+    submit() only sends the row; apply_result() fills it in when the
+    server's answer arrives. The target is never known locally.
+    """
+
+    __slots__ = ("connection", "player", "pending", "seq")
+
+    def __init__(self, lexicon, connection, player, rows):
+        self.connection = connection
+        self.player = player
+        self.pending = None
+        self.seq = 0
+        super().__init__(lexicon, rows=rows, target="")
+
+    def reset(self, target=""):
+        super().reset(target)
+        self.pending = None
+        self.seq += 1  # Answers still in flight belong to the old round
+
+    def delete_letter(self):
+        # The row being scored stays as typed until the answer arrives
+        return self.pending is None and super().delete_letter()
+
+    def submit(self):
+        if self.status != PLAYING or self.pending is not None:
+            return None
+        if len(self.current) != self.lexicon.length:
+            self.message = "Word too short"
+            return None
+        word = "".join(self.current)
+        if word not in self.lexicon:
+            self.message = "Not in word list"
+            return None
+        self.seq += 1
+        try:
+            self.connection.send({"op": "guess", "word": word, "seq": self.seq})
+        except OSError:
+            self.message = "Disconnected from server"
+            return None
+        self.pending = word
+        return None
+
+    def apply_result(self, message):
+        """Applies the server's 'result' or 'error' answer to our pending row."""
+        if message.get("seq") != self.seq:
+            return  # Answer to a row from an earlier round
+        self.pending = None
+        if message["op"] == "error":
+            self.message = message.get("message", "")
+            return
+        self._touch(len(self.guesses), range(self.lexicon.length))
+        self.guesses.append(message["word"])
+        self.marks.append([int(c) for c in message["marks"]])
+        self.current = []
+        self.status = message["status"]
+        self.message = message["message"]
+
+    def end_round(self, message):
+        """The server closed the round (someone won, or everyone is done)."""
+        if self.status == PLAYING:
+            self.status = LOST
+        self.pending = None
+        self.message = message
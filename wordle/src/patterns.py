@@ -0,0 +1,223 @@
+"""Feedback patterns as base-3 integers, and the NumPy guess x answer pattern matrix.
+
+A pattern packs the tile marks of one guess into a single integer:
+``sum(mark * 3**i)`` with ABSENT=0, PRESENT=1, CORRECT=2, so a 5-letter
+pattern is in 0..242 and fits in a uint8.
+"""
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from atomic_file import atomic_path
+from engine import PRESENT, CORRECT, score_guess
+
+# Bump whenever the scoring rules or the encoding change (invalidates caches)
+SCORING_VERSION = 1
+
+# Guesses scored per NumPy batch; small enough for the temporaries to stay in cache
+CHUNK_SIZE = 64
+
+CACHE_PREFIX = "patterns-"
+# A half-written cache this old was left by a process that quit mid-build
+STALE_TMP_SECONDS = 600
+
+
+def encode_marks(marks):
+    """Packs a list of tile marks into a base-3 pattern code."""
+    code = 0
+    for mark in reversed(marks):
+        code = code * 3 + mark
+    return code
+
+
+def decode_pattern(code, length=5):
+    """Unpacks a pattern code back into a list of tile marks."""
+    marks = []
+    for _ in range(length):
+        code, mark = divmod(code, 3)
+        marks.append(mark)
+    return marks
+
+
+def all_correct(length=5):
+    """Returns the pattern code of a solved row."""
+    return 3 ** length - 1
+
+
+def pattern_dtype(length):
+    """Smallest unsigned dtype that can hold every pattern of this word length."""
+    return np.uint8 if 3 ** length <= 256 else np.uint16
+
+
+def score_pattern(guess, target):
+    """Scalar scorer: the pattern code for one (guess, target) pair."""
+    return encode_marks(score_guess(guess, target))
+
+
+def words_to_array(words):
+    """Encodes equal-length uppercase words as a (N, L) uint8 array of letter indexes."""
+    words = list(words)
+    if not words:
+        return np.zeros((0, 0), dtype=np.uint8)
+    raw = np.frombuffer("".join(words).encode('ascii'), dtype=np.uint8)
+    return (raw.reshape(len(words), len(words[0])) - ord('A')).astype(np.uint8)
+
+
+def score_batch(guesses, answers):
+    """Scores every guess against every answer.
+
+    ``guesses`` is (G, L) and ``answers`` is (A, L), both from words_to_array().
+    Returns a (G, A) array of pattern codes. Yellows follow the same rule as
+    score_guess(): the k-th non-green copy of a letter in the guess is yellow
+    only if the answer has at least k non-green copies of it.
+    """
+    length = guesses.shape[1]
+    g = guesses[:, None, :]                      # (G, 1, L)
+    a = answers[None, :, :]                      # (1, A, L)
+    green = g == a                               # (G, A, L)
+    # Answer letters left over after the greens (matched slots become 255)
+    open_answer = [np.where(green[..., j], np.uint8(255), a[..., j]) for j in range(length)]
+
+    codes = np.zeros(green.shape[:2], dtype=np.uint16)
+    weight = 1
+    for i in range(length):
+        letter = g[..., i]
+        available = np.zeros(green.shape[:2], dtype=np.uint8)
+        for j in range(length):
+            available += open_answer[j] == letter
+        # Earlier non-green copies of the same letter in the guess use up supply
+        used = np.zeros(green.shape[:2], dtype=np.uint8)
+        for k in range(i):
+            same = guesses[:, k] == guesses[:, i]
+            if same.any():
+                used += same[:, None] & ~green[..., k]
+        yellow = ~green[..., i] & (available > used)
+        codes += weight * (CORRECT * green[..., i] + PRESENT * yellow).astype(np.uint16)
+        weight *= 3
+    return codes.astype(pattern_dtype(length))
+
+
+def pattern_matrix(guess_words, answer_words=None, chunk_size=CHUNK_SIZE, out=None):
+    """Builds the full guess x answer pattern matrix for two word lists.
+
+    ``out`` may be a preallocated (e.g. memory-mapped) array to fill in place.
+    """
+    guesses = words_to_array(guess_words)
+    answers = guesses if answer_words is None else words_to_array(answer_words)
+    length = guesses.shape[1]
+    if out is None:
+        out = np.empty((len(guesses), len(answers)), dtype=pattern_dtype(length))
+    for start in range(0, len(guesses), chunk_size):
+        stop = start + chunk_size
+        out[start:stop] = score_batch(guesses[start:stop], answers)
+    return out
+
+
+class PatternTable:
+    """O(1) (guess, answer) -> pattern lookups over a lexicon's pattern matrix.
+
+    Rows are guesses and columns are answers, both indexed by lexicon word id.
+    ``cache_file`` is the backing .npy file when the matrix is memory-mapped.
+    """
+
+    __slots__ = ("lexicon", "matrix", "cache_file")
+
+    def __init__(self, lexicon, matrix=None, cache_file=None):
+        self.lexicon = lexicon
+        self.matrix = matrix if matrix is not None else pattern_matrix(lexicon.words)
+        self.cache_file = cache_file
+
+    def pattern(self, guess, answer):
+        ids = self.lexicon.ids
+        return int(self.matrix[ids[guess], ids[answer]])
+
+    def pattern_by_id(self, guess_id, answer_id):
+        return int(self.matrix[guess_id, answer_id])
+
+    def row(self, guess):
+        """All patterns of ``guess`` against every answer, by answer id."""
+        return self.matrix[self.lexicon.ids[guess]]
+
+
+# --- On-disk cache ---
+def word_list_hash(filepath):
+    """SHA-256 of the word list file contents."""
+    with open(filepath, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def length_prefix(length):
+    """File name prefix shared by every pattern cache for one word length."""
+    return f"{CACHE_PREFIX}L{length}-"
+
+
+def cache_path(cache_dir, content_hash, length=5):
+    """Cache file for a word length, word list hash and the current SCORING_VERSION."""
+    return os.path.join(cache_dir, f"{length_prefix(length)}v{SCORING_VERSION}-{content_hash[:16]}.npy")
+
+
+def build_pattern_cache(words, path):
+    """Writes the pattern matrix for ``words`` to ``path`` through a temp file."""
+    words = list(words)
+    shape = (len(words), len(words))
+    # Other processes only ever see a complete file
+    with atomic_path(path) as tmp_path:
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=pattern_dtype(len(words[0])), shape=shape)
+        try:
+            pattern_matrix(words, out=out)
+            out.flush()
+        finally:
+            del out  # Unmapped before the rename
+
+
+def remove_stale_caches(cache_dir, keep, length=5):
+    """Deletes pattern caches (and their sidecar files) for other word lists or versions.
+
+    Caches for other word lengths are left alone; each length keeps its newest one.
+    Abandoned temp files (the game quit while the hint engine was building
+    one) go too.
+    """
+    stem = os.path.splitext(keep)[0]
+    prefix = length_prefix(length)
+    now = time.time()
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if not name.startswith(prefix):
+            continue
+        stale = name.endswith(".npy") and not path.startswith(stem)
+        if name.endswith(".tmp"):
+            try:
+                stale = now - os.path.getmtime(path) > STALE_TMP_SECONDS
+            except OSError:
+                stale = False
+        if stale:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def load_pattern_table(lexicon, word_list_file, cache_dir):
+    """Returns a PatternTable backed by a read-only memory-mapped cache file.
+
+    The cache is keyed by the word list contents and SCORING_VERSION, and is
+    (re)built only when no matching file exists. Every process that opens it
+    shares the same pages from the OS page cache.
+    """
+    path = cache_path(cache_dir, word_list_hash(word_list_file), lexicon.length)
+    expected = (len(lexicon), len(lexicon))
+    matrix = None
+    if os.path.exists(path):
+        try:
+            matrix = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            matrix = None
+        if matrix is not None and matrix.shape != expected:
+            matrix = None
+    if matrix is None:
+        build_pattern_cache(lexicon.words, path)
+        remove_stale_caches(cache_dir, keep=path, length=lexicon.length)
+        matrix = np.load(path, mmap_mode='r')
+    return PatternTable(lexicon, matrix, cache_file=path)
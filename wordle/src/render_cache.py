@@ -0,0 +1,173 @@
+"""Font, text and tile surface cache for the pygame GUI."""
+import math
+from collections import OrderedDict
+
+import pygame
+
+# Font roles used by the draw_* functions: (name, size, bold)
+FONT_SPECS = {
+    'cell': ('Arial', 36, False),
+    'small': ('Arial', 24, False),
+    'button': ('Arial', 28, True),
+    'toggle': ('Arial', 18, False),
+    'title': ('Arial', 40, True),
+}
+
+WHITE = (255, 255, 255)
+
+# Cell letters use the 'cell' font at this tile size and scale down with smaller tiles
+FULL_CELL_SIZE = 60
+MIN_LETTER_SIZE = 6
+
+
+class RenderCache:
+    """Memoizes rendered text and pre-composited cell/key tiles.
+
+    Fonts are loaded once per process. Rendered surfaces live in a bounded
+    LRU keyed by everything that affects their pixels, and are dropped by
+    clear() when the window is resized or fullscreen is toggled.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, role, size=None):
+        """The font for ``role``, optionally at a point ``size`` other than its default."""
+        key = role if size is None else (role, size)
+        font = self.fonts.get(key)
+        if font is None:
+            name, default_size, bold = FONT_SPECS[role]
+            font = pygame.font.SysFont(name, size or default_size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+    def _get(self, key):
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+        else:
+            self.misses += 1
+        return surface
+
+    def _put(self, key, surface):
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def text(self, text, role, color, size=None):
+        """A rendered (antialiased) text surface."""
+        key = ('text', text, role, color, size)
+        surface = self._get(key)
+        if surface is None:
+            surface = self._put(key, self.font(role, size).render(text, True, color))
+        return surface
+
+    def cell_tile(self, letter, fill, border, text_color, size):
+        """A grid cell: background, 2px border and centered letter in one surface."""
+        key = ('cell', letter, fill, border, text_color, size)
+        surface = self._get(key)
+        if surface is None:
+            surface = pygame.Surface((size, size))
+            surface.fill(fill)
+            pygame.draw.rect(surface, border, (0, 0, size, size), 2 if size >= 16 else 1)
+            # Smaller boards (long words, many rows, multi-board) get a scaled-down letter
+            font_size = None
+            if size < FULL_CELL_SIZE:
+                font_size = FONT_SPECS['cell'][1] * size // FULL_CELL_SIZE
+            if letter and (font_size is None or font_size >= MIN_LETTER_SIZE):
+                text = self.text(letter, 'cell', text_color, font_size)
+                surface.blit(text, text.get_rect(center=(size // 2, size // 2)))
+            self._put(key, surface)
+        return surface
+
+    def key_tile(self, label, color, text_color, width, height):
+        """A keyboard key with rounded corners.
+
+        ``color`` may be a (left, right) split pair, or one color per board in
+        multi-board mode, drawn as a grid of patches (2x2 for 4 boards, ...).
+        """
+        key = ('key', label, color, text_color, width, height)
+        surface = self._get(key)
+        if surface is None:
+            surface = pygame.Surface((width, height))
+            surface.fill(WHITE)
+            if isinstance(color[0], tuple) and len(color) > 2:
+                self._draw_patches(surface, color, width, height)
+            elif isinstance(color[0], tuple):
+                # Split key design: left and right halves
+                left, right = color
+                left_width = width // 2
+                pygame.draw.rect(surface, left, (0, 0, left_width, height),
+                                 border_top_left_radius=5, border_bottom_left_radius=5)
+                pygame.draw.rect(surface, right, (left_width, 0, width - left_width, height),
+                                 border_top_right_radius=5, border_bottom_right_radius=5)
+            else:
+                pygame.draw.rect(surface, color, (0, 0, width, height), border_radius=5)
+            text = self.text(label, 'small', text_color)
+            surface.blit(text, text.get_rect(center=(width // 2, height // 2)))
+            self._put(key, surface)
+        return surface
+
+    @staticmethod
+    def _draw_patches(surface, colors, width, height):
+        across = math.ceil(math.sqrt(len(colors)))
+        down = math.ceil(len(colors) / across)
+        patches = pygame.Surface((width, height), pygame.SRCALPHA)
+        for i, patch_color in enumerate(colors):
+            row, col = divmod(i, across)
+            x0, x1 = col * width // across, (col + 1) * width // across
+            y0, y1 = row * height // down, (row + 1) * height // down
+            patches.fill(patch_color, (x0, y0, x1 - x0, y1 - y0))
+        # Round the outer corners like a plain key
+        mask = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, width, height), border_radius=5)
+        patches.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+        surface.blit(patches, (0, 0))
+
+    def clear(self):
+        """Drops every cached surface (fonts are kept)."""
+        self.surfaces.clear()
+
+    def stats(self):
+        return {"entries": len(self.surfaces), "hits": self.hits, "misses": self.misses}
+
+
+class SpriteAtlas:
+    """Pre-rendered animation frames for every letter tile at one cell size.
+
+    A strip holds one animation's frames side by side: frame i is the tile
+    scaled to ``frame_sizes[i]`` (width, height) and centered in a ``box`` x
+    ``box`` square of white, so it is blitted with area (i * box, 0, box, box)
+    and covers whatever frame came before. Everything is built up front, for
+    each new cell size, and kept out of the RenderCache LRU: nothing is
+    scaled, evicted or rebuilt while an animation plays.
+    """
+
+    __slots__ = ("size", "strips")
+
+    def __init__(self, size):
+        self.size = size
+        self.strips = {}
+
+    def add(self, name, letters, fill, border, text_color, frame_sizes, box, cache):
+        """Builds the ``name`` strip of every letter in ``letters`` on a ``fill`` tile."""
+        for letter in letters:
+            tile = cache.cell_tile(letter, fill, border, text_color, self.size)
+            surface = pygame.Surface((box * len(frame_sizes), box))
+            surface.fill(WHITE)
+            for i, (width, height) in enumerate(frame_sizes):
+                if width <= 0 or height <= 0:
+                    continue
+                frame = tile if (width, height) == (self.size, self.size) else \
+                    pygame.transform.smoothscale(tile, (width, height))
+                surface.blit(frame, (i * box + (box - width) // 2, (box - height) // 2))
+            self.strips[(name, letter, fill)] = surface
+
+    def strip(self, name, letter, fill):
+        return self.strips[(name, letter, fill)]
@@ -0,0 +1,213 @@
+"""Target words for random games: common words more often, and no repeats.
+
+Words are drawn in cycles (a "shuffle-bag"): every word comes up once per
+cycle, and within a cycle each draw is weighted by word frequency, so
+common words tend to come early and obscure ones late. A draw is O(1)
+expected: an alias table over the words left in the bag, with words
+already drawn rejected, rebuilt whenever half of the bag's weight has
+been used up.
+
+Frequencies come from data/word_freq_<length>.txt ("crane 1234" lines)
+or an optional second column in the word list; without either, the
+list's own order (most common first) gives Zipf-like weights. The
+sampler is seeded and its whole state (the generator state plus the bag
+and alias table as bitmasks) is saved to
+data/targets_<length>.json after every draw, so a session continues
+exactly where the last one stopped, at a cost that does not grow with the
+number of draws, and a seed replays the same words.
+"""
+import json
+import os
+import random
+import sys
+
+from assets import DATA_DIR, frequency_file, load_word_weights, word_list_file
+from atomic_file import atomic_write
+from daily import words_digest
+
+TARGETS_FILE = "targets_{length}.json"
+ZIPF_OFFSET = 10        # Weight of the word at rank r is 1 / (r + ZIPF_OFFSET)
+REBUILD_FRACTION = 0.5  # Rebuild the alias table once this share of its weight is drawn
+
+
+def ids_to_hex(ids, count):
+    """A set of ids below ``count`` as a hex bitmask (bit i of byte i // 8)."""
+    bits = bytearray((count + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return bits.hex()
+
+
+def hex_to_ids(text, count):
+    bits = bytes.fromhex(text)
+    if len(bits) != (count + 7) // 8:
+        raise ValueError("bitmask size does not match the word list")
+    return [i for i in range(count) if bits[i >> 3] >> (i & 7) & 1]
+
+
+def rank_weights(count):
+    """Weights for a frequency-ordered list with no frequency column."""
+    return [1.0 / (rank + ZIPF_OFFSET) for rank in range(count)]
+
+
+class AliasTable:
+    """Vose's alias method: O(n) to build, O(1) per weighted draw of one of ``items``."""
+
+    __slots__ = ("items", "prob", "alias")
+
+    def __init__(self, items, weights):
+        n = len(items)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self.items = items
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding error
+
+    def sample(self, rng):
+        i = rng.randrange(len(self.items))
+        return self.items[i if rng.random() < self.prob[i] else self.alias[i]]
+
+
+class TargetSampler:
+    """Frequency-weighted target words, without repeats until every word has been drawn."""
+
+    __slots__ = ("words", "weights", "seed", "position", "path", "rng",
+                 "remaining", "remaining_weight", "table", "table_weight")
+
+    def __init__(self, words, weights=None, seed=None, position=0, path=None, state=None):
+        self.words = words
+        self.weights = weights if weights is not None else rank_weights(len(words))
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(32)
+        self.path = path
+        self.rng = random.Random(self.seed)
+        self.position = 0
+        self.remaining = set()
+        if state is not None:
+            self.restore(state, position)
+
+    def _refill(self):
+        self.remaining = set(range(len(self.words)))
+        self.remaining_weight = sum(self.weights)
+        self._rebuild()
+
+    def _rebuild(self, items=None):
+        items = sorted(self.remaining) if items is None else items
+        self.table = AliasTable(items, [self.weights[i] for i in items])
+        self.table_weight = sum(self.weights[i] for i in items) if items else 0.0
+
+    def state(self):
+        """Everything draw() depends on, JSON-ready: O(words) in size, however many draws were made."""
+        count = len(self.words)
+        return {
+            "rng": self.rng.getstate(),
+            "remaining": ids_to_hex(self.remaining, count),
+            "table": ids_to_hex(self.table.items, count) if self.remaining else "",
+        }
+
+    def restore(self, state, position):
+        """Continues from state(): the next draws are the ones the saved sampler would have made.
+
+        Raises ValueError (or TypeError/KeyError) if ``state`` does not fit this word list.
+        """
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+        count = len(self.words)
+        self.remaining = set(hex_to_ids(state["remaining"], count))
+        if self.remaining:
+            self.remaining_weight = sum(self.weights[i] for i in self.remaining)
+            items = hex_to_ids(state["table"], count)
+            if not items:
+                raise ValueError("empty alias table")
+            # The table as it was last rebuilt (draws since then were rejected from it)
+            self._rebuild(items)
+        self.position = position
+
+    def _draw_id(self, exclude=()):
+        """Draws the id of a word left in the bag and not in ``exclude``."""
+        if not self.remaining:
+            self._refill()
+        elif self.remaining_weight < self.table_weight * REBUILD_FRACTION:
+            self._rebuild()
+        while True:
+            i = self.table.sample(self.rng)
+            if i in self.remaining and i not in exclude:
+                break
+        self.remaining.remove(i)
+        self.remaining_weight -= self.weights[i]
+        self.position += 1
+        return i
+
+    def draw(self):
+        """The next target (without saving the position)."""
+        return self.words[self._draw_id()]
+
+    def take(self, count=1):
+        """The next ``count`` distinct targets, then saves the position.
+
+        When the bag runs out partway, the rest come from the new bag,
+        skipping the words this call already returned (they stay in the
+        new bag for later). Raises ValueError if ``count`` exceeds the
+        number of words.
+        """
+        if count > len(self.words):
+            raise ValueError(f"Cannot take {count} distinct targets from {len(self.words)} words")
+        taken = []
+        for _ in range(count):
+            taken.append(self._draw_id(taken))
+        self.save()
+        return [self.words[i] for i in taken]
+
+    def save(self):
+        if self.path is None:
+            return
+        try:
+            with atomic_write(self.path, 'w') as f:
+                json.dump({"seed": self.seed, "position": self.position,
+                           "words": words_digest(self.words).hex(), "state": self.state()}, f)
+        except OSError as e:
+            print(f"Warning: Could not save the target sampler. Error: {e}", file=sys.stderr)
+
+    @classmethod
+    def for_lexicon(cls, lexicon, data_dir=DATA_DIR, seed=None, persist=True):
+        """A sampler over ``lexicon``'s words.
+
+        With a ``seed``, the session starts from the beginning of that seed's
+        sequence and is not saved; otherwise the saved bag continues (or a
+        new one is started if there is none for this word list).
+        ``persist=False`` neither reads nor writes the saved bag.
+        """
+        words, weights = [], []
+        frequencies = load_word_weights(word_list_file(lexicon.length, data_dir), lexicon.length,
+                                        frequency_file(lexicon.length, data_dir))
+        if frequencies is None or len(frequencies) != len(lexicon.words):
+            frequencies = rank_weights(len(lexicon.words))
+        for word_id, (word, weight) in enumerate(zip(lexicon.words, frequencies)):
+            if lexicon.ids[word] == word_id:  # First copy of any duplicate
+                words.append(word)
+                weights.append(weight)
+        if seed is not None or not persist:
+            return cls(words, weights, seed)
+        path = os.path.join(data_dir, TARGETS_FILE.format(length=lexicon.length))
+        saved = {}
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if saved.get("words") == words_digest(words).hex() and isinstance(saved.get("seed"), int) \
+                and isinstance(saved.get("position"), int):
+            try:
+                return cls(words, weights, saved["seed"], max(0, saved["position"]), path,
+                           state=saved["state"])
+            except (KeyError, TypeError, ValueError):
+                pass  # Damaged state: start a new bag
+        return cls(words, weights, path=path)
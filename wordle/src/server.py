@@ -0,0 +1,289 @@
+"""LAN multiplayer server: Wordle races in many rooms, over newline-delimited JSON on TCP.
+
+Run from the 'src' directory:
+    python server.py [--host 0.0.0.0] [--port 7777]
+Then start clients with:  python main.py --connect HOST --room NAME --name ME
+
+Protocol (one JSON object per line; words in uppercase, marks as digits 0/1/2):
+    client -> server  {"op": "join", "room": "lobby", "name": "ann"}
+                      {"op": "guess", "word": "CRANE", "seq": 7}
+    server -> client  {"op": "joined", "room", "round", "length", "rows", "players"}
+                      {"op": "result", "seq", "word", "marks", "status", "message"}
+                      {"op": "error", "seq", "message"}
+                      {"op": "updates", "events": [...]}  (batched room broadcast)
+
+Every room shares the one read-only Lexicon. A guess is answered straight
+away to the guesser; the board updates it causes are queued per room and
+sent to everyone as a single pre-encoded message every BROADCAST_DELAY.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from assets import DEFAULT_WORD_LENGTH, load_lexicon
+from engine import GRID_ROWS, LOST, PLAYING, WON, score_guess
+
+DEFAULT_PORT = 7777
+BROADCAST_DELAY = 0.02      # seconds of room updates batched into one message
+ROUND_DELAY = 3.0           # pause between a finished round and the next
+MAX_CLIENT_BUFFER = 256 * 1024  # bytes queued for a client before it is dropped
+MAX_NAME = 24
+
+
+def encode_message(message):
+    return json.dumps(message, separators=(",", ":")).encode('ascii') + b"\n"
+
+
+def decode_message(line):
+    return json.loads(line)
+
+
+def encode_marks(marks):
+    return "".join(map(str, marks))
+
+
+class Player:
+    """One connection; everything the room needs to know about it."""
+
+    __slots__ = ("name", "writer", "row", "status")
+
+    def __init__(self, name, writer):
+        self.name = name
+        self.writer = writer
+        self.row = 0
+        self.status = PLAYING
+
+
+class Room:
+    """A race: every player guesses the same target; first to solve it wins the round."""
+
+    __slots__ = ("server", "name", "players", "round", "target_id", "over",
+                 "pending", "flush_handle")
+
+    def __init__(self, server, name):
+        self.server = server
+        self.name = name
+        self.players = {}
+        self.round = 0
+        self.target_id = 0
+        self.over = False
+        self.pending = []
+        self.flush_handle = None
+        self.new_round()
+
+    @property
+    def target(self):
+        return self.server.lexicon.words[self.target_id]
+
+    def new_round(self):
+        self.round += 1
+        self.target_id = self.server.rng.randrange(len(self.server.lexicon))
+        self.over = False
+        for player in self.players.values():
+            player.row = 0
+            player.status = PLAYING
+        self.queue({"type": "round", "round": self.round})
+
+    def add(self, player):
+        self.players[player.name] = player
+        self.queue({"type": "join", "player": player.name})
+
+    def remove(self, player):
+        if self.players.get(player.name) is player:
+            del self.players[player.name]
+            self.queue({"type": "leave", "player": player.name})
+            self.check_round_over()
+
+    def guess(self, player, word):
+        """Scores a guess. Returns the result message for the guesser."""
+        lexicon = self.server.lexicon
+        if self.over:
+            return {"op": "error", "message": "Round over, next one starting"}
+        if player.status != PLAYING:
+            return {"op": "error", "message": "You already finished this round"}
+        if word not in lexicon:
+            return {"op": "error", "message": "Not in word list"}
+        target = self.target
+        marks = score_guess(word, target)
+        player.row += 1
+        if word == target:
+            player.status = WON
+            message = "You Win!"
+        elif player.row >= self.server.rows:
+            player.status = LOST
+            message = f"Game Over! Word: {target}"
+        else:
+            message = ""
+        self.queue({"type": "row", "player": player.name, "row": player.row - 1,
+                    "marks": encode_marks(marks), "status": player.status})
+        if player.status == WON and not self.over:
+            self.finish(winner=player.name)
+        else:
+            self.check_round_over()
+        return {"op": "result", "word": word, "marks": encode_marks(marks),
+                "status": player.status, "message": message}
+
+    def check_round_over(self):
+        if not self.over and self.players and all(p.status != PLAYING for p in self.players.values()):
+            self.finish(winner=None)
+
+    def finish(self, winner):
+        self.over = True
+        self.queue({"type": "round_over", "winner": winner, "word": self.target})
+        asyncio.get_running_loop().call_later(ROUND_DELAY, self._next_round)
+
+    def _next_round(self):
+        if self.server.rooms.get(self.name) is self:
+            self.new_round()
+
+    # --- Batched broadcasts ---
+    def queue(self, event):
+        self.pending.append(event)
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(BROADCAST_DELAY, self.flush)
+
+    def flush(self):
+        """Sends every queued event to every player as one message, encoded once."""
+        self.flush_handle = None
+        if not self.pending:
+            return
+        data = encode_message({"op": "updates", "events": self.pending})
+        self.pending = []
+        for player in list(self.players.values()):
+            self.server.send_raw(player, data)
+
+
+class RaceServer:
+    """Owns the rooms and the shared lexicon; one instance per process."""
+
+    def __init__(self, lexicon, rows=GRID_ROWS, seed=None):
+        self.lexicon = lexicon
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self.rooms = {}
+        self.clients = 0
+        self.guesses = 0
+
+    def send_raw(self, player, data):
+        transport = player.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            # A client that stops reading must not make the server buffer forever
+            transport.abort()
+            return
+        player.writer.write(data)
+
+    def send(self, player, message):
+        self.send_raw(player, encode_message(message))
+
+    def join(self, player, room_name):
+        room = self.rooms.get(room_name)
+        if room is None:
+            room = self.rooms[room_name] = Room(self, room_name)
+        room.add(player)
+        return room
+
+    def leave(self, player, room):
+        room.remove(player)
+        if not room.players:
+            # Empty rooms cost nothing: drop them (pending timers see they are gone)
+            del self.rooms[room.name]
+            if room.flush_handle:
+                room.flush_handle.cancel()
+
+    async def handle_client(self, reader, writer):
+        self.clients += 1
+        player = None
+        room = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = decode_message(line)
+                    op = message["op"]
+                except (ValueError, KeyError, TypeError):
+                    writer.write(encode_message({"op": "error", "message": "Bad message"}))
+                    continue
+                if op == "join" and room is None:
+                    name = str(message.get("name") or "player")[:MAX_NAME]
+                    room_name = str(message.get("room") or "lobby")[:MAX_NAME]
+                    taken = self.rooms.get(room_name)
+                    base, n = name, 1
+                    while taken and name in taken.players:
+                        n += 1
+                        name = f"{base}{n}"
+                    player = Player(name, writer)
+                    room = self.join(player, room_name)
+                    self.send(player, {"op": "joined", "room": room.name, "name": name,
+                                       "round": room.round, "length": self.lexicon.length,
+                                       "rows": self.rows, "players": list(room.players)})
+                elif op == "guess" and room is not None:
+                    self.guesses += 1
+                    result = room.guess(player, str(message.get("word", "")).upper())
+                    result["seq"] = message.get("seq")
+                    self.send(player, result)
+                else:
+                    writer.write(encode_message({"op": "error", "message": f"Unexpected '{op}'"}))
+                if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.clients -= 1
+            if room is not None:
+                self.leave(player, room)
+            writer.close()
+
+    async def report(self, interval):
+        """Prints a status line every ``interval`` seconds."""
+        last, last_time = self.guesses, time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            rate = (self.guesses - last) / (now - last_time)
+            last, last_time = self.guesses, now
+            print(f"{self.clients} clients in {len(self.rooms)} rooms, {rate:.0f} guesses/s")
+
+
+async def serve(host, port, length=DEFAULT_WORD_LENGTH, rows=GRID_ROWS, report_interval=10.0):
+    lexicon = load_lexicon(length)
+    if lexicon is None:
+        print(f"Error: No {length}-letter word list in the data directory", file=sys.stderr)
+        return 1
+    race = RaceServer(lexicon, rows)
+    server = await asyncio.start_server(race.handle_client, host, port, backlog=1024)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Serving Wordle races on {addresses} ({len(lexicon)} words)")
+    if report_interval:
+        asyncio.get_running_loop().create_task(race.report(report_interval))
+    async with server:
+        await server.serve_forever()
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Wordle race server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--length", type=int, default=DEFAULT_WORD_LENGTH, help="letters per word")
+    parser.add_argument("--rows", type=int, default=GRID_ROWS, help="guesses per round")
+    parser.add_argument("--report", type=float, default=10.0, help="seconds between status lines (0 = off)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        return asyncio.run(serve(args.host, args.port, args.length, args.rows, args.report))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
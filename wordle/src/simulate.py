@@ -0,0 +1,155 @@
+"""Batch simulator: plays every word in the word list as the target, in parallel.
+
+Run from the 'src' directory:
+    python simulate.py                       # entropy solver, all words, all cores
+    python simulate.py --sample 500 --seed 7 --workers 4
+    python simulate.py --strategy candidate  # random consistent-candidate baseline
+
+Workers open the memory-mapped pattern cache themselves, so the 33 MB matrix
+is shared through the page cache and never pickled; only target ids and
+small result tuples cross process boundaries.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from assets import DATA_DIR, WORD_LIST_FILE, load_words
+from engine import GRID_ROWS
+from lexicon import Lexicon
+from patterns import all_correct, load_pattern_table
+from solver import Solver, opening_scores
+
+STRATEGIES = ("entropy", "candidate")
+
+# Per-process state, set up once by _init_worker()
+_table = None
+_strategy = None
+_seed = 0
+
+
+def _init_worker(strategy, seed):
+    global _table, _strategy, _seed
+    lexicon = Lexicon(load_words(WORD_LIST_FILE))
+    _table = load_pattern_table(lexicon, WORD_LIST_FILE, DATA_DIR)
+    _strategy = strategy
+    _seed = seed
+
+
+def play(table, target_id, strategy, rng, max_guesses=20):
+    """Plays one game. Returns the number of guesses needed (or max_guesses)."""
+    solver = Solver(table)
+    solved = all_correct(table.lexicon.length)
+    words = table.lexicon.words
+    for turn in range(1, max_guesses + 1):
+        if strategy == "entropy":
+            guess = solver.best_guess()
+        else:
+            guess = words[solver.candidates[rng.randrange(solver.remaining)]]
+        pattern = int(table.matrix[table.lexicon.ids[guess], target_id])
+        if pattern == solved:
+            return turn
+        solver.update(guess, pattern)
+    return max_guesses
+
+
+def _run_shard(target_ids):
+    results = []
+    for target_id in target_ids:
+        # Per-target RNG: results don't depend on how targets were sharded
+        rng = random.Random(_seed * 1_000_003 + int(target_id))
+        start = time.perf_counter_ns()
+        turns = play(_table, int(target_id), _strategy, rng)
+        results.append((int(target_id), turns, time.perf_counter_ns() - start))
+    return results
+
+
+def run(target_ids, strategy="entropy", seed=0, workers=None, shards_per_worker=4):
+    """Plays every target id across a process pool. Returns (target_id, turns, ns) tuples."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(strategy, seed)
+        return sorted(_run_shard(target_ids))
+    # Interleave targets so every shard gets a similar mix of easy and hard words
+    shard_count = max(1, min(len(target_ids), workers * shards_per_worker))
+    shards = [target_ids[i::shard_count] for i in range(shard_count)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(strategy, seed)) as pool:
+        for shard_results in pool.map(_run_shard, shards):
+            results.extend(shard_results)
+    return sorted(results)
+
+
+def summarize(results, max_rows=GRID_ROWS):
+    """Aggregate statistics for a list of (target_id, turns, ns) results."""
+    turns = np.array([r[1] for r in results])
+    latency_ms = np.array([r[2] for r in results]) / 1e6
+    histogram = {str(n): int((turns == n).sum()) for n in range(1, max_rows + 1)}
+    histogram["X"] = int((turns > max_rows).sum())
+    return {
+        "games": len(results),
+        "win_rate": float((turns <= max_rows).mean()),
+        "mean_guesses": float(turns.mean()),
+        "histogram": histogram,
+        "latency_ms": {
+            "mean": float(latency_ms.mean()),
+            "p50": float(np.percentile(latency_ms, 50)),
+            "p99": float(np.percentile(latency_ms, 99)),
+            "max": float(latency_ms.max()),
+        },
+    }
+
+
+def print_report(stats, wall_seconds, workers):
+    print(f"Games: {stats['games']}  workers: {workers}  wall: {wall_seconds:.2f}s  "
+          f"({stats['games'] / wall_seconds:.1f} games/s)")
+    print(f"Win rate: {stats['win_rate'] * 100:.2f}%  mean guesses: {stats['mean_guesses']:.4f}")
+    peak = max(stats["histogram"].values()) or 1
+    for label, count in stats["histogram"].items():
+        bar = "#" * round(40 * count / peak)
+        print(f"  {label:>2}: {count:6d} {bar}")
+    lat = stats["latency_ms"]
+    print(f"Per-game latency (ms): mean {lat['mean']:.2f}  p50 {lat['p50']:.2f}  "
+          f"p99 {lat['p99']:.2f}  max {lat['max']:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play the whole word list with a solver strategy.")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="entropy")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--sample", type=int, default=None, help="play a random subset of targets")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --sample and random strategies")
+    parser.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    args = parser.parse_args(argv)
+
+    lexicon = Lexicon(load_words(WORD_LIST_FILE))
+    # Build the shared caches once up front so workers only ever mmap them
+    table = load_pattern_table(lexicon, WORD_LIST_FILE, DATA_DIR)
+    opening_scores(table)
+
+    target_ids = list(range(len(lexicon)))
+    if args.sample:
+        target_ids = sorted(random.Random(args.seed).sample(target_ids, min(args.sample, len(target_ids))))
+
+    workers = args.workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = run(target_ids, args.strategy, args.seed, workers)
+    wall = time.perf_counter() - start
+
+    stats = summarize(results)
+    if args.json:
+        stats.update(strategy=args.strategy, seed=args.seed, workers=workers, wall_seconds=wall)
+        print(json.dumps(stats, indent=2))
+    else:
+        print_report(stats, wall, workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
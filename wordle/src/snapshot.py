@@ -0,0 +1,162 @@
+"""Compact binary game snapshots, save/resume files and an append-only replay log.
+
+A snapshot packs a game as:
+    version u8 | word length u8 | target id u16 | guess count u8 | typed count u8 | rows u8 | flags u8
+    guess ids u16 * count | feedback (base-3 pattern) u8 * count | typed letters
+so a full 6-row game is 26 bytes. Patterns longer than 5 letters use u16 feedback.
+
+Run from the 'src' directory to stream a replay log:  python snapshot.py [file]
+"""
+import os
+import struct
+import sys
+import time
+
+from atomic_file import atomic_write
+from engine import score_guess
+from patterns import decode_pattern, encode_marks
+
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct("<BBHBBBB")
+FLAG_HARD_MODE = 1
+RECORD_LENGTH = struct.Struct("<H")
+
+SAVE_FILE = "savegame.bin"
+REPLAY_FILE = "replays.bin"
+
+
+class SnapshotError(ValueError):
+    """A snapshot is corrupt or was made with a different word list."""
+
+
+def _feedback_format(length):
+    return "B" if 3 ** length <= 256 else "H"
+
+
+def pack_game(game):
+    """Packs a WordleGame into bytes."""
+    lexicon = game.lexicon
+    length = lexicon.length
+    if len(lexicon) > 0xFFFF:
+        raise SnapshotError("Word list too large for 16-bit word ids")
+    ids = lexicon.ids
+    guess_ids = [ids[guess] for guess in game.guesses]
+    patterns = [encode_marks(marks) for marks in game.marks]
+    typed = "".join(game.current).encode('ascii')
+    count = len(guess_ids)
+    flags = FLAG_HARD_MODE if game.hard_mode else 0
+    return (HEADER.pack(SNAPSHOT_VERSION, length, ids[game.target], count, len(typed), game.rows, flags)
+            + struct.pack(f"<{count}H{count}{_feedback_format(length)}", *guess_ids, *patterns)
+            + typed)
+
+
+def unpack_settings(data):
+    """Returns the (rows, hard mode) a snapshot was played with."""
+    try:
+        _, _, _, _, _, rows, flags = HEADER.unpack_from(data)
+    except struct.error as e:
+        raise SnapshotError(f"Corrupt snapshot: {e}") from None
+    return rows, bool(flags & FLAG_HARD_MODE)
+
+
+def unpack_game(data, lexicon):
+    """Unpacks snapshot bytes into (target, guesses, marks, typed) using ``lexicon``."""
+    try:
+        version, length, target_id, count, typed_count, _, _ = HEADER.unpack_from(data)
+        if version != SNAPSHOT_VERSION or length != lexicon.length:
+            raise SnapshotError("Snapshot was made with a different version or word length")
+        body = struct.Struct(f"<{count}H{count}{_feedback_format(length)}")
+        values = body.unpack_from(data, HEADER.size)
+        typed_start = HEADER.size + body.size
+        typed = bytes(data[typed_start:typed_start + typed_count]).decode('ascii')
+        words = lexicon.words
+        target = words[target_id]
+        guesses = [words[i] for i in values[:count]]
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SnapshotError(f"Corrupt snapshot: {e}") from None
+    marks = [decode_pattern(p, length) for p in values[count:]]
+    return target, guesses, marks, typed
+
+
+def restore_game(game, data, verify=False):
+    """Loads a snapshot into an existing WordleGame, with the row count and Hard Mode it was played with.
+
+    With ``verify`` the stored feedback is checked against a fresh score,
+    which catches snapshots made with a different word list order.
+    """
+    target, guesses, marks, typed = unpack_game(data, game.lexicon)
+    if verify and any(score_guess(g, target) != m for g, m in zip(guesses, marks)):
+        raise SnapshotError("Snapshot feedback does not match the word list")
+    game.rows, game.hard_mode = unpack_settings(data)
+    game.restore(target, guesses, marks, typed)
+    return game
+
+
+# --- Save / resume ---
+def save_game(game, path):
+    """Writes a snapshot of ``game`` to ``path`` atomically."""
+    with atomic_write(path) as f:
+        f.write(pack_game(game))
+
+
+def load_game(game, path):
+    """Restores ``game`` from ``path``. Returns False if there is no usable save."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        restore_game(game, data, verify=True)
+    except (OSError, SnapshotError):
+        return False
+    return True
+
+
+# --- Replay log ---
+def replay_record(snapshot):
+    """A replay log record (length-prefixed) for pack_game() bytes."""
+    return RECORD_LENGTH.pack(len(snapshot)) + snapshot
+
+
+def iter_replay_records(path, chunk_size=1 << 20):
+    """Yields the raw snapshot records of a replay log as memoryviews, in order.
+
+    Reads in large chunks; a truncated final record (e.g. after a crash) is skipped.
+    """
+    buffer = b""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            buffer = buffer + chunk if buffer else chunk
+            view = memoryview(buffer)
+            pos = 0
+            while pos + RECORD_LENGTH.size <= len(buffer):
+                (size,) = RECORD_LENGTH.unpack_from(view, pos)
+                end = pos + RECORD_LENGTH.size + size
+                if end > len(buffer):
+                    break
+                yield view[pos + RECORD_LENGTH.size:end]
+                pos = end
+            buffer = buffer[pos:]
+
+
+def iter_replays(path, lexicon):
+    """Yields (target, guesses, marks, typed) for every game in a replay log."""
+    for record in iter_replay_records(path):
+        yield unpack_game(record, lexicon)
+
+
+if __name__ == "__main__":
+    from assets import DATA_DIR, WORD_LIST_FILE, load_words
+    from lexicon import Lexicon
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, REPLAY_FILE)
+    lexicon = Lexicon(load_words(WORD_LIST_FILE))
+    start = time.perf_counter()
+    games = wins = 0
+    for target, guesses, marks, typed in iter_replays(path, lexicon):
+        games += 1
+        wins += bool(guesses) and guesses[-1] == target
+    elapsed = time.perf_counter() - start
+    print(f"{games} games ({wins} won) streamed in {elapsed * 1000:.1f} ms "
+          f"({games / elapsed if elapsed else 0:.0f} games/s)")
@@ -0,0 +1,265 @@
+"""Entropy-maximizing Wordle solver and hint engine built on the pattern matrix.
+
+Run from the 'src' directory:
+    python solver.py CRANE      # show how the solver finds CRANE
+    python solver.py            # interactive: enter feedback as e.g. "gy..."
+"""
+import os
+import sys
+
+import numpy as np
+
+from atomic_file import atomic_write
+from patterns import all_correct, decode_pattern, encode_marks
+
+# Guess x candidate cells scored per ranking call; keeps a hint well under 50 ms
+CELL_BUDGET = 500_000
+
+# Always consider at least this many guesses from the opening ranking
+MIN_POOL = 200
+
+_opening_cache = {}
+_plogp_tables = {}
+
+
+def _plogp_table(size):
+    """Lookup table of c * log2(c) for bucket sizes 0..size."""
+    table = _plogp_tables.get(size)
+    if table is None:
+        c = np.arange(size + 1, dtype=np.float64)
+        c[0] = 1.0
+        table = c * np.log2(c)
+        _plogp_tables[size] = table
+    return table
+
+
+def mask_to_bools(mask, size):
+    """Expands a lexicon word bitmask into a bool array indexed by word id."""
+    data = np.frombuffer(mask.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, bitorder='little')[:size].astype(bool)
+
+
+def entropies(matrix, guess_ids, candidate_ids, n_patterns=243):
+    """Expected information (bits) of each guess over the candidate answers."""
+    n = len(candidate_ids)
+    g = len(guess_ids)
+    # Gather along the smaller axis first; much cheaper than np.ix_ on full rows
+    if g <= n:
+        sub = np.take(matrix[guess_ids], candidate_ids, axis=1).astype(np.int32)
+    else:
+        sub = np.take(matrix, candidate_ids, axis=1)[guess_ids].astype(np.int32)
+    # Count every (guess, pattern) bucket in one pass
+    sub += (np.arange(g, dtype=np.int32) * n_patterns)[:, None]
+    counts = np.bincount(sub.ravel(), minlength=g * n_patterns)
+    # H = log2(n) - sum(c * log2(c)) / n over the pattern buckets
+    plogp = _plogp_table(n)[counts].reshape(g, n_patterns).sum(axis=1)
+    return np.log2(n) - plogp / n
+
+
+def opening_scores(table):
+    """Entropy of every guess against the full answer list.
+
+    This is the only expensive ranking, and it does not depend on the game,
+    so it is computed once and stored next to the memory-mapped pattern cache.
+    """
+    key = table.cache_file or id(table)
+    scores = _opening_cache.get(key)
+    if scores is not None:
+        return scores
+    sidecar = None
+    if table.cache_file:
+        sidecar = os.path.splitext(table.cache_file)[0] + "-openers.npy"
+        if os.path.exists(sidecar):
+            try:
+                scores = np.load(sidecar)
+            except (OSError, ValueError):
+                scores = None
+    if scores is None or len(scores) != len(table.lexicon):
+        all_ids = np.arange(len(table.lexicon))
+        scores = np.empty(len(all_ids), dtype=np.float32)
+        for start in range(0, len(all_ids), 512):
+            chunk = all_ids[start:start + 512]
+            scores[start:start + 512] = entropies(
+                table.matrix, chunk, all_ids, 3 ** table.lexicon.length)
+        if sidecar:
+            try:
+                with atomic_write(sidecar) as f:
+                    np.save(f, scores)
+            except OSError as e:
+                # The scores are still good; they are just computed again next launch
+                print(f"Warning: Could not save the opening scores. Error: {e}", file=sys.stderr)
+    _opening_cache[key] = scores
+    return scores
+
+
+class Solver:
+    """Tracks the answers still consistent with the feedback seen so far.
+
+    Each update() filters only the previous candidate set, so the cost of a
+    turn shrinks with the set instead of rescanning the whole word list.
+    With a precomputed ``tree`` (see decision_tree.py), best_guess() is a
+    lookup for as long as the game stays on the tree's paths.
+    """
+
+    __slots__ = ("table", "tree", "candidates", "history", "_opening")
+
+    def __init__(self, table, tree=None):
+        self.table = table
+        self.tree = tree
+        self._opening = None
+        self.reset()
+
+    def reset(self):
+        self.candidates = np.arange(len(self.table.lexicon), dtype=np.int32)
+        self.history = []
+
+    @property
+    def remaining(self):
+        return len(self.candidates)
+
+    def candidate_words(self):
+        words = self.table.lexicon.words
+        return [words[i] for i in self.candidates]
+
+    def update(self, guess, pattern):
+        """Prunes the candidates with the feedback (pattern code) for ``guess``."""
+        guess_id = self.table.lexicon.ids[guess]
+        row = self.table.matrix[guess_id]
+        self.candidates = self.candidates[row[self.candidates] == pattern]
+        self.history.append((guess, pattern))
+
+    def update_marks(self, guess, marks):
+        self.update(guess, encode_marks(marks))
+
+    def opening(self):
+        if self._opening is None:
+            self._opening = opening_scores(self.table)
+        return self._opening
+
+    def rank(self, count=5, allowed=None):
+        """Returns the ``count`` best next guesses as (word, bits) pairs.
+
+        ``allowed`` optionally restricts the guesses to a lexicon word bitmask
+        (Hard Mode); the remaining candidates always satisfy it.
+        """
+        words = self.table.lexicon.words
+        candidates = self.candidates
+        n = len(candidates)
+        if n == 0:
+            return []
+        if n <= 2:
+            # Guessing a candidate can only help now
+            return [(words[i], float(np.log2(n))) for i in candidates[:count]]
+
+        opening = self.opening()
+        if not self.history:
+            best = np.argsort(-opening, kind='stable')[:count]
+            return [(words[i], float(opening[i])) for i in best]
+
+        # Score the candidates plus the strongest openers, within the cell budget
+        # (the candidates count against it too, or mid-sized sets would cost double)
+        pool_size = max(MIN_POOL, CELL_BUDGET // n)
+        if pool_size >= len(words):
+            pool = np.arange(len(words), dtype=np.int32)
+        elif n <= pool_size:
+            top_size = max(MIN_POOL, pool_size - n)
+            top = np.argpartition(-opening, top_size)[:top_size].astype(np.int32)
+            pool = np.union1d(top, candidates)
+        else:
+            pool = np.argpartition(-opening, pool_size)[:pool_size].astype(np.int32)
+        if allowed is not None:
+            pool = pool[mask_to_bools(allowed, len(words))[pool]]
+            if not len(pool):
+                pool = candidates
+        scores = entropies(self.table.matrix, pool, candidates, 3 ** self.table.lexicon.length)
+        # Prefer words that could still be the answer when information ties
+        is_candidate = np.isin(pool, candidates)
+        scores = scores + is_candidate * (1.0 / n)
+        order = np.lexsort((pool, -scores))[:count]
+        return [(words[pool[i]], float(scores[i])) for i in order]
+
+    def best_guess(self, allowed=None):
+        if self.tree is not None and allowed is None:
+            guess = self.tree.best_guess(self.history)
+            if guess is not None:
+                return guess
+        ranked = self.rank(1, allowed)
+        return ranked[0][0] if ranked else None
+
+
+def solve(table, target, max_rows=None):
+    """Plays ``target`` with the solver. Returns the list of guesses made."""
+    solver = Solver(table)
+    solved = all_correct(table.lexicon.length)
+    guesses = []
+    while max_rows is None or len(guesses) < max_rows:
+        guess = solver.best_guess()
+        if guess is None:
+            break
+        guesses.append(guess)
+        pattern = table.pattern(guess, target)
+        if pattern == solved:
+            break
+        solver.update(guess, pattern)
+    return guesses
+
+
+FEEDBACK_CHARS = {'.': 0, '-': 0, 'x': 0, 'b': 0, 'y': 1, 'g': 2}
+
+
+def parse_feedback(text, length):
+    """Parses feedback like "gy..." (g=green, y=yellow, ./x/-=gray) to a pattern code."""
+    text = text.strip().lower()
+    if len(text) != length or any(c not in FEEDBACK_CHARS for c in text):
+        raise ValueError(f"Feedback must be {length} characters of g, y or .")
+    return encode_marks([FEEDBACK_CHARS[c] for c in text])
+
+
+def main(argv):
+    from assets import DATA_DIR, WORD_LIST_FILE, load_words
+    from lexicon import Lexicon
+    from patterns import load_pattern_table
+
+    lexicon = Lexicon(load_words(WORD_LIST_FILE))
+    table = load_pattern_table(lexicon, WORD_LIST_FILE, DATA_DIR)
+
+    if argv:
+        target = argv[0].upper()
+        if target not in lexicon:
+            print(f"Error: '{target}' is not in the word list", file=sys.stderr)
+            return 1
+        for row, guess in enumerate(solve(table, target), 1):
+            marks = decode_pattern(table.pattern(guess, target), lexicon.length)
+            feedback = "".join(".yg"[m] for m in marks)
+            print(f"{row}. {guess} {feedback}")
+        return 0
+
+    solver = Solver(table)
+    while solver.remaining:
+        ranked = solver.rank(5)
+        print(f"{solver.remaining} candidates. Best: "
+              + ", ".join(f"{w} ({bits:.2f})" for w, bits in ranked))
+        try:
+            line = input("guess feedback (e.g. CRANE gy...), empty to quit: ").split()
+        except EOFError:
+            break
+        if not line:
+            break
+        guess = line[0].upper() if len(line) == 2 else ranked[0][0]
+        try:
+            pattern = parse_feedback(line[-1], lexicon.length)
+        except ValueError as e:
+            print(e)
+            continue
+        if guess not in lexicon:
+            print(f"'{guess}' is not in the word list")
+            continue
+        if pattern == all_correct(lexicon.length):
+            print("Solved!")
+            break
+        solver.update(guess, pattern)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,255 @@
+"""Streaming statistics for finished games: append-only log, checkpoints, O(1) queries.
+
+Every finished game is appended to ``stats.log`` (and optionally to the
+replay log) by a background writer thread (fsync'd in batches). Running aggregates are kept in memory and
+are also saved to ``stats.ckpt`` with the log offset they cover, so a
+restart only replays the records written after the last checkpoint.
+"""
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+from atomic_file import atomic_write
+from engine import CORRECT, PRESENT, WON
+from lexicon import ALPHABET
+from snapshot import SnapshotError, pack_game, replay_record, unpack_game
+
+LOG_FILE = "stats.log"
+CHECKPOINT_FILE = "stats.ckpt"
+
+# Record: payload size u16 | finished-at timestamp f64 | flags u8, then a game snapshot
+RECORD_HEADER = struct.Struct("<HdB")
+FLAG_ENDLESS = 1
+
+FSYNC_BATCH = 16        # fsync after this many records...
+FSYNC_INTERVAL = 2.0    # ...or after this many seconds, whichever comes first
+CHECKPOINT_EVERY = 64   # records between checkpoints
+
+
+class Aggregates:
+    """Running totals that are updated in O(1) per game and queried in O(1)."""
+
+    __slots__ = ("games", "wins", "streak", "max_streak", "distribution",
+                 "letter_guessed", "letter_green", "letter_yellow")
+
+    def __init__(self, rows=6):
+        self.games = 0
+        self.wins = 0
+        self.streak = 0
+        self.max_streak = 0
+        self.distribution = [0] * rows  # wins by number of guesses
+        self.letter_guessed = [0] * 26
+        self.letter_green = [0] * 26
+        self.letter_yellow = [0] * 26
+
+    def apply(self, guesses, marks, won):
+        self.games += 1
+        if won:
+            self.wins += 1
+            self.streak += 1
+            self.max_streak = max(self.max_streak, self.streak)
+            rows = len(guesses)
+            if rows > len(self.distribution):
+                self.distribution.extend([0] * (rows - len(self.distribution)))
+            self.distribution[rows - 1] += 1
+        else:
+            self.streak = 0
+        for guess, row_marks in zip(guesses, marks):
+            for letter, mark in zip(guess, row_marks):
+                k = ord(letter) - 65
+                self.letter_guessed[k] += 1
+                if mark == CORRECT:
+                    self.letter_green[k] += 1
+                elif mark == PRESENT:
+                    self.letter_yellow[k] += 1
+
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+    def letter_accuracy(self, letter):
+        """Fraction of times ``letter`` was guessed in its correct position."""
+        k = ord(letter) - 65
+        return self.letter_green[k] / self.letter_guessed[k] if self.letter_guessed[k] else 0.0
+
+    def copy(self):
+        other = Aggregates(len(self.distribution))
+        other.load(self.to_dict())
+        return other
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def load(self, data):
+        for name in self.__slots__:
+            value = data[name]
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+
+
+class StatsStore:
+    """Append-only stats log with in-memory aggregates and a background writer."""
+
+    def __init__(self, data_dir, lexicon_for, rows=6, replay_path=None):
+        # Games of any word length can be in the log: lexicon_for(length) -> Lexicon or None
+        self.lexicon_for = lexicon_for
+        self.log_path = os.path.join(data_dir, LOG_FILE)
+        self.checkpoint_path = os.path.join(data_dir, CHECKPOINT_FILE)
+        # Recorded games also go to this replay log (see snapshot.py), written by the same thread
+        self.replay_path = replay_path
+        self.rows = rows
+        # Aggregates covering everything recorded so far (what queries see)
+        self.totals = Aggregates(rows)
+        # Aggregates covering only what is durably in the log (what checkpoints save)
+        self._durable = Aggregates(rows)
+        self._offset = 0
+        self._recover()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="stats-writer", daemon=True)
+        self._writer.start()
+
+    # --- Startup ---
+    def _recover(self):
+        """Loads the checkpoint, then replays only the log tail written after it."""
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+            self._durable.load(checkpoint["totals"])
+            self._offset = checkpoint["offset"]
+        except (OSError, ValueError, KeyError):
+            self._durable = Aggregates(self.rows)
+            self._offset = 0
+
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            size = 0
+        if self._offset > size:
+            # Log was replaced or truncated behind our back: rebuild from scratch
+            self._durable = Aggregates(self.rows)
+            self._offset = 0
+
+        if self._offset < size:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._offset)
+                tail = f.read()
+            pos = 0
+            while pos + RECORD_HEADER.size <= len(tail):
+                payload_size, _, _ = RECORD_HEADER.unpack_from(tail, pos)
+                end = pos + RECORD_HEADER.size + payload_size
+                if end > len(tail):
+                    break
+                self._apply_payload(self._durable, tail[pos + RECORD_HEADER.size:end])
+                pos = end
+            if pos < len(tail):
+                # Drop a record torn by a crash so new appends stay aligned
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(self._offset + pos)
+            self._offset += pos
+        self.totals = self._durable.copy()
+
+    def _apply_payload(self, totals, payload):
+        lexicon = self.lexicon_for(payload[1]) if len(payload) > 1 else None  # Word length byte
+        if lexicon is None:
+            return
+        try:
+            target, guesses, marks, _ = unpack_game(payload, lexicon)
+        except SnapshotError:
+            return  # Game from a different word list; skip it
+        totals.apply(guesses, marks, bool(guesses) and guesses[-1] == target)
+
+    # --- Recording ---
+    def record(self, game, endless=False):
+        """Records a finished game. Aggregates update now; the disk writes happen in the background."""
+        self.totals.apply(game.guesses, game.marks, game.status == WON)
+        payload = pack_game(game)
+        flags = FLAG_ENDLESS if endless else 0
+        self._queue.put(RECORD_HEADER.pack(len(payload), time.time(), flags) + payload)
+
+    def _write_replays(self, batch):
+        """Appends a batch of stats records to the replay log (not fsync'd; replays are a convenience)."""
+        try:
+            with open(self.replay_path, 'ab') as f:
+                f.write(b"".join(replay_record(record[RECORD_HEADER.size:]) for record in batch))
+        except OSError as e:
+            print(f"Warning: Could not write replay log. Error: {e}", file=sys.stderr)
+
+    def _write_loop(self):
+        pending_sync = 0
+        since_checkpoint = 0
+        last_sync = time.monotonic()
+        log = None
+        try:
+            log = open(self.log_path, 'ab')
+            while True:
+                timeout = max(0.0, FSYNC_INTERVAL - (time.monotonic() - last_sync)) if pending_sync else None
+                batch = []
+                stop = False
+                try:
+                    item = self._queue.get(timeout=timeout)
+                    if item is None:
+                        stop = True
+                    else:
+                        batch.append(item)
+                except queue.Empty:
+                    pass  # Interval elapsed: sync what we have
+                # Drain everything that is already queued into one write
+                while not stop:
+                    try:
+                        more = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more is None:
+                        stop = True
+                    else:
+                        batch.append(more)
+                if batch:
+                    log.write(b"".join(batch))
+                    if self.replay_path:
+                        self._write_replays(batch)
+                    pending_sync += len(batch)
+                    for record in batch:
+                        self._apply_payload(self._durable, record[RECORD_HEADER.size:])
+                        self._offset += len(record)
+                if pending_sync and (stop or pending_sync >= FSYNC_BATCH
+                                     or time.monotonic() - last_sync >= FSYNC_INTERVAL):
+                    log.flush()
+                    os.fsync(log.fileno())
+                    since_checkpoint += pending_sync
+                    pending_sync = 0
+                    last_sync = time.monotonic()
+                    if stop or since_checkpoint >= CHECKPOINT_EVERY:
+                        self._save_checkpoint()
+                        since_checkpoint = 0
+                if stop:
+                    if since_checkpoint:
+                        self._save_checkpoint()
+                    break
+        except OSError as e:
+            print(f"Warning: Could not write game statistics. Error: {e}", file=sys.stderr)
+        finally:
+            if log:
+                log.close()
+
+    def _save_checkpoint(self):
+        with atomic_write(self.checkpoint_path, 'w', fsync=True) as f:
+            json.dump({"offset": self._offset, "totals": self._durable.to_dict()}, f)
+
+    def close(self, timeout=5.0):
+        """Flushes pending records, fsyncs and writes a final checkpoint."""
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    # --- Queries (all O(1) or O(alphabet)) ---
+    def summary(self):
+        t = self.totals
+        return (f"Played {t.games} | Win {t.win_rate() * 100:.0f}% | "
+                f"Streak {t.streak} (max {t.max_streak})")
+
+    def distribution(self):
+        return list(self.totals.distribution)
+
+    def letter_accuracy(self):
+        return {letter: self.totals.letter_accuracy(letter) for letter in ALPHABET}
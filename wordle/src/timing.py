@@ -0,0 +1,179 @@
+"""Lightweight timing instrumentation (startup phases, per-frame phases)."""
+import os
+import sys
+import threading
+import time
+from array import array
+
+# Set WORDLE_STARTUP_TRACE=1 (or pass --startup-trace) to print startup phases
+STARTUP_TRACE_ENV = "WORDLE_STARTUP_TRACE"
+# Set WORDLE_PROFILE=1 (or press F9) to time every frame; WORDLE_PROFILE_DUMP=path adds cProfile
+FRAME_PROFILE_ENV = "WORDLE_PROFILE"
+FRAME_PROFILE_DUMP_ENV = "WORDLE_PROFILE_DUMP"
+# Samples kept per phase; percentiles cover the last RING_SIZE frames
+RING_SIZE = 512
+
+
+class PhaseTimer:
+    """Records named phases as milliseconds since the timer was created.
+
+    mark() may be called from any thread; when disabled it does nothing.
+    """
+
+    def __init__(self, enabled=None, start_ns=None):
+        if enabled is None:
+            enabled = os.environ.get(STARTUP_TRACE_ENV, "") not in ("", "0")
+        self.enabled = enabled
+        self.start_ns = start_ns if start_ns is not None else time.perf_counter_ns()
+        self.phases = []
+
+    def mark(self, phase):
+        """Records that ``phase`` just finished."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.phases.append((phase, now - self.start_ns, threading.current_thread().name))
+
+    def elapsed_ms(self, phase):
+        for name, ns, _ in self.phases:
+            if name == phase:
+                return ns / 1e6
+        return None
+
+    def report(self, file=sys.stderr):
+        if not self.enabled:
+            return
+        print("--- Startup phases (ms since launch) ---", file=file)
+        previous = 0
+        for name, ns, thread in sorted(self.phases, key=lambda p: p[1]):
+            print(f"startup: {name:<24} {ns / 1e6:9.1f}  (+{(ns - previous) / 1e6:7.1f})  [{thread}]",
+                  file=file)
+            previous = ns
+
+
+class RingBuffer:
+    """The last ``size`` integer samples, in a preallocated array."""
+
+    __slots__ = ("samples", "size", "count", "next")
+
+    def __init__(self, size=RING_SIZE):
+        self.samples = array('q', bytes(8 * size))
+        self.size = size
+        self.count = 0
+        self.next = 0
+
+    def add(self, value):
+        self.samples[self.next] = value
+        self.next = (self.next + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def percentiles(self, *fractions):
+        """Nearest-rank percentiles of the samples held, e.g. percentiles(0.5, 0.99)."""
+        if not self.count:
+            return [0] * len(fractions)
+        ordered = sorted(self.samples[:self.count])
+        return [ordered[min(self.count - 1, int(f * self.count))] for f in fractions]
+
+
+class FrameProfiler:
+    """Times the phases of each main-loop frame with perf_counter_ns.
+
+    The loop calls begin() once the frame's events are in, lap(phase)
+    after each step (each lap is the time since the previous one) and
+    end() when the frame is on screen. Disabled, every call returns at
+    once. An optional cProfile run covers the time the profiler is on and
+    is written to ``dump_path`` by stop().
+    """
+
+    __slots__ = ("enabled", "phases", "order", "frame_start", "last", "dump_path", "_profile")
+
+    def __init__(self, enabled=None, dump_path=None):
+        if dump_path is None:
+            dump_path = os.environ.get(FRAME_PROFILE_DUMP_ENV) or None
+        if enabled is None:
+            enabled = os.environ.get(FRAME_PROFILE_ENV, "") not in ("", "0") or dump_path is not None
+        self.enabled = False
+        self.phases = {}
+        self.order = []
+        self.frame_start = 0
+        self.last = 0
+        self.dump_path = dump_path
+        self._profile = None
+        if enabled:
+            self.start()
+
+    def start(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.frame_start = self.last = 0
+        if self.dump_path and self._profile is None:
+            import cProfile
+            self._profile = cProfile.Profile()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stop(self):
+        """Stops timing; writes the cProfile dump, if any."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._profile is not None:
+            self._profile.disable()
+            try:
+                self._profile.dump_stats(self.dump_path)
+            except OSError as e:
+                print(f"Warning: Could not write profile to {self.dump_path}. Error: {e}", file=sys.stderr)
+
+    def toggle(self):
+        if self.enabled:
+            self.stop()
+        else:
+            self.start()
+        return self.enabled
+
+    def begin(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def lap(self, phase):
+        if not self.enabled or not self.frame_start:
+            return
+        now = time.perf_counter_ns()
+        self._add(phase, now - self.last)
+        self.last = now
+
+    def end(self):
+        if not self.enabled or not self.frame_start:
+            return
+        self._add("total", time.perf_counter_ns() - self.frame_start)
+        self.frame_start = 0
+
+    def _add(self, phase, ns):
+        ring = self.phases.get(phase)
+        if ring is None:
+            ring = self.phases[phase] = RingBuffer()
+            self.order.append(phase)
+        ring.add(ns)
+
+    def summary(self, fractions=(0.5, 0.99)):
+        """[(phase, [percentile ms...], max ms)] in first-seen order, 'total' last."""
+        rows = []
+        for phase in sorted(self.order, key=lambda p: p == "total"):
+            ring = self.phases[phase]
+            values = ring.percentiles(*fractions, 1.0)
+            rows.append((phase, [v / 1e6 for v in values[:-1]], values[-1] / 1e6))
+        return rows
+
+    def report(self, file=sys.stderr):
+        if not self.phases:
+            return
+        frames = len(self.phases.get("total", ()))
+        print(f"--- Frame phases (ms, last {frames} frames) ---", file=file)
+        for phase, (p50, p99), worst in self.summary():
+            print(f"frame: {phase:<10} p50 {p50:7.3f}  p99 {p99:7.3f}  max {worst:7.3f}", file=file)
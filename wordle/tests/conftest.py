@@ -0,0 +1,5 @@
+"""Tests import the game modules the way they are run: from the 'src' directory."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
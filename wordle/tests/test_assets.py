@@ -0,0 +1,163 @@
+"""bootstrap() against a local HTTP stand-in for the upstream data files."""
+import hashlib
+import http.server
+import os
+import threading
+
+import pytest
+
+import assets
+from assets import AssetError, bootstrap, compiled_path, load_word_weights, load_words
+
+FILES = {
+    "word_list_5.txt": b"CRANE\nSLATE\nTRACE\n" * 50,
+    "keypress.mp3": bytes(range(256)) * 40,
+}
+MANIFEST = {name: hashlib.sha256(data).hexdigest() for name, data in FILES.items()}
+
+
+class StandIn(http.server.BaseHTTPRequestHandler):
+    """Serves FILES (or ``server.overrides``), honouring 'Range: bytes=N-' when ``server.ranges`` is on."""
+
+    def do_GET(self):
+        name = self.path.lstrip("/")
+        self.server.requests.append((name, self.headers.get("Range")))
+        data = self.server.overrides.get(name, FILES.get(name))
+        if data is None:
+            self.send_error(404)
+            return
+        status, start = 200, 0
+        range_header = self.headers.get("Range")
+        if range_header and self.server.ranges:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(data):
+                self.send_error(416)
+                return
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    httpd.requests = []
+    httpd.overrides = {}
+    httpd.ranges = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.base_url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def run(data_dir, base_url):
+    return bootstrap(str(data_dir), base_url, MANIFEST, timeout=5, workers=2)
+
+
+def test_fresh_download(tmp_path, server):
+    status = run(tmp_path, server.base_url)
+    assert status == {name: 'downloaded' for name in FILES}
+    for name, data in FILES.items():
+        assert (tmp_path / name).read_bytes() == data
+    assert not list(tmp_path.glob("*.part"))
+    # Warm start: nothing is fetched again
+    server.requests.clear()
+    assert run(tmp_path, server.base_url) == {name: 'ok' for name in FILES}
+    assert server.requests == []
+
+
+def test_resume_partial_download(tmp_path, server):
+    data = FILES["keypress.mp3"]
+    (tmp_path / "keypress.mp3.part").write_bytes(data[:1000])
+    status = run(tmp_path, server.base_url)
+    assert status["keypress.mp3"] == 'downloaded'
+    assert ("keypress.mp3", "bytes=1000-") in server.requests
+    assert (tmp_path / "keypress.mp3").read_bytes() == data
+
+
+def test_complete_part_file_gets_416(tmp_path, server):
+    data = FILES["keypress.mp3"]
+    (tmp_path / "keypress.mp3.part").write_bytes(data)
+    assert run(tmp_path, server.base_url)["keypress.mp3"] == 'downloaded'
+    assert (tmp_path / "keypress.mp3").read_bytes() == data
+
+
+def test_server_without_ranges_restarts(tmp_path, server):
+    server.ranges = False
+    (tmp_path / "keypress.mp3.part").write_bytes(b"stale bytes")
+    assert run(tmp_path, server.base_url)["keypress.mp3"] == 'downloaded'
+    assert (tmp_path / "keypress.mp3").read_bytes() == FILES["keypress.mp3"]
+
+
+def test_checksum_mismatch(tmp_path, server):
+    server.overrides["word_list_5.txt"] = b"TAMPERED\n"
+    with pytest.raises(AssetError, match="Checksum mismatch"):
+        run(tmp_path, server.base_url)
+    # Neither a bad final file nor its part file is left behind
+    assert not (tmp_path / "word_list_5.txt").exists()
+    assert not (tmp_path / "word_list_5.txt.part").exists()
+
+
+def test_truncated_file_is_fetched_again(tmp_path, server):
+    # What the old downloader left behind when it was cut off
+    for name, data in FILES.items():
+        (tmp_path / name).write_bytes(data)
+    (tmp_path / "word_list_5.txt").write_bytes(FILES["word_list_5.txt"][:100])
+    status = run(tmp_path, server.base_url)
+    assert status == {"word_list_5.txt": 'downloaded', "keypress.mp3": 'ok'}
+    assert (tmp_path / "word_list_5.txt").read_bytes() == FILES["word_list_5.txt"]
+    assert [name for name, _ in server.requests] == ["word_list_5.txt"]
+
+
+def test_bad_download_leaves_the_local_copy(tmp_path, server):
+    truncated = FILES["word_list_5.txt"][:100]
+    (tmp_path / "word_list_5.txt").write_bytes(truncated)
+    server.overrides["word_list_5.txt"] = b"TAMPERED\n"
+    with pytest.raises(AssetError, match="Checksum mismatch"):
+        run(tmp_path, server.base_url)
+    assert (tmp_path / "word_list_5.txt").read_bytes() == truncated
+
+
+def test_offline_start(tmp_path, server):
+    offline_url = server.base_url
+    server.shutdown()
+    server.server_close()
+    # Everything present (one copy bad, and it cannot be fetched again): starts on the local files
+    for name, data in FILES.items():
+        (tmp_path / name).write_bytes(data)
+    (tmp_path / "keypress.mp3").write_bytes(b"cut short")
+    assert run(tmp_path, offline_url) == {"word_list_5.txt": 'ok', "keypress.mp3": 'unverified'}
+    assert (tmp_path / "keypress.mp3").read_bytes() == b"cut short"
+    # A missing file cannot be fetched offline
+    os.remove(tmp_path / "word_list_5.txt")
+    with pytest.raises(AssetError, match="word_list_5.txt"):
+        run(tmp_path, offline_url)
+
+
+def test_compiled_word_list_follows_parser_version(tmp_path, monkeypatch):
+    source = tmp_path / "word_list_5.txt"
+    source.write_text("crane 12\nslate\nhello world\n")
+    assert load_words(str(source)) == ["CRANE", "SLATE", "HELLO"]
+    # Same source, different parser: the compiled copy is rebuilt, not trusted
+    with open(compiled_path(str(source)), 'r+b') as f:
+        f.seek(assets.COMPILED_HEADER.size)
+        f.write(b"XXXXX")
+    monkeypatch.setattr(assets, "PARSER_VERSION", assets.PARSER_VERSION + 1)
+    assert load_words(str(source)) == ["CRANE", "SLATE", "HELLO"]
+    assert assets.read_compiled_words(str(source)) == ["CRANE", "SLATE", "HELLO"]
+
+
+def test_frequency_overrides(tmp_path):
+    source = tmp_path / "word_list_5.txt"
+    source.write_text("crane 40\nslate\nhello 10\n")
+    overrides = tmp_path / "word_freq_5.txt"
+    assert load_word_weights(str(source), 5, str(overrides)) == [40.0, 10.0, 10.0]
+    overrides.write_text("SLATE 500\nhello 2\nzzzzz 9\n")
+    assert load_word_weights(str(source), 5, str(overrides)) == [40.0, 500.0, 2.0]
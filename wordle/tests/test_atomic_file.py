@@ -0,0 +1,24 @@
+"""atomic_write() replaces the target only once complete and never leaves a temp file behind."""
+import pytest
+
+from atomic_file import atomic_write
+
+
+def test_replaces_the_target(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"old")
+    with atomic_write(str(path), fsync=True) as f:
+        f.write(b"new")
+    assert path.read_bytes() == b"new"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.bin"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+    with pytest.raises(ValueError):
+        with atomic_write(str(path), 'w') as f:
+            f.write("half")
+            raise ValueError("interrupted")
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
@@ -0,0 +1,31 @@
+"""Every board the game offers gets a window whose cells are big enough to read."""
+import pytest
+
+from board_layout import READABLE_CELL_SIZE, BoardLayout, window_size
+from keyboard_layout import KeyboardLayout
+from main import GRID_OFFSET_Y, ROW_COUNTS, SCREEN_HEIGHT, SCREEN_WIDTH
+from multiboard import BOARD_COUNTS, rows_for
+from render_cache import FONT_SPECS, FULL_CELL_SIZE, MIN_LETTER_SIZE
+
+BOARDS = [(1, rows) for rows in ROW_COUNTS] + [(boards, rows_for(boards)) for boards in BOARD_COUNTS[1:]]
+
+
+@pytest.mark.parametrize("boards, rows", BOARDS)
+@pytest.mark.parametrize("length", range(4, 9))
+def test_cells_stay_readable(boards, rows, length):
+    reserved = SCREEN_HEIGHT - KeyboardLayout(SCREEN_WIDTH, SCREEN_HEIGHT).top
+    width, height = window_size(length, rows, boards, GRID_OFFSET_Y, reserved, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    assert width >= SCREEN_WIDTH and height >= SCREEN_HEIGHT
+    layout = BoardLayout(width, height, length, rows, GRID_OFFSET_Y, KeyboardLayout(width, height).top,
+                         boards=boards)
+    assert layout.cell_size >= READABLE_CELL_SIZE
+    assert FONT_SPECS['cell'][1] * layout.cell_size // FULL_CELL_SIZE >= MIN_LETTER_SIZE
+    # Everything fits in the window
+    assert layout.left >= 0 and layout.left + layout.width <= width
+    assert layout.bottom <= KeyboardLayout(width, height).top
+
+
+def test_single_board_keeps_the_default_window():
+    reserved = SCREEN_HEIGHT - KeyboardLayout(SCREEN_WIDTH, SCREEN_HEIGHT).top
+    assert window_size(5, 6, 1, GRID_OFFSET_Y, reserved, (SCREEN_WIDTH, SCREEN_HEIGHT)) == \
+        (SCREEN_WIDTH, SCREEN_HEIGHT)
@@ -0,0 +1,146 @@
+"""score_guess() against a scalar reference, Constraints against brute force, and whole games."""
+import random
+
+import pytest
+
+from engine import (
+    ABSENT, CORRECT, KEY_ABSENT, KEY_CORRECT, KEY_PRESENT, KEY_SPLIT, KEY_UNUSED, LOST, PLAYING,
+    PRESENT, WON, Constraints, WordleGame, score_guess,
+)
+from lexicon import Lexicon
+from patterns import decode_pattern, score_batch, words_to_array
+
+WORDS = ["CRANE", "SLATE", "TRACE", "GHOST", "PLANT", "ABOUT", "WHICH", "HELLO",
+         "EERIE", "ABBEY", "SPEED", "TEETH", "ERASE", "GEESE", "LLAMA", "MAMMA", "KAYAK"]
+
+
+def reference_score(guess, target):
+    """The original check_guess() loop: greens, then yellows left to right from what is left."""
+    marks = [ABSENT] * len(guess)
+    remaining = list(target)
+    for i, letter in enumerate(guess):
+        if letter == target[i]:
+            marks[i] = CORRECT
+            remaining.remove(letter)
+    for i, letter in enumerate(guess):
+        if marks[i] != CORRECT and letter in remaining:
+            marks[i] = PRESENT
+            remaining.remove(letter)
+    return marks
+
+
+@pytest.fixture
+def lexicon():
+    return Lexicon(WORDS)
+
+
+@pytest.mark.parametrize("guess, target, marks", [
+    ("SPEED", "ABIDE", [ABSENT, ABSENT, PRESENT, ABSENT, PRESENT]),
+    ("SPEED", "ERASE", [PRESENT, ABSENT, PRESENT, PRESENT, ABSENT]),
+    ("EERIE", "ERASE", [CORRECT, ABSENT, PRESENT, ABSENT, CORRECT]),
+    ("GEESE", "THEME", [ABSENT, ABSENT, CORRECT, ABSENT, CORRECT]),
+    ("LLAMA", "HELLO", [PRESENT, PRESENT, ABSENT, ABSENT, ABSENT]),
+    ("MAMMA", "MOMMY", [CORRECT, ABSENT, CORRECT, CORRECT, ABSENT]),
+    ("CRANE", "CRANE", [CORRECT] * 5),
+])
+def test_duplicate_letters(guess, target, marks):
+    assert score_guess(guess, target) == marks == reference_score(guess, target)
+
+
+def test_matches_reference_and_batch_scoring():
+    rng = random.Random(0)
+    letters = "AEELRST"  # Few letters, so most words repeat some
+    words = ["".join(rng.choice(letters) for _ in range(5)) for _ in range(300)] + WORDS
+    for guess in words[:60]:
+        codes = score_batch(words_to_array([guess]), words_to_array(words))[0].tolist()
+        for target, code in zip(words, codes):
+            assert score_guess(guess, target) == reference_score(guess, target) == decode_pattern(code)
+
+
+def brute_force_candidates(words, rows):
+    """Words that score every guess exactly as it was scored."""
+    return [w for w in words if all(score_guess(guess, w) == marks for guess, marks in rows)]
+
+
+def brute_force_hard(words, rows):
+    """The NYT Hard Mode rule: every green kept in place, every green or yellow copy reused."""
+    def allowed(word, guess, marks):
+        if any(m == CORRECT and word[i] != guess[i] for i, m in enumerate(marks)):
+            return False
+        shown = [letter for letter, m in zip(guess, marks) if m != ABSENT]
+        return all(word.count(letter) >= shown.count(letter) for letter in shown)
+    return [w for w in words if all(allowed(w, guess, marks) for guess, marks in rows)]
+
+
+def check_constraints(lexicon, target, guesses):
+    constraints = Constraints(lexicon)
+    rows = [(guess, score_guess(guess, target)) for guess in guesses]
+    for guess, marks in rows:
+        constraints.update(guess, marks)
+    assert constraints.candidates() == brute_force_candidates(lexicon.words, rows)
+    assert [w for w in lexicon.words if constraints.allows(w)] == brute_force_hard(lexicon.words, rows)
+    return constraints
+
+
+@pytest.mark.parametrize("target, guesses, hard_only, refused, message", [
+    # Green and gray E: exactly one E, and only in the last place
+    ("CRANE", ["EERIE"], "THREE", "RESET", "5th letter must be E"),
+    # Yellow and gray B next to a green B: exactly two Bs
+    ("ABBEY", ["BOBBY"], "BABBY", "REBUY", "Guess must contain 2 Bs"),
+    # Two greens and a yellow of the same letter: at least three Es
+    ("GEESE", ["EERIE"], "EERIE", "SEDGE", "Guess must contain 3 Es"),
+    # Yellow Ls raise the minimum before a later row places one
+    ("LLAMA", ["HELLO", "ALLAY"], "ALLAY", "HELLO", "2nd letter must be L"),
+])
+def test_hard_mode_with_repeated_letters(target, guesses, hard_only, refused, message):
+    words = sorted(set(WORDS + guesses + [target, hard_only, refused]))
+    constraints = check_constraints(Lexicon(words), target, guesses)
+    assert constraints.allows(target)
+    # Hard Mode only needs the revealed letters, not the maximum counts
+    assert constraints.allows(hard_only) and hard_only not in constraints.candidates()
+    assert constraints.violation(refused) == message
+
+
+def test_constraints_match_brute_force():
+    rng = random.Random(1)
+    letters = "AEELRST"
+    words = sorted({"".join(rng.choice(letters) for _ in range(5)) for _ in range(400)})
+    lexicon = Lexicon(words)
+    for _ in range(150):
+        target = rng.choice(words)
+        check_constraints(lexicon, target, rng.sample(words, rng.randint(1, 4)))
+
+
+def test_win(lexicon):
+    game = WordleGame(lexicon, target="GHOST")
+    for letter in "HELLO":
+        assert game.type_letter(letter)
+    assert not game.type_letter("X")  # Row is full
+    assert game.submit() == reference_score("HELLO", "GHOST")
+    assert game.guess("GHOST") == [CORRECT] * 5
+    assert (game.status, game.message, game.row) == (WON, "You Win!", 2)
+    assert game.guess("CRANE") is None and not game.type_letter("A")
+
+
+def test_loss_and_rejected_rows(lexicon):
+    game = WordleGame(lexicon, rows=3, target="GHOST")
+    assert game.submit() is None and game.message == "Word too short"
+    assert game.guess("ZZZZZ") is None and game.message == "Not in word list"
+    for word in ("CRANE", "SLATE", "PLANT"):
+        assert game.status == PLAYING
+        game.guess(word)
+    assert (game.status, game.message) == (LOST, "Game Over! Word: GHOST")
+
+
+def test_key_states(lexicon):
+    game = WordleGame(lexicon, target="TEETH")
+    game.guess("CRANE")  # E yellow, the rest gray
+    game.guess("EERIE")  # E green at 1, yellow at 0
+    game.guess("PLANT")  # T yellow
+    states = {letter: game.key_state(letter) for letter in "CRETPBZ"}
+    assert states == {"C": KEY_ABSENT, "R": KEY_ABSENT, "E": KEY_SPLIT, "T": KEY_PRESENT,
+                      "P": KEY_ABSENT, "B": KEY_UNUSED, "Z": KEY_UNUSED}
+    game.guess("TEETH")
+    # As in the original GUI, a green on a split key shows it plain green again
+    assert game.key_state("E") == game.key_state("H") == KEY_CORRECT
+    assert game.status == WON
@@ -0,0 +1,50 @@
+"""TargetSampler: saved sessions continue exactly, and take() never repeats a word."""
+import json
+
+import pytest
+
+from lexicon import Lexicon
+from sampler import TARGETS_FILE, TargetSampler
+
+WORDS = ["CRANE", "SLATE", "TRACE", "GHOST", "PLANT", "ABOUT", "WHICH", "HELLO", "EERIE", "ABBEY"]
+
+
+def test_saved_session_continues_where_it_stopped(tmp_path):
+    lexicon = Lexicon(WORDS)
+    first = TargetSampler.for_lexicon(lexicon, str(tmp_path))
+    drawn = first.take(3) + first.take(4)  # Crosses into a second bag on the next take
+    resumed = TargetSampler.for_lexicon(lexicon, str(tmp_path))
+    assert (resumed.seed, resumed.position) == (first.seed, len(drawn))
+    assert [resumed.take(2) for _ in range(6)] == [first.take(2) for _ in range(6)]
+
+
+def test_damaged_state_starts_a_new_bag(tmp_path):
+    lexicon = Lexicon(WORDS)
+    TargetSampler.for_lexicon(lexicon, str(tmp_path)).take(2)
+    path = tmp_path / TARGETS_FILE.format(length=5)
+    saved = json.loads(path.read_text())
+    del saved["state"]
+    path.write_text(json.dumps(saved))
+    assert TargetSampler.for_lexicon(lexicon, str(tmp_path)).position == 0
+
+
+def test_each_bag_draws_every_word_once():
+    sampler = TargetSampler(WORDS, seed=1)
+    for _ in range(3):
+        assert sorted(sampler.draw() for _ in WORDS) == sorted(WORDS)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_take_is_distinct_across_a_refill(seed):
+    sampler = TargetSampler(WORDS, seed=seed)
+    sampler.take(7)  # Three words left, so the next take refills partway
+    targets = sampler.take(4)
+    assert len(set(targets)) == 4
+    # The words taken from the new bag are not drawn again until it is used up
+    rest = [sampler.draw() for _ in range(len(WORDS) - 1)]
+    assert sorted(targets[3:] + rest) == sorted(WORDS)
+
+
+def test_take_more_than_the_word_list():
+    with pytest.raises(ValueError):
+        TargetSampler(WORDS, seed=0).take(len(WORDS) + 1)
@@ -0,0 +1,41 @@
+"""Snapshot round trips, including the row count and Hard Mode of the saved game."""
+import pytest
+
+from engine import PLAYING, WordleGame
+from lexicon import Lexicon
+from snapshot import SnapshotError, load_game, pack_game, save_game, unpack_game
+
+WORDS = ["CRANE", "SLATE", "TRACE", "GHOST", "PLANT", "ABOUT", "WHICH", "HELLO"]
+
+
+@pytest.fixture
+def lexicon():
+    return Lexicon(WORDS)
+
+
+def played(lexicon, guesses, **kwargs):
+    game = WordleGame(lexicon, target="GHOST", **kwargs)
+    for word in guesses:
+        assert game.guess(word) is not None
+    return game
+
+
+def test_round_trip_keeps_rows_and_hard_mode(lexicon, tmp_path):
+    # Seven misses are still a game in progress on an 8-row board (F4)
+    game = played(lexicon, ["CRANE", "SLATE", "TRACE", "PLANT", "ABOUT", "WHICH", "HELLO"], rows=8)
+    game.hard_mode = True
+    game.current = list("GH")
+    path = tmp_path / "savegame.bin"
+    save_game(game, str(path))
+    resumed = WordleGame(lexicon)
+    assert load_game(resumed, str(path))
+    assert (resumed.rows, resumed.hard_mode, resumed.status) == (8, True, PLAYING)
+    assert resumed.guesses == game.guesses and resumed.marks == game.marks
+    assert resumed.current == ["G", "H"]
+
+
+def test_unknown_version_is_rejected(lexicon):
+    data = bytearray(pack_game(played(lexicon, ["CRANE"])))
+    data[0] = 99
+    with pytest.raises(SnapshotError):
+        unpack_game(bytes(data), lexicon)
@@ -0,0 +1,90 @@
+"""StatsStore recovery: a torn final record is dropped and a stale checkpoint is caught up from the log."""
+import os
+import shutil
+
+import pytest
+
+from engine import WordleGame
+from lexicon import Lexicon
+from snapshot import iter_replays, pack_game
+from stats import CHECKPOINT_FILE, LOG_FILE, RECORD_HEADER, Aggregates, StatsStore
+
+WORDS = ["CRANE", "SLATE", "TRACE", "GHOST", "PLANT", "ABOUT", "WHICH", "HELLO"]
+GAMES = [("GHOST", ["CRANE", "GHOST"]), ("PLANT", ["SLATE", "TRACE", "PLANT"]),
+         ("HELLO", ["CRANE", "SLATE", "TRACE", "GHOST", "PLANT", "ABOUT"]), ("WHICH", ["WHICH"])]
+
+
+@pytest.fixture
+def lexicon():
+    return Lexicon(WORDS)
+
+
+def play(lexicon, target, guesses):
+    game = WordleGame(lexicon, target=target)
+    for word in guesses:
+        game.guess(word)
+    return game
+
+
+def record(data_dir, lexicon, games):
+    store = StatsStore(str(data_dir), lambda length: lexicon)
+    for target, guesses in games:
+        store.record(play(lexicon, target, guesses))
+    store.close()
+    return store
+
+
+def expected(lexicon, games):
+    totals = Aggregates()
+    for target, guesses in games:
+        game = play(lexicon, target, guesses)
+        totals.apply(game.guesses, game.marks, game.guesses[-1] == target)
+    return totals.to_dict()
+
+
+def reopen(data_dir, lexicon):
+    store = StatsStore(str(data_dir), lambda length: lexicon)
+    store.close()
+    return store
+
+
+def test_torn_final_record_is_dropped(lexicon, tmp_path):
+    record(tmp_path, lexicon, GAMES[:2])
+    log_path = tmp_path / LOG_FILE
+    size = os.path.getsize(log_path)
+    # A crash halfway through the third record
+    payload = pack_game(play(lexicon, *GAMES[2]))
+    with open(log_path, 'ab') as f:
+        f.write(RECORD_HEADER.pack(len(payload), 0.0, 0) + payload[:3])
+    assert reopen(tmp_path, lexicon).totals.to_dict() == expected(lexicon, GAMES[:2])
+    assert os.path.getsize(log_path) == size
+    # New records line up after the truncated tail
+    record(tmp_path, lexicon, GAMES[2:])
+    assert reopen(tmp_path, lexicon).totals.to_dict() == expected(lexicon, GAMES)
+
+
+def test_stale_checkpoint_is_caught_up_from_the_log(lexicon, tmp_path):
+    record(tmp_path, lexicon, GAMES[:1])
+    stale = tmp_path / "stale.ckpt"
+    shutil.copy(tmp_path / CHECKPOINT_FILE, stale)
+    record(tmp_path, lexicon, GAMES[1:])
+    shutil.copy(stale, tmp_path / CHECKPOINT_FILE)
+    assert reopen(tmp_path, lexicon).totals.to_dict() == expected(lexicon, GAMES)
+
+
+def test_checkpoint_past_the_end_of_the_log_is_rebuilt(lexicon, tmp_path):
+    record(tmp_path, lexicon, GAMES)
+    with open(tmp_path / LOG_FILE, 'r+b') as f:
+        f.truncate(0)
+    record(tmp_path, lexicon, GAMES[:1])
+    # The checkpoint covers four games; the log now holds one
+    assert reopen(tmp_path, lexicon).totals.to_dict() == expected(lexicon, GAMES[:1])
+
+
+def test_replays_are_written_by_the_writer_thread(lexicon, tmp_path):
+    replay_path = str(tmp_path / "replays.bin")
+    store = StatsStore(str(tmp_path), lambda length: lexicon, replay_path=replay_path)
+    for target, guesses in GAMES:
+        store.record(play(lexicon, target, guesses))
+    store.close()
+    assert [(target, guesses) for target, guesses, _, _ in iter_replays(replay_path, lexicon)] == GAMES